@@ -0,0 +1,4 @@
+"""
+The data pipeline scripts. Run them from the root of the repository as
+`python -m scripts.<name>`.
+"""
@@ -0,0 +1,631 @@
+"""
+This module turns cast vote records (CVRs) into aggregated ballot profiles.
+
+A CVR has one row per ballot and one column per rank (`rank1`, `rank2`, ...).
+Most analyses only need each distinct ranking and how many ballots cast it, the
+same `{ranking_tuple: count}` profile that `parse_election_data` in the archived
+`rcv_distribution.py` builds. A `BallotProfile` stores this compactly:
+-   `candidates`: the codebook, every candidate name in order of first appearance.
+-   `rankings`: one row per distinct ranking, holding the candidates' codebook
+    indices in rank order as `int8`/`int16`, padded with -1.
+-   `counts`: the number of ballots cast for each ranking, as `int64`.
+-   `lengths`: the number of candidates ranked in each row.
+
+It converts losslessly to and from the dictionary form (`to_dict`, `from_dict`),
+so analyses can share one encoded representation instead of re-encoding names.
+Profiles built from a CVR by `build_profile` read every cell as a string and skip
+blank cells, so their candidates are the names as written in the file (`"1"`, not
+`1.0`) and no ranking holds a NaN. This is not the output of `parse_election_data`,
+which infers column types and keeps blanks as NaN candidates.
+
+Profiles are built by `encode_rankings` with array operations only (one factorize
+of every cell, one `np.unique` over the rows). `build_profile` streams the CVR in
+chunks through a `ProfileBuilder`, so its memory use is bounded by the number of
+distinct rankings rather than the number of ballots. `parse_election_data` here
+is a vectorized drop-in replacement for the archived function and returns the
+same `(ballots, candidates)`, quirks included, in a fraction of the time.
+
+A profile is saved either as one compressed `.npz` file (`save`, `load`) or as a
+`.profile` directory of plain `.npy` arrays with a `header.json` recording the
+source CVR's SHA-256 and the ignored values (`save_dir`, `load_dir`). The
+directory form is memory-mapped on load, so many worker processes can open the
+same election without parsing anything and share its pages in the page cache.
+
+`process_data.py --profiles` writes a profile directory for every matched CVR, so
+consumers load a few kilobytes instead of re-parsing the CVR:
+
+    profile = BallotProfile.load_dir(path)
+    ballots = profile.to_dict()
+"""
+
+import contextlib
+import json
+import os
+import re
+import shutil
+import tempfile
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# --- Constants and Configuration ---
+
+# Cells matching any of these (as regular expressions) are not candidates
+IGNORE_VALUES = [
+    "UWI",
+    "(WRITE-IN)",
+    "WRITE-IN",
+    "writein",
+    "Write-In",
+    "Write-in",
+    "skipped",
+    "overvote",
+    "Undeclared",
+    "undervote",
+    "Write in",
+]
+
+# The file extension of compressed single-file profile artifacts
+PROFILE_EXTENSION = ".npz"
+
+# The suffix of memory-mappable profile directories
+PROFILE_DIR_SUFFIX = ".profile"
+
+# The header of a profile directory, and its format version
+PROFILE_HEADER_FILENAME = "header.json"
+PROFILE_FORMAT_VERSION = 1
+
+# The arrays of a profile directory, each saved as `<name>.npy`
+PROFILE_ARRAYS = ("candidates", "rankings", "counts", "lengths")
+
+# The permissions of a profile directory, readable by every process
+PROFILE_DIR_MODE = 0o755
+
+# Marks the unused ranks of a ranking shorter than the longest one
+PADDING = -1
+
+# The number of ballots read at a time when building a profile
+PROFILE_CHUNK_ROWS = 200_000
+
+# --- Function Definitions ---
+
+
+def get_rank_columns(columns: List[str]) -> List[str]:
+    """
+    Picks the rank columns of a CVR header, in the order `rank1`, `rank2`, ...
+
+    Like `parse_election_data`, this stops at the first missing rank.
+
+    Args:
+        columns (List[str]): The column names of the CVR.
+
+    Returns:
+        List[str]: The rank columns.
+    """
+    present = set(columns)
+    rank_columns = []
+    while f"rank{len(rank_columns) + 1}" in present:
+        rank_columns.append(f"rank{len(rank_columns) + 1}")
+    return rank_columns
+
+
+def ignore_value_list(ignore_values: Optional[List[str]] = None) -> List[str]:
+    """Returns `IGNORE_VALUES` followed by the extra values to ignore."""
+    return IGNORE_VALUES + list(ignore_values or [])
+
+
+def ignore_pattern(ignore_values: Optional[List[str]] = None) -> re.Pattern:
+    """
+    Combines the ignored values into one regular expression.
+
+    Args:
+        ignore_values (List[str], optional): Extra values to ignore on top of
+            `IGNORE_VALUES`.
+
+    Returns:
+        re.Pattern: A pattern found in every cell that is not a candidate.
+    """
+    values = ignore_value_list(ignore_values)
+    return re.compile("|".join(f"(?:{value})" for value in values))
+
+
+def _drop_repeats(codes: np.ndarray) -> np.ndarray:
+    """
+    Keeps only the first rank of each candidate on a ballot and moves the
+    remaining ranks to the front of each row, preserving their order.
+
+    Args:
+        codes (np.ndarray): One row of codebook indices per ballot, with
+            `PADDING` for skipped ranks. Modified in place.
+
+    Returns:
+        np.ndarray: The compacted rows.
+    """
+    for j in range(1, codes.shape[1]):
+        repeated = (codes[:, :j] == codes[:, j : j + 1]).any(axis=1)
+        codes[repeated, j] = PADDING
+    order = np.argsort(codes == PADDING, axis=1, kind="stable")
+    return np.take_along_axis(codes, order, axis=1)
+
+
+def _count_rankings(codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Counts the distinct rows of a compacted code matrix.
+
+    Args:
+        codes (np.ndarray): One compacted ranking per ballot.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The distinct rankings, in order of first
+        appearance and trimmed to the longest ranking, and their counts.
+    """
+    width = int((codes != PADDING).sum(axis=1).max(initial=0))
+    codes = codes[:, :width]
+    if len(codes) == 0:
+        return codes, np.zeros(0, dtype=np.int64)
+    if width == 0:
+        return codes[:1], np.array([len(codes)], dtype=np.int64)
+    rankings, first, counts = np.unique(
+        codes, axis=0, return_index=True, return_counts=True
+    )
+    order = np.argsort(first, kind="stable")
+    return rankings[order], counts[order].astype(np.int64)
+
+
+def encode_rankings(
+    data: pd.DataFrame,
+    ignore_values: Optional[List[str]] = None,
+    keep_blanks: bool = False,
+) -> Tuple[List, np.ndarray, np.ndarray]:
+    """
+    Aggregates the rank columns of a CVR into its distinct rankings and their
+    counts, with array operations only.
+
+    Every cell is factorized once, the ignore pattern is searched once per
+    distinct string, repeated candidates are dropped column by column, and the
+    rankings are counted with a single `np.unique` over the rows.
+
+    Args:
+        data (pd.DataFrame): The rank columns, in rank order.
+        ignore_values (List[str], optional): Extra values to ignore on top of
+            `IGNORE_VALUES`.
+        keep_blanks (bool): Treat blank cells as candidates the way
+            `parse_election_data` does: all blanks of a text column are one NaN
+            candidate, while each blank of a numeric column is a distinct NaN.
+            A text column holding nothing but blanks and ignored values (with at
+            least one blank) counts as numeric, and its ignored values become
+            distinct NaNs as well.
+
+    Returns:
+        Tuple[List, np.ndarray, np.ndarray]: The candidate codebook in order of
+        first appearance, the padded ranking matrix (int64) and the count of
+        each ranking.
+    """
+    shape = data.shape
+    keys, values = pd.factorize(
+        data.to_numpy(dtype=object).ravel(), use_na_sentinel=not keep_blanks
+    )
+    pattern = ignore_pattern(ignore_values)
+    ignored = np.array(
+        [isinstance(v, str) and pattern.search(v) is not None for v in values] + [True]
+    )
+    kept = ~ignored[keys]
+    if keep_blanks:
+        blank = data.isna().to_numpy(dtype=bool)
+        numeric = np.array(
+            [not pd.api.types.is_object_dtype(t) for t in data.dtypes], dtype=bool
+        )
+        # pandas turns a text column into a float column once it holds nothing
+        # but blanks and replaced values, so all of those become distinct NaNs
+        emptied = (
+            (blank | ~kept.reshape(shape)).all(axis=0) & blank.any(axis=0) & ~numeric
+        )
+        distinct = ((blank & numeric) | emptied).ravel()
+        keys[distinct] = len(values) + np.arange(distinct.sum())
+        kept[distinct] = True
+
+    # Number the kept values in order of first appearance, row by row
+    codes = np.full(keys.shape, PADDING, dtype=np.int64)
+    codes[kept], order = pd.factorize(keys[kept])
+    candidates = [
+        values[key] if key < len(values) else np.float64("nan") for key in order
+    ]
+    rankings, counts = _count_rankings(_drop_repeats(codes.reshape(shape)))
+    return candidates, rankings, counts
+
+
+def _code_dtype(size: int) -> np.dtype:
+    """Returns the smallest signed integer type that holds values up to `size`."""
+    for dtype in (np.int8, np.int16, np.int32):
+        if size <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+@dataclass
+class BallotProfile:
+    """
+    The distinct rankings of an election and the number of ballots for each,
+    integer-coded against a candidate codebook.
+
+    `rankings` holds one row of codebook indices per distinct ranking, padded
+    with `PADDING`; it is stored as `int8` (or `int16` for more than 127
+    candidates). `lengths` holds the number of candidates ranked on each row and
+    is derived from `rankings` unless given.
+
+    The arrays may be read-only memory maps (see `load_dir`).
+    """
+
+    candidates: List[str]
+    rankings: np.ndarray
+    counts: np.ndarray
+    lengths: Optional[np.ndarray] = field(default=None, repr=False)
+
+    def __post_init__(self):
+        self.candidates = list(self.candidates)
+        self.rankings = np.asarray(self.rankings).astype(
+            _code_dtype(len(self.candidates)), copy=False
+        )
+        self.counts = np.asarray(self.counts, dtype=np.int64)
+        if self.lengths is None:
+            self.lengths = (
+                (self.rankings != PADDING)
+                .sum(axis=1)
+                .astype(_code_dtype(self.rankings.shape[1]))
+            )
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    @property
+    def num_ballots(self) -> int:
+        """The total number of ballots."""
+        return int(self.counts.sum())
+
+    @property
+    def nbytes(self) -> int:
+        """The memory used by the arrays, excluding the codebook."""
+        return self.rankings.nbytes + self.counts.nbytes + self.lengths.nbytes
+
+    def ranking(self, index: int) -> Tuple[str, ...]:
+        """
+        Returns one distinct ranking as candidate names.
+
+        Args:
+            index (int): The row of the ranking.
+
+        Returns:
+            Tuple[str, ...]: The ranked candidates, most preferred first.
+        """
+        codes = self.rankings[index, : self.lengths[index]]
+        return tuple(self.candidates[code] for code in codes.tolist())
+
+    def to_dict(self) -> Dict[Tuple[str, ...], int]:
+        """
+        Expands the profile into the `{ranking_tuple: count}` form, in the order
+        of its rows.
+
+        For a profile from `build_profile`, the rankings are tuples of the
+        candidate strings of the CVR without its blank cells. Only a profile
+        encoded with `keep_blanks`, as in `parse_election_data`, gives that
+        function's ballots, NaN candidates included.
+
+        Returns:
+            Dict[Tuple[str, ...], int]: The count of each ranking of candidates.
+        """
+        return {
+            tuple(self.candidates[code] for code in row if code != PADDING): count
+            for row, count in zip(self.rankings.tolist(), self.counts.tolist())
+        }
+
+    @classmethod
+    def from_dict(
+        cls,
+        ballots: Dict[Tuple[str, ...], int],
+        candidates: Optional[List[str]] = None,
+    ) -> "BallotProfile":
+        """
+        Encodes ballots in the `{ranking_tuple: count}` form.
+
+        Args:
+            ballots (Dict[Tuple[str, ...], int]): The count of each ranking.
+            candidates (List[str], optional): The codebook to use, e.g. the
+                candidates returned by `parse_election_data`. Defaults to the
+                candidates in order of first appearance in `ballots`.
+
+        Returns:
+            BallotProfile: The encoded profile; `to_dict` gives `ballots` back.
+        """
+        if candidates is None:
+            candidates = list(
+                dict.fromkeys(name for ranking in ballots for name in ranking)
+            )
+        codebook = {name: code for code, name in enumerate(candidates)}
+        width = max((len(ranking) for ranking in ballots), default=0)
+        rankings = np.full((len(ballots), width), PADDING, dtype=np.int64)
+        for row, ranking in enumerate(ballots):
+            rankings[row, : len(ranking)] = [codebook[name] for name in ranking]
+        return cls(candidates, rankings, np.fromiter(ballots.values(), np.int64))
+
+    def save(self, path: str) -> None:
+        """
+        Writes the profile as a compressed `.npz` artifact, atomically.
+
+        Args:
+            path (str): The path of the artifact, ending in `PROFILE_EXTENSION`.
+        """
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as f:
+            np.savez_compressed(
+                f,
+                candidates=np.array(self.candidates, dtype=str),
+                rankings=self.rankings,
+                counts=self.counts,
+            )
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "BallotProfile":
+        """
+        Loads a profile artifact written by `save`.
+
+        Args:
+            path (str): The path of the artifact.
+
+        Returns:
+            BallotProfile: The profile.
+        """
+        with np.load(path) as artifact:
+            return cls(
+                artifact["candidates"].tolist(),
+                artifact["rankings"],
+                artifact["counts"],
+            )
+
+    def save_dir(
+        self,
+        path: str,
+        source_sha256: Optional[str] = None,
+        ignore_values: Optional[List[str]] = None,
+        replace: bool = True,
+    ) -> None:
+        """
+        Writes the profile as a directory of uncompressed `.npy` arrays plus a
+        JSON header, replacing any earlier version atomically. If several
+        processes write the same profile at once, each of them succeeds and one
+        of their profiles is left in place.
+
+        Unlike the compressed `.npz` artifact, the arrays can be memory-mapped by
+        `load_dir`, so any number of processes share one copy in the page cache.
+
+        Args:
+            path (str): The directory, conventionally ending in
+                `PROFILE_DIR_SUFFIX`.
+            source_sha256 (str, optional): The SHA-256 of the CVR the profile
+                was built from, so readers can tell whether it is stale.
+            ignore_values (List[str], optional): The complete list of values
+                that were ignored. Defaults to `IGNORE_VALUES`.
+            replace (bool): Replace an existing profile directory. Without it,
+                a complete profile already at `path` is kept, and the directory
+                never disappears for readers; use this where identical content
+                is expected, as in a content-addressed store.
+        """
+        # Every writer gets its own temporary directory, so processes writing
+        # the same profile at once do not disturb each other
+        directory, name = os.path.split(os.path.abspath(path))
+        temp_path = tempfile.mkdtemp(prefix=f"{name}.tmp.", dir=directory)
+        try:
+            os.chmod(temp_path, PROFILE_DIR_MODE)
+            arrays = {
+                "candidates": np.array(self.candidates, dtype=str),
+                "rankings": self.rankings,
+                "counts": self.counts,
+                "lengths": self.lengths,
+            }
+            for array_name in PROFILE_ARRAYS:
+                np.save(
+                    os.path.join(temp_path, f"{array_name}.npy"), arrays[array_name]
+                )
+            if ignore_values is None:
+                ignore_values = IGNORE_VALUES
+            header = {
+                "format_version": PROFILE_FORMAT_VERSION,
+                "source_sha256": source_sha256,
+                "ignore_values": ignore_values,
+                "num_candidates": len(self.candidates),
+                "num_rankings": len(self),
+                "num_ballots": self.num_ballots,
+            }
+            with open(os.path.join(temp_path, PROFILE_HEADER_FILENAME), "w") as f:
+                json.dump(header, f, indent=2)
+
+            old_path = None
+            if replace:
+                # A directory cannot replace another one, so move the old one
+                # aside first (onto an empty directory, which a rename may replace)
+                old_path = tempfile.mkdtemp(prefix=f"{name}.old.", dir=directory)
+                with contextlib.suppress(FileNotFoundError):
+                    os.replace(path, old_path)
+            try:
+                os.rename(temp_path, path)
+            except OSError:
+                # Another writer put its profile in place first; keep it
+                if not os.path.exists(os.path.join(path, PROFILE_HEADER_FILENAME)):
+                    raise
+            if old_path is not None:
+                shutil.rmtree(old_path, ignore_errors=True)
+        finally:
+            shutil.rmtree(temp_path, ignore_errors=True)
+
+    @classmethod
+    def load_dir(cls, path: str, mmap: bool = True) -> "BallotProfile":
+        """
+        Loads a profile directory written by `save_dir`.
+
+        Args:
+            path (str): The profile directory.
+            mmap (bool): Memory-map the arrays read-only (`numpy.load` with
+                `mmap_mode="r"`) instead of reading them into memory.
+
+        Returns:
+            BallotProfile: The profile.
+
+        Raises:
+            ValueError: If the directory was written by a newer format version.
+        """
+        header = read_profile_header(path)
+        if header.get("format_version", 0) > PROFILE_FORMAT_VERSION:
+            raise ValueError(f"{path} uses an unsupported profile format")
+        arrays = {
+            name: np.load(
+                os.path.join(path, f"{name}.npy"), mmap_mode="r" if mmap else None
+            )
+            for name in PROFILE_ARRAYS
+        }
+        return cls(
+            arrays["candidates"].tolist(),
+            arrays["rankings"],
+            arrays["counts"],
+            arrays["lengths"],
+        )
+
+
+def read_profile_header(path: str) -> Dict:
+    """
+    Reads the JSON header of a profile directory.
+
+    Args:
+        path (str): The profile directory.
+
+    Returns:
+        Dict: The format version, source SHA-256, ignored values and sizes.
+    """
+    with open(os.path.join(path, PROFILE_HEADER_FILENAME)) as f:
+        return json.load(f)
+
+
+class ProfileBuilder:
+    """
+    Aggregates a CVR chunk by chunk into one `BallotProfile`.
+
+    Each chunk is encoded on its own with `encode_rankings`; its candidates are
+    then mapped onto a codebook shared by all chunks and its distinct rankings
+    are merged into a running table of counts. Memory therefore grows with the
+    number of distinct rankings, not with the number of ballots, and the result
+    is the same as encoding the whole file at once.
+    """
+
+    def __init__(self, ignore_values: Optional[List[str]] = None):
+        self.ignore_values = ignore_values
+        self.codebook: Dict[str, int] = {}
+        self.counts: Dict[Tuple[int, ...], int] = {}
+
+    def add(self, data: pd.DataFrame) -> None:
+        """
+        Adds a chunk of ballots.
+
+        Args:
+            data (pd.DataFrame): The rank columns of the chunk, in rank order,
+                read as strings.
+        """
+        candidates, rankings, counts = encode_rankings(data, self.ignore_values)
+        shared = np.array(
+            [self.codebook.setdefault(name, len(self.codebook)) for name in candidates]
+            + [PADDING],
+            dtype=np.int64,
+        )
+        for row, count in zip(shared[rankings].tolist(), counts.tolist()):
+            ranking = tuple(code for code in row if code != PADDING)
+            self.counts[ranking] = self.counts.get(ranking, 0) + count
+
+    def profile(self) -> BallotProfile:
+        """
+        Returns the profile of every ballot added so far.
+
+        Returns:
+            BallotProfile: The rankings in order of first appearance.
+        """
+        width = max((len(ranking) for ranking in self.counts), default=0)
+        rankings = np.full((len(self.counts), width), PADDING, dtype=np.int64)
+        for row, ranking in enumerate(self.counts):
+            rankings[row, : len(ranking)] = ranking
+        return BallotProfile(
+            list(self.codebook),
+            rankings,
+            np.fromiter(self.counts.values(), np.int64, count=len(self.counts)),
+        )
+
+
+def build_profile(
+    filename: str,
+    ignore_values: Optional[List[str]] = None,
+    chunk_rows: int = PROFILE_CHUNK_ROWS,
+) -> BallotProfile:
+    """
+    Aggregates a CVR into its distinct rankings and their counts, streaming it
+    in chunks of `chunk_rows` ballots so that multi-GB files fit in memory.
+
+    Every cell is read as a string. Blank cells and cells containing an ignored
+    value are skipped, and a candidate ranked twice on a ballot only keeps their
+    highest rank. `to_dict` on the result therefore gives rankings of candidate
+    strings without NaNs, unlike `parse_election_data`.
+
+    Args:
+        filename (str): The path of the CVR.
+        ignore_values (List[str], optional): Extra values to ignore on top of
+            `IGNORE_VALUES`.
+        chunk_rows (int): The number of ballots read at a time.
+
+    Returns:
+        BallotProfile: The aggregated profile.
+
+    Raises:
+        ValueError: If the CVR has no `rank1` column.
+    """
+    header = pd.read_csv(filename, nrows=0).columns.tolist()
+    rank_columns = get_rank_columns(header)
+    if not rank_columns:
+        raise ValueError(f"{filename} has no rank columns")
+
+    builder = ProfileBuilder(ignore_values)
+    with pd.read_csv(
+        filename, usecols=rank_columns, dtype=str, chunksize=chunk_rows
+    ) as chunks:
+        for chunk in chunks:
+            builder.add(chunk[rank_columns])
+    return builder.profile()
+
+
+def parse_election_data(
+    filename: str, ignore_values: Optional[List[str]] = None
+) -> Tuple[Dict[Tuple[str, ...], int], List[str]]:
+    """
+    A vectorized drop-in replacement for `parse_election_data` in the archived
+    `rcv_distribution.py`, returning the same ballots and candidates.
+
+    Like the original, the CVR is read whole with pandas' default types, cells
+    containing an ignored value are skipped, and blank cells are kept as NaN
+    candidates, including the distinct NaNs of a text column that pandas turns
+    into a float column once its ignored values are replaced (see
+    `encode_rankings`). `tests/test_ballots.py` compares both functions. Unlike
+    the original, `ignore_values` is not modified. Use
+    `build_profile` for files too large to load at once.
+
+    Args:
+        filename (str): The name of the file with election data.
+        ignore_values (List[str], optional): Extra values to ignore on top of
+            `IGNORE_VALUES`.
+
+    Returns:
+        Tuple[Dict[Tuple[str, ...], int], List[str]]: The count of each ballot (a
+        tuple of candidate names), and all the candidates in order of first
+        appearance.
+    """
+    data = pd.read_csv(filename, low_memory=False)
+    rank_columns = get_rank_columns(data.columns.tolist())
+    profile = BallotProfile(
+        *encode_rankings(data[rank_columns], ignore_values, keep_blanks=True)
+    )
+    return profile.to_dict(), profile.candidates
@@ -0,0 +1,414 @@
+"""
+This script benchmarks the stages of `process_data.py` on synthetic raw data.
+
+For each requested size it generates a `data/raw`-style tree in a temporary
+directory: a `SingleWinnerRCV.csv` metadata tab with RaceIDs following the
+`Jurisdiction_MMDDYYYY_Office` pattern, and one small rank-column CVR per race in
+`rcv_single`. A configurable fraction of the CVR filenames are near misses of
+their RaceID (a dropped letter, a changed case, a misspelled office, ...), so
+they fail the exact match and go through fuzzy matching.
+
+The pipeline is then driven non-interactively, stage by stage, with
+`process_data`'s data directories pointed at the synthetic tree:
+1.  `catalog`: parsing the metadata tabs into the `MetadataCatalog`.
+2.  `scan`: listing, fingerprinting and sniffing the raw files.
+3.  `exact`: exact matching.
+4.  `prescore`: scoring the top `FUZZY_TOP_K` suggestions of every unmatched
+    file with `prescore_fuzzy_matches`, as the interactive review does.
+5.  `fuzzy`: fuzzy matching of the near misses, auto-accepting unambiguous ones.
+6.  `profiles`: writing the aggregated ballot profiles.
+7.  `sqlite`: writing the SQLite elections database.
+
+The wall time and the peak Python memory (as traced by `tracemalloc`, which
+covers NumPy and pandas buffers but not worker processes) of every stage are
+printed as a table and can be saved as JSON to compare runs. Tracing slows down
+the Python-heavy stages several times over; use `--no-memory` for timings that
+are comparable with real runs.
+
+Usage:
+    python -m scripts.benchmark_processing [--sizes N [N ...]] [--near-miss FRACTION]
+                                           [--workers N] [--no-memory] [--json PATH]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+from scripts import process_data
+
+# --- Constants and Configuration ---
+
+# The file counts benchmarked by default
+DEFAULT_SIZES = [1000, 10000]
+
+# The share of CVR filenames that are near misses of their RaceID by default
+DEFAULT_NEAR_MISS = 0.05
+
+# The number of RaceIDs generated for every CVR, so some races have no file
+RACE_IDS_PER_FILE = 1.5
+
+# The number of ballots written to every synthetic CVR
+BALLOTS_PER_FILE = 50
+
+# The candidates of every synthetic race
+CANDIDATES = ["Adams", "Baker", "Clark", "Davis", "Evans"]
+
+# Offices used to build RaceIDs
+OFFICES = [
+    "Mayor",
+    "CityCouncil",
+    "CityCouncilDistrict",
+    "SchoolBoard",
+    "HouseDistrict",
+    "StateSenate",
+    "CountyCommission",
+    "BoardOfSupervisors",
+]
+
+# Election dates used to build RaceIDs
+DATES = ["11082022", "11072023", "06252024", "11052024", "03042025"]
+
+# The score above which an unambiguous fuzzy suggestion is accepted
+AUTO_ACCEPT_SCORE = 90.0
+
+# The election type and metadata tab of the synthetic races
+ELECTION_TYPE = "single"
+METADATA_FILENAME, DATA_DIRNAME = process_data.ELECTION_SOURCES[ELECTION_TYPE]
+
+# --- Function Definitions ---
+
+
+def make_race_ids(count: int, rng: random.Random) -> List[str]:
+    """
+    Generates distinct RaceIDs in the `Jurisdiction_MMDDYYYY_Office` format.
+
+    Args:
+        count (int): The number of RaceIDs.
+        rng (random.Random): The random number generator.
+
+    Returns:
+        List[str]: The RaceIDs.
+    """
+    jurisdictions = max(count // (len(OFFICES) * 2), 1)
+    race_ids = set()
+    while len(race_ids) < count:
+        jurisdiction = f"Town{rng.randrange(jurisdictions)}"
+        office = f"{rng.choice(OFFICES)}{rng.randrange(1, 10)}"
+        race_ids.add(f"{jurisdiction}_{rng.choice(DATES)}_{office}")
+    return sorted(race_ids)
+
+
+def near_miss(race_id: str, rng: random.Random) -> str:
+    """
+    Returns a filename that resembles a RaceID without being equal to it.
+
+    Args:
+        race_id (str): The RaceID.
+        rng (random.Random): The random number generator.
+
+    Returns:
+        str: The altered RaceID.
+    """
+    jurisdiction, date, office = race_id.split("_", 2)
+    position = rng.randrange(1, len(office))
+    variants = [
+        f"{jurisdiction}_{date}_{office[:position]}{office[position + 1 :]}",
+        f"{jurisdiction}_{date}_{office.lower()}",
+        f"{jurisdiction} {date} {office}",
+        f"{jurisdiction}_{date[4:]}_{office}",
+        f"{jurisdiction.upper()}_{date}_{office}",
+    ]
+    return rng.choice(variants)
+
+
+def write_cvr(path: str, rng: random.Random) -> None:
+    """
+    Writes a small rank-column CVR with random rankings.
+
+    Args:
+        path (str): Where to write the CVR.
+        rng (random.Random): The random number generator.
+    """
+    lines = [",".join(["BallotID"] + [f"rank{i + 1}" for i in range(3)])]
+    for ballot in range(BALLOTS_PER_FILE):
+        ranking = rng.sample(CANDIDATES, rng.randint(1, 3))
+        ranking += ["skipped"] * (3 - len(ranking))
+        lines.append(",".join([str(ballot + 1)] + ranking))
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def generate_raw_tree(
+    root: str, files: int, near_miss_fraction: float, seed: int = 0
+) -> Dict[str, int]:
+    """
+    Generates a synthetic raw data tree.
+
+    Args:
+        root (str): The directory that plays the role of `data/raw`.
+        files (int): The number of CVRs.
+        near_miss_fraction (float): The share of CVRs named after a near miss
+            of their RaceID.
+        seed (int): The random seed, so every size is reproducible.
+
+    Returns:
+        Dict[str, int]: The number of `race_ids`, `files` and `near_misses`.
+    """
+    rng = random.Random(seed)
+    race_ids = make_race_ids(int(files * RACE_IDS_PER_FILE), rng)
+    metadata_dir = os.path.join(root, "rcv_database")
+    data_dir = os.path.join(root, DATA_DIRNAME)
+    os.makedirs(metadata_dir)
+    os.makedirs(data_dir)
+
+    with open(os.path.join(metadata_dir, METADATA_FILENAME), "w") as f:
+        f.write("RaceID,Jurisdiction,Year\n")
+        for race_id in race_ids:
+            jurisdiction, date, _ = race_id.split("_", 2)
+            f.write(f"{race_id},{jurisdiction},{date[4:]}\n")
+
+    names = set()
+    near_misses = 0
+    for race_id in rng.sample(race_ids, files):
+        name = race_id
+        if rng.random() < near_miss_fraction:
+            name = near_miss(race_id, rng)
+        if name in names:
+            continue
+        names.add(name)
+        near_misses += name != race_id
+        write_cvr(os.path.join(data_dir, name + ".csv"), rng)
+    return {"race_ids": len(race_ids), "files": len(names), "near_misses": near_misses}
+
+
+def point_process_data_at(raw_dir: str, processed_dir: str) -> None:
+    """
+    Points the data directories of `process_data` at a synthetic tree.
+
+    Args:
+        raw_dir (str): The synthetic raw data directory.
+        processed_dir (str): Where the processed outputs go.
+    """
+    process_data.RAW_DATA_DIR = raw_dir
+    process_data.PROCESSED_DATA_DIR = processed_dir
+    process_data.METADATA_DIR = os.path.join(raw_dir, "rcv_database")
+    process_data.DOWNLOAD_FILTERS_PATH = os.path.join(raw_dir, ".download_filters.json")
+    os.makedirs(processed_dir, exist_ok=True)
+
+
+def time_stage(name: str, stage: Callable[[], object], timings: List[Dict]) -> object:
+    """
+    Runs a stage with its output silenced, recording its time and peak memory.
+
+    Args:
+        name (str): The name of the stage.
+        stage (Callable[[], object]): The stage to run.
+        timings (List[Dict]): Receives the `stage`, `seconds` and `peak_mib`
+            (None unless `tracemalloc` is tracing).
+
+    Returns:
+        object: The stage's return value.
+    """
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = stage()
+    seconds = time.perf_counter() - start
+    peak_mib = tracemalloc.get_traced_memory()[1] / 1024**2 if tracing else None
+    timings.append({"stage": name, "seconds": seconds, "peak_mib": peak_mib})
+    return result
+
+
+def run_pipeline(
+    raw_dir: str, processed_dir: str, workers: int
+) -> Tuple[List[Dict], int]:
+    """
+    Runs every processing stage once on a synthetic tree.
+
+    Args:
+        raw_dir (str): The synthetic raw data directory.
+        processed_dir (str): Where the processed outputs go.
+        workers (int): The number of worker processes.
+
+    Returns:
+        Tuple[List[Dict], int]: The time and peak memory of each stage, and the
+        number of files matched to a RaceID.
+    """
+    point_process_data_at(raw_dir, processed_dir)
+    timings = []
+    catalog = time_stage(
+        "catalog",
+        lambda: process_data.MetadataCatalog(process_data.METADATA_DIR, processed_dir),
+        timings,
+    )
+    context = process_data.ProcessingContext(
+        filters={},
+        match_options=process_data.MatchOptions(
+            decisions=process_data.DecisionCache(processed_dir),
+            auto_accept_score=AUTO_ACCEPT_SCORE,
+            interactive=False,
+        ),
+        manifest=process_data.ProcessingManifest(processed_dir),
+        catalog=catalog,
+        workers=workers,
+    )
+    filepaths = process_data.list_source_files(DATA_DIRNAME, {})
+
+    def scan() -> None:
+        context.scanned = process_data.scan_raw_files(
+            filepaths, context.manifest, workers
+        )
+
+    time_stage("scan", scan, timings)
+    result = time_stage(
+        "exact",
+        lambda: process_data.process_election_source(
+            ELECTION_TYPE, METADATA_FILENAME, filepaths, context
+        ),
+        timings,
+    )
+    # Scored on a copy, since fuzzy matching replaces the unmatched list
+    unmatched = list(result.unmatched)
+    race_ids = catalog.get_race_ids(METADATA_FILENAME)
+    time_stage(
+        "prescore",
+        lambda: process_data.prescore_fuzzy_matches(unmatched, race_ids),
+        timings,
+    )
+    time_stage(
+        "fuzzy", lambda: process_data.review_election_source(result, context), timings
+    )
+    time_stage("profiles", lambda: process_data.write_ballot_profiles(context), timings)
+    time_stage("sqlite", lambda: process_data.write_sqlite_database(context), timings)
+    return timings, len({r["filepath"] for r in result.matched})
+
+
+def print_report(
+    size: int, tree: Dict[str, int], timings: List[Dict], matched: int
+) -> None:
+    """
+    Prints the timings of one benchmark size.
+
+    Args:
+        size (int): The requested number of files.
+        tree (Dict[str, int]): The counts returned by `generate_raw_tree`.
+        timings (List[Dict]): The stage timings returned by `run_pipeline`.
+        matched (int): The number of files matched to a RaceID.
+    """
+    print(
+        f"\n--- {size} files: {tree['files']} CVRs, {tree['race_ids']} RaceIDs, "
+        f"{tree['near_misses']} near misses, {matched} matched ---"
+    )
+    print(f"{'Stage':<10} {'Seconds':>10} {'Peak MiB':>10}")
+    for timing in timings:
+        peak = "-" if timing["peak_mib"] is None else f"{timing['peak_mib']:.1f}"
+        print(f"{timing['stage']:<10} {timing['seconds']:>10.3f} {peak:>10}")
+    total = sum(t["seconds"] for t in timings)
+    print(f"{'total':<10} {total:>10.3f}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Parses the command line options.
+
+    Args:
+        argv (List[str], optional): The arguments to parse. Defaults to `sys.argv`.
+
+    Returns:
+        argparse.Namespace: The parsed options.
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark process_data.py on synthetic raw data."
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=DEFAULT_SIZES,
+        metavar="N",
+        help="The numbers of raw files to benchmark, e.g. 1000 10000 100000.",
+    )
+    parser.add_argument(
+        "--near-miss",
+        type=float,
+        default=DEFAULT_NEAR_MISS,
+        metavar="FRACTION",
+        help="The share of filenames that only nearly match their RaceID.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        metavar="N",
+        help="The number of worker processes of the scan and profile stages.",
+    )
+    parser.add_argument(
+        "--no-memory",
+        action="store_true",
+        help="Do not trace memory, which slows down the stages being timed.",
+    )
+    parser.add_argument(
+        "--json",
+        metavar="PATH",
+        help="Also save the results as JSON, to compare runs.",
+    )
+    parser.add_argument(
+        "--keep",
+        action="store_true",
+        help="Keep the synthetic trees instead of deleting them.",
+    )
+    args = parser.parse_args(argv)
+    if not 0 <= args.near_miss <= 1:
+        parser.error("--near-miss must be between 0 and 1")
+    return args
+
+
+# --- Main Execution ---
+
+
+def main(argv: Optional[List[str]] = None):
+    """
+    Main function to generate the synthetic trees and benchmark each size.
+    """
+    args = parse_args(argv)
+    results = []
+    if not args.no_memory:
+        tracemalloc.start()
+
+    for size in args.sizes:
+        root = tempfile.mkdtemp(prefix=f"process_benchmark_{size}_")
+        raw_dir = os.path.join(root, "raw")
+        print(f"Generating {size} synthetic CVRs in {root}...")
+        tree = generate_raw_tree(raw_dir, size, args.near_miss)
+        try:
+            timings, matched = run_pipeline(
+                raw_dir, os.path.join(root, "processed"), args.workers
+            )
+        finally:
+            if not args.keep:
+                shutil.rmtree(root)
+        print_report(size, tree, timings, matched)
+        results.append(
+            dict(tree, size=size, workers=args.workers, matched=matched, stages=timings)
+        )
+
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults saved to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,22 +6,120 @@ It performs two main tasks:
 2.  Downloads specific tabs from Google Sheets as CSV files.
 
 The script is designed to be run from the command line and will place the downloaded
-data into the appropriate subdirectories within the `data/raw` directory.
+data into the appropriate subdirectories within the `data/raw` directory. All requests
+share a single pooled `requests.Session`, and with `--jobs N` the sources are fetched
+concurrently by a bounded thread pool. Per-source timings are reported at the end.
+
+Dataverse archives are downloaded into a `.part` file next to a small JSON checkpoint,
+so an interrupted transfer resumes with an HTTP `Range` request instead of starting
+over. The completed archive is checked against the expected size and the CRC32 of
+every member before it is extracted.
+
+What was fetched for each source (ETag, Last-Modified, content length and SHA-256)
+is recorded in `data/raw/.download_manifest.json`. Later runs send conditional
+requests and skip sources that have not changed upstream. The manifest also lists the
+raw files written by the most recent run, so downstream steps know what changed.
+
+By default only archive members that are new or whose CRC32 and size differ from the
+file on disk are extracted, so unchanged CVRs keep their modification times. Large
+members are extracted in parallel, and `--prune` removes files that were dropped
+from an archive upstream.
+
+With `--store hardlink` (or `symlink`), every extracted CVR is moved into a
+content-addressed object store under `data/raw/.objects`, keyed by its SHA-256, and
+the per-dataset folders link into it. Byte-identical files across datasets and
+refreshes are kept once, and the manifest records the content hash of every file.
+
+With `--sidecars`, every extracted CVR also gets a dictionary-encoded Parquet copy
+next to it (`<name>.parquet`, rank columns stored as categoricals), which readers can
+load with `pandas.read_parquet(path, columns=[...])` far faster than the CSV. This
+stage requires the optional `pyarrow` package (`poetry install --extras parquet`).
+
+With `--async-sheets`, the Google Sheets tabs are fetched on an asyncio event loop
+alongside the Dataverse downloads. Requests are limited per host in concurrency and
+rate, retried with exponential backoff on HTTP 429 and 5xx responses, and streamed
+straight to disk.
+
+Sources are resolved through a pluggable backend. By default they come from the
+Dataverse and Google Sheets servers. `--source` points the script at a local mirror
+instead: either a directory (read through `file://` URLs) or a plain HTTP server
+serving that directory. `--mirror DIR` writes such a mirror while downloading, which
+makes offline bootstraps and reproducible benchmarks possible.
+
+Every dataset and tab download is measured: time to first byte, transfer time and
+throughput, extraction time, retries and whether the source was a cache hit (HTTP
+304 or unchanged content). One JSON line per source is appended to
+`data/raw/.download_metrics.jsonl`, so refresh performance can be tracked across
+runs, and a summary table is printed at the end.
+
+`--election-type`, `--jurisdiction` and `--year` restrict a run to a subset of the
+races. Only the Dataverse sets and `rcv_database` metadata tabs of the selected
+election types are fetched. With a jurisdiction or year filter, the Dataverse
+file-listing API is queried and only the matching CVRs are downloaded one by one
+instead of the whole dataset archive. The filters are saved to
+`data/raw/.download_filters.json`, and `process_data.py` restricts itself to the same
+subset.
 
 Usage:
-    python download_data.py
+    python -m scripts.download_data [--jobs N] [--chunk-size KIB] [--force]
+                                    [--extract-mode {changed,all}] [--extract-workers N]
+                                    [--prune] [--store {off,hardlink,symlink}]
+                                    [--sidecars] [--async-sheets]
+                                    [--host-concurrency N] [--host-rate PER_SECOND]
+                                    [--source DIR_OR_URL] [--mirror DIR]
+                                    [--metrics-file PATH]
+                                    [--election-type {proportional,single,sequential}]
+                                    [--jurisdiction NAME] [--year YYYY]
 """
 
+import argparse
+import asyncio
+import contextlib
+import email.utils
+import hashlib
+import importlib.util
+import io
+import json
 import os
+import random
+import re
+import shutil
+import threading
+import time
+import urllib.parse
+import urllib.request
 import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
+import pandas as pd
 import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from scripts.ballots import get_rank_columns
+from scripts.race_ids import matches_race_filters
 
 # --- Constants and Configuration ---
 
 # The base folder for all raw data
 BASE_DATA_FOLDER = os.path.join(os.path.dirname(__file__), "..", "data", "raw")
 
+# The manifest describing what was downloaded for each source
+MANIFEST_PATH = os.path.join(BASE_DATA_FOLDER, ".download_manifest.json")
+
+# Where per-source download metrics are appended, one JSON object per line
+METRICS_PATH = os.path.join(BASE_DATA_FOLDER, ".download_metrics.jsonl")
+
+# The filters of the most recent run, read by `process_data.py`
+FILTERS_PATH = os.path.join(BASE_DATA_FOLDER, ".download_filters.json")
+
+# The content-addressed store that dataset folders link into
+OBJECT_STORE_FOLDER = os.path.join(BASE_DATA_FOLDER, ".objects")
+
 # A mapping of Harvard Dataverse persistent IDs to their destination subfolders.
 HARVARD_DATAVERSE_SETS = {
     "doi:10.7910/DVN/STVUET": "rcv_proportional",
@@ -29,6 +127,14 @@ HARVARD_DATAVERSE_SETS = {
     "doi:10.7910/DVN/AMK8PJ": "rcv_single",
 }
 
+# The election type of each Dataverse subfolder and the `rcv_database` tab holding
+# the metadata of its races. These names match `ELECTION_SOURCES` in process_data.py.
+ELECTION_TYPES = {
+    "proportional": ("rcv_proportional", "ProportionalRCV"),
+    "single": ("rcv_single", "SingleWinnerRCV"),
+    "sequential": ("rcv_sequential", "OtherMultiWinnerRCV"),
+}
+
 # A mapping of Google Sheet identifiers to their destination subfolders
 # and the specific tabs to download.
 GOOGLE_SHEETS_CONFIG = {
@@ -64,123 +170,2173 @@ GOOGLE_SHEETS_CONFIG = {
     },
 }
 
+# The default number of sources downloaded at the same time.
+DEFAULT_JOBS = 1
+
+# The number of distinct hosts whose connection pools the session keeps alive.
+POOL_CONNECTIONS = 4
+
+# The default size of each chunk streamed to disk, in bytes.
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+# Suffixes of in-progress downloads and of their resume checkpoints.
+PART_SUFFIX = ".part"
+CHECKPOINT_SUFFIX = ".part.json"
+
+# How often (in bytes) the resume checkpoint is refreshed during a transfer.
+CHECKPOINT_INTERVAL = 64 * 1024 * 1024
+
+# How many times an interrupted transfer is resumed before giving up.
+MAX_RESUME_ATTEMPTS = 5
+
+# How archives are extracted: only new or changed members, or everything.
+EXTRACT_MODES = ("changed", "all")
+
+# The default number of threads extracting large archive members.
+DEFAULT_EXTRACT_WORKERS = 4
+
+# Archive members at least this large (in bytes) are extracted in parallel.
+PARALLEL_EXTRACT_THRESHOLD = 16 * 1024 * 1024
+
+# How extracted files are placed in the object store, if at all.
+STORE_MODES = ("off", "hardlink", "symlink")
+
+# The file extension of the columnar copies written next to each CVR.
+SIDECAR_EXTENSION = ".parquet"
+
+# The default per-host limits of the asyncio download path.
+DEFAULT_HOST_CONCURRENCY = 8
+DEFAULT_HOST_RATE = 10.0
+
+# HTTP statuses that the asyncio download path retries with exponential backoff.
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+MAX_HTTP_RETRIES = 5
+BACKOFF_BASE = 1.0
+MAX_BACKOFF = 60.0
+
+# Transient errors after which a partial download is kept and resumed.
+RESUMABLE_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.ChunkedEncodingError,
+    requests.exceptions.Timeout,
+)
+
+
+class DownloadManifest:
+    """
+    Records the validators and checksums of every downloaded source.
+
+    Entries are keyed by source URL. The manifest is shared by the download threads,
+    so every access goes through a lock.
+    """
+
+    def __init__(self, path: str = MANIFEST_PATH):
+        self.path = path
+        self.sources: Dict[str, Dict] = {}
+        self.changed_files: List[str] = []
+        self.removed_files: List[str] = []
+        self._lock = threading.Lock()
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self.sources = json.load(f).get("sources", {})
+        except FileNotFoundError:
+            pass
+        except json.JSONDecodeError:
+            print(f"Warning: Ignoring unreadable download manifest at {path}")
+
+    def get(self, url: str) -> Optional[Dict]:
+        """Returns the recorded entry for `url`, if any."""
+        with self._lock:
+            return self.sources.get(url)
+
+    def record(
+        self,
+        url: str,
+        entry: Dict,
+        changed_files: List[str],
+        removed_files: Optional[List[str]] = None,
+    ) -> None:
+        """
+        Stores the entry for `url` and notes which raw files were rewritten.
+
+        Args:
+            url (str): The source URL.
+            entry (Dict): The validators, size, checksum and files of the source.
+            changed_files (List[str]): Files written, relative to the raw folder.
+            removed_files (List[str], optional): Files deleted, relative to the raw
+                folder.
+        """
+        entry = dict(entry, updated=time.strftime("%Y-%m-%dT%H:%M:%S%z"))
+        with self._lock:
+            self.sources[url] = entry
+            self.changed_files.extend(changed_files)
+            self.removed_files.extend(removed_files or [])
+
+    def referenced_objects(self) -> Set[str]:
+        """Returns the digests of every stored object that a source refers to."""
+        with self._lock:
+            return {
+                sha256
+                for entry in self.sources.values()
+                for sha256 in entry.get("objects", {}).values()
+            }
+
+    def save(self) -> None:
+        """Writes the manifest to disk atomically."""
+        with self._lock:
+            content = {
+                "sources": self.sources,
+                "changed_files": sorted(set(self.changed_files)),
+                "removed_files": sorted(set(self.removed_files)),
+            }
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(content, f, indent=2, sort_keys=True)
+        os.replace(temp_path, self.path)
+
+
+@dataclass
+class SourceMetrics:
+    """Measurements of a single dataset or tab download."""
+
+    kind: str
+    source: str
+    url: str
+    status: str = "failed"
+    cache_hit: bool = False
+    ttfb_seconds: Optional[float] = None
+    transfer_seconds: float = 0.0
+    bytes_received: int = 0
+    extract_seconds: float = 0.0
+    retries: int = 0
+    total_seconds: float = 0.0
+
+    @property
+    def bytes_per_second(self) -> Optional[float]:
+        """The transfer throughput, or None if nothing was transferred."""
+        if not self.bytes_received or not self.transfer_seconds:
+            return None
+        return self.bytes_received / self.transfer_seconds
+
+
+class MetricsRecorder:
+    """
+    Collects the `SourceMetrics` of a run and appends them to a JSON-lines file.
+
+    Downloads finish on several threads, so every access goes through a lock.
+    """
+
+    def __init__(self, path: str = METRICS_PATH):
+        self.path = path
+        self.run_started = time.strftime("%Y-%m-%dT%H:%M:%S%z")
+        self.records: List[SourceMetrics] = []
+        self._lock = threading.Lock()
+
+    def add(self, metrics: SourceMetrics) -> None:
+        """Adds the measurements of a finished download."""
+        with self._lock:
+            self.records.append(metrics)
+
+    def save(self) -> None:
+        """Appends one JSON line per recorded download to the metrics file."""
+        with self._lock:
+            lines = [
+                json.dumps(
+                    dict(
+                        asdict(metrics),
+                        run_started=self.run_started,
+                        bytes_per_second=metrics.bytes_per_second,
+                    ),
+                    sort_keys=True,
+                )
+                for metrics in self.records
+            ]
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.writelines(f"{line}\n" for line in lines)
+
+
+class SourceBackend:
+    """
+    Resolves Dataverse persistent IDs and Google Sheets tabs to download URLs.
+
+    The base class points at the upstream servers. Subclasses can serve the same
+    sources from elsewhere without changing any of the download logic.
+    """
+
+    def dataset_url(self, persistent_id: str) -> str:
+        """Returns the URL of the zip archive of a Dataverse dataset."""
+        return f"https://dataverse.harvard.edu/api/access/dataset/:persistentId/?persistentId={persistent_id}"
+
+    def dataset_files_url(self, persistent_id: str) -> Optional[str]:
+        """Returns the URL listing the files of a Dataverse dataset, if any."""
+        return f"https://dataverse.harvard.edu/api/datasets/:persistentId/versions/:latest-published/files?persistentId={persistent_id}"
+
+    def datafile_url(self, file_id: int, original: bool) -> str:
+        """Returns the URL of a single Dataverse file, in its original format."""
+        url = f"https://dataverse.harvard.edu/api/access/datafile/{file_id}"
+        return f"{url}?format=original" if original else url
+
+    def sheet_tab_url(self, sheet_id: str, tab_name: str) -> str:
+        """Returns the URL of the CSV export of a Google Sheet tab."""
+        # URL encode the tab name to handle spaces and other special characters
+        encoded_tab_name = requests.utils.quote(tab_name)
+        return f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={encoded_tab_name}"
+
+
+class MirrorBackend(SourceBackend):
+    """
+    Serves the sources from a mirror laid out by `mirror_dataset_relpath` and
+    `mirror_sheet_tab_relpath`.
+
+    The mirror can be a local directory, a `file://` URL, or the URL of any plain
+    HTTP server serving such a directory (for example `python -m http.server`).
+    """
+
+    def __init__(self, location: str):
+        if "://" not in location:
+            location = Path(location).resolve().as_uri()
+        self.base_url = location.rstrip("/")
+
+    def dataset_url(self, persistent_id: str) -> str:
+        """Returns the URL of the mirrored archive of a Dataverse dataset."""
+        relpath = mirror_dataset_relpath(persistent_id)
+        return f"{self.base_url}/{urllib.parse.quote(relpath)}"
+
+    def dataset_files_url(self, persistent_id: str) -> Optional[str]:
+        """Mirrors hold whole archives only, so they have no file listing."""
+        return None
+
+    def sheet_tab_url(self, sheet_id: str, tab_name: str) -> str:
+        """Returns the URL of the mirrored CSV of a Google Sheet tab."""
+        relpath = mirror_sheet_tab_relpath(sheet_id, tab_name)
+        return f"{self.base_url}/{urllib.parse.quote(relpath)}"
+
+
+class LocalFileAdapter(BaseAdapter):
+    """
+    Lets a `requests.Session` serve `file://` URLs like a simple HTTP server.
+
+    It answers with the ETag, Last-Modified and Content-Length headers, honours
+    `Range`/`If-Range` and `If-None-Match`, and returns 404 for missing files. A
+    mirror directory therefore goes through the same resumable, conditional
+    download logic as the upstream servers.
+    """
+
+    def send(self, request, stream=False, **kwargs):
+        """Answers a GET request for a local file."""
+        path = urllib.request.url2pathname(urllib.parse.urlsplit(request.url).path)
+        response = requests.Response()
+        response.url = request.url
+        response.request = request
+        response.raw = io.BytesIO(b"")
+        response.headers = CaseInsensitiveDict()
+        if not os.path.isfile(path):
+            response.status_code = requests.codes.not_found
+            response.reason = "Not Found"
+            return response
+
+        stat = os.stat(path)
+        etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+        response.headers["ETag"] = etag
+        response.headers["Last-Modified"] = email.utils.formatdate(
+            stat.st_mtime, usegmt=True
+        )
+        if request.headers.get("If-None-Match") == etag:
+            response.status_code = requests.codes.not_modified
+            response.reason = "Not Modified"
+            return response
+
+        start = 0
+        range_header = request.headers.get("Range", "")
+        if range_header.startswith("bytes=") and request.headers.get(
+            "If-Range", etag
+        ) in (etag, response.headers["Last-Modified"]):
+            start = int(range_header[len("bytes=") :].split("-")[0])
+        if start >= stat.st_size > 0:
+            response.status_code = requests.codes.requested_range_not_satisfiable
+            response.headers["Content-Range"] = f"bytes */{stat.st_size}"
+            return response
+
+        response.status_code = requests.codes.partial_content if start else 200
+        response.reason = "OK"
+        if start:
+            end = stat.st_size - 1
+            response.headers["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+        response.headers["Content-Length"] = str(stat.st_size - start)
+        response.encoding = "utf-8"
+
+        if stream:
+            # The response owns the file and closes it once the body is read
+            response.raw = open(path, "rb")
+            response.raw.seek(start)
+        else:
+            with open(path, "rb") as f:
+                f.seek(start)
+                response.raw = io.BytesIO(f.read())
+        return response
+
+    def close(self) -> None:
+        """Nothing to release; files are closed with their responses."""
+
+
+@dataclass
+class DownloadFilters:
+    """Restricts a run to some election types, jurisdictions and years."""
+
+    election_types: List[str] = field(default_factory=list)
+    jurisdictions: List[str] = field(default_factory=list)
+    years: List[str] = field(default_factory=list)
+
+    @property
+    def active(self) -> bool:
+        """Whether any filter is set."""
+        return bool(self.election_types or self.jurisdictions or self.years)
+
+    @property
+    def selects_files(self) -> bool:
+        """Whether individual files, not whole datasets, have to be selected."""
+        return bool(self.jurisdictions or self.years)
+
+    def matches_type(self, election_type: str) -> bool:
+        """Checks an election type against the `--election-type` filter."""
+        return not self.election_types or election_type in self.election_types
+
+    def matches_file(self, filename: str) -> bool:
+        """
+        Checks a CVR filename (or RaceID) against the jurisdiction and year filters.
+
+        Names that do not follow the `Jurisdiction_MMDDYYYY_Office` pattern only
+        match when neither filter is set.
+        """
+        return matches_race_filters(filename, self.jurisdictions, self.years)
+
+    def save(self, path: str = FILTERS_PATH) -> None:
+        """Records the filters for `process_data.py`, or clears them if none is set."""
+        if not self.active:
+            if os.path.exists(path):
+                os.remove(path)
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(asdict(self), f, indent=2)
+
+
+@dataclass
+class DownloadOptions:
+    """Holds the settings shared by every download in a run."""
+
+    session: Optional[requests.Session] = None
+    backend: SourceBackend = field(default_factory=SourceBackend)
+    mirror_folder: Optional[str] = None
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+    manifest: Optional[DownloadManifest] = None
+    force: bool = False
+    extract_mode: str = "changed"
+    extract_workers: int = DEFAULT_EXTRACT_WORKERS
+    prune: bool = False
+    store: str = "off"
+    metrics: Optional[MetricsRecorder] = None
+    filters: DownloadFilters = field(default_factory=DownloadFilters)
+
+
+class DownloadVerificationError(Exception):
+    """Raised when a completed download does not have the expected size."""
+
+
 # --- Function Definitions ---
 
 
-def download_and_unzip(persistent_id: str, dest_folder: str) -> None:
+def create_session(jobs: int = DEFAULT_JOBS) -> requests.Session:
     """
-    Downloads and unzips a dataset from the Harvard Dataverse.
+    Creates a pooled HTTP session shared by all downloads.
+
+    Connections are kept alive between requests, and each host gets at most `jobs`
+    open connections. Workers block until a connection to their host is free.
+
+    Args:
+        jobs (int): The maximum number of concurrent connections per host.
+
+    Returns:
+        requests.Session: The configured session.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=POOL_CONNECTIONS, pool_maxsize=jobs, pool_block=True
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.mount("file://", LocalFileAdapter())
+    return session
+
+
+def mirror_dataset_relpath(persistent_id: str) -> str:
+    """
+    Returns where a Dataverse archive lives inside a mirror.
 
     Args:
         persistent_id (str): The persistent identifier of the dataset.
-        dest_folder (str): The local directory to save the unzipped data.
+
+    Returns:
+        str: A path such as `dataverse/doi_10.7910_DVN_STVUET.zip`.
     """
-    # Construct the API URL for the dataset
-    url = f"https://dataverse.harvard.edu/api/access/dataset/:persistentId/?persistentId={persistent_id}"
+    safe_id = persistent_id.replace(":", "_").replace("/", "_")
+    return f"dataverse/{safe_id}.zip"
 
-    # Ensure the destination folder exists
-    os.makedirs(dest_folder, exist_ok=True)
 
-    print(f"Downloading dataset {persistent_id}...")
+def mirror_sheet_tab_relpath(sheet_id: str, tab_name: str) -> str:
+    """
+    Returns where a Google Sheet tab lives inside a mirror.
+
+    Args:
+        sheet_id (str): The identifier of the Google Sheet.
+        tab_name (str): The name of the tab.
+
+    Returns:
+        str: A path such as `sheets/<sheet_id>/SingleWinnerRCV.csv`.
+    """
+    filename = os.path.basename(get_sheet_tab_path("", tab_name))
+    return f"sheets/{sheet_id}/{filename}"
+
+
+def _mirror_path(options: DownloadOptions, relpath: str) -> Optional[str]:
+    """Returns the path of a mirror file, or None if no mirror is being written."""
+    if options.mirror_folder is None:
+        return None
+    return os.path.join(options.mirror_folder, *relpath.split("/"))
+
+
+def _update_mirror(src_path: str, mirror_path: Optional[str]) -> None:
+    """
+    Copies a freshly downloaded file into the mirror being written.
+
+    A hard link is used where possible, so mirroring costs no extra disk space.
+
+    Args:
+        src_path (str): The downloaded file.
+        mirror_path (str, optional): Its place in the mirror, or None.
+    """
+    if mirror_path is None:
+        return
+    os.makedirs(os.path.dirname(mirror_path), exist_ok=True)
+    temp_path = mirror_path + ".tmp"
+    if os.path.lexists(temp_path):
+        os.remove(temp_path)
+    try:
+        os.link(src_path, temp_path)
+    except OSError:
+        shutil.copy2(src_path, temp_path)
+    os.replace(temp_path, mirror_path)
+
+
+def _read_checkpoint(part_path: str) -> Dict:
+    """
+    Reads the resume checkpoint stored next to a partial download.
+
+    Args:
+        part_path (str): The path of the `.part` file.
+
+    Returns:
+        Dict: The checkpoint, or an empty dict if there is no usable checkpoint.
+    """
+    checkpoint_path = part_path[: -len(PART_SUFFIX)] + CHECKPOINT_SUFFIX
     try:
-        response = requests.get(url, stream=True, timeout=30)
+        with open(checkpoint_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _write_checkpoint(part_path: str, checkpoint: Dict) -> None:
+    """
+    Writes the resume checkpoint of a partial download.
+
+    Args:
+        part_path (str): The path of the `.part` file.
+        checkpoint (Dict): The URL, validator, offset and expected size.
+    """
+    checkpoint_path = part_path[: -len(PART_SUFFIX)] + CHECKPOINT_SUFFIX
+    with open(checkpoint_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+
+
+def _get_validator(response: requests.Response) -> Optional[str]:
+    """
+    Picks the response header that identifies this exact version of the resource.
+
+    Weak ETags cannot be used with `If-Range`, so `Last-Modified` is used instead.
+
+    Args:
+        response (requests.Response): The response to inspect.
+
+    Returns:
+        Optional[str]: A strong ETag, a Last-Modified date, or None.
+    """
+    etag = response.headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return response.headers.get("Last-Modified")
+
+
+def _get_expected_size(response: requests.Response) -> Optional[int]:
+    """
+    Determines the full size of the resource being downloaded.
+
+    Args:
+        response (requests.Response): A full (200) or partial (206) response.
+
+    Returns:
+        Optional[int]: The total size in bytes, or None if the server did not say.
+    """
+    content_range = response.headers.get("Content-Range", "")
+    if "/" in content_range and not content_range.endswith("/*"):
+        return int(content_range.rsplit("/", 1)[1])
+    content_length = response.headers.get("Content-Length")
+    if response.status_code == requests.codes.ok and content_length:
+        return int(content_length)
+    return None
+
+
+def _resume_offset(part_path: str, checkpoint: Dict, url: str) -> int:
+    """
+    Works out where an interrupted download of `url` can safely resume.
+
+    The partial file is truncated to the last checkpointed offset, since bytes past
+    it may not have been flushed completely.
+
+    Args:
+        part_path (str): The path of the `.part` file.
+        checkpoint (Dict): The checkpoint read from disk.
+        url (str): The URL being downloaded.
+
+    Returns:
+        int: The byte offset to resume from, or 0 to start over.
+    """
+    if not os.path.exists(part_path):
+        return 0
+    if checkpoint.get("url") != url or not checkpoint.get("validator"):
+        return 0
+    offset = min(checkpoint.get("offset", 0), os.path.getsize(part_path))
+    with open(part_path, "r+b") as f:
+        f.truncate(offset)
+    return offset
+
+
+def conditional_headers(previous: Optional[Dict]) -> Dict[str, str]:
+    """
+    Builds the headers that ask the server to skip an unchanged resource.
+
+    Args:
+        previous (Dict, optional): The manifest entry from an earlier download.
+
+    Returns:
+        Dict[str, str]: `If-None-Match` and/or `If-Modified-Since` headers.
+    """
+    headers = {}
+    if previous and previous.get("etag"):
+        headers["If-None-Match"] = previous["etag"]
+    if previous and previous.get("last_modified"):
+        headers["If-Modified-Since"] = previous["last_modified"]
+    return headers
+
+
+def _finish_metrics(
+    options: DownloadOptions, metrics: SourceMetrics, start: float
+) -> None:
+    """Stamps the total elapsed time on `metrics` and hands them to the recorder."""
+    metrics.total_seconds = time.perf_counter() - start
+    if options.metrics is not None:
+        options.metrics.add(metrics)
+
+
+def _transfer(
+    url: str,
+    part_path: str,
+    options: DownloadOptions,
+    previous: Optional[Dict],
+    metrics: Optional[SourceMetrics] = None,
+) -> Optional[Dict]:
+    """
+    Streams `url` into `part_path`, continuing a previous partial download if the
+    server still has the same version of the resource.
+
+    Args:
+        url (str): The URL to download.
+        part_path (str): The path of the `.part` file.
+        options (DownloadOptions): The session and chunk size to use.
+        previous (Dict, optional): The manifest entry used for a conditional request
+            when there is no partial download to resume.
+        metrics (SourceMetrics, optional): Receives the time to first byte, transfer
+            time and number of bytes received.
+
+    Returns:
+        Optional[Dict]: The final checkpoint, including the number of bytes on disk
+        and the expected total size, or None if the server reported no change.
+    """
+    http = options.session or requests
+    checkpoint = _read_checkpoint(part_path)
+    offset = _resume_offset(part_path, checkpoint, url)
+
+    if offset:
+        headers = {"Range": f"bytes={offset}-", "If-Range": checkpoint["validator"]}
+    else:
+        headers = conditional_headers(previous)
+
+    metrics = metrics or SourceMetrics("", "", url)
+    start = time.perf_counter()
+    with http.get(url, stream=True, timeout=30, headers=headers) as response:
+        if metrics.ttfb_seconds is None:
+            metrics.ttfb_seconds = time.perf_counter() - start
+        if response.status_code == requests.codes.not_modified:
+            return None
+        if response.status_code == requests.codes.requested_range_not_satisfiable:
+            # The previous attempt already received every byte
+            return checkpoint
         response.raise_for_status()  # Raise an exception for bad status codes
 
-        zip_path = os.path.join(dest_folder, "dataverse_files.zip")
-        with open(zip_path, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+        if response.status_code != requests.codes.partial_content:
+            offset = 0  # The server ignored the range, so start over
+        elif offset:
+            print(f"Resuming download at byte {offset}...")
 
-        print(f"Unzipping dataset {persistent_id}...")
-        with zipfile.ZipFile(zip_path, "r") as zip_ref:
-            zip_ref.extractall(dest_folder)
+        checkpoint = {
+            "url": url,
+            "validator": _get_validator(response),
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "expected_size": _get_expected_size(response),
+            "offset": offset,
+        }
+        _write_checkpoint(part_path, checkpoint)
 
-        # Clean up by removing the downloaded zip file
-        os.remove(zip_path)
+        last_saved = offset
+        with open(part_path, "ab" if offset else "wb") as f:
+            try:
+                for chunk in response.iter_content(chunk_size=options.chunk_size):
+                    f.write(chunk)
+                    checkpoint["offset"] += len(chunk)
+                    metrics.bytes_received += len(chunk)
+                    if checkpoint["offset"] - last_saved >= CHECKPOINT_INTERVAL:
+                        f.flush()
+                        last_saved = checkpoint["offset"]
+                        _write_checkpoint(part_path, checkpoint)
+            finally:
+                f.flush()
+                _write_checkpoint(part_path, checkpoint)
+                metrics.transfer_seconds += time.perf_counter() - start
 
-        print(
-            f"Successfully downloaded and unzipped dataset {persistent_id} "
-            f"to {dest_folder}."
-        )
+    return checkpoint
 
-    except requests.exceptions.RequestException as e:
-        print(f"Error downloading dataset {persistent_id}: {e}")
-    except zipfile.BadZipFile:
-        print(
-            f"Error: The downloaded file for {persistent_id} is not a valid zip file."
+
+def file_sha256(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> str:
+    """
+    Computes the SHA-256 hex digest of a file.
+
+    Args:
+        path (str): The file to hash.
+        chunk_size (int): The number of bytes read at a time.
+
+    Returns:
+        str: The hex digest.
+    """
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            sha256.update(block)
+    return sha256.hexdigest()
+
+
+def download_resumable(
+    url: str,
+    dest_path: str,
+    options: DownloadOptions,
+    previous: Optional[Dict] = None,
+    metrics: Optional[SourceMetrics] = None,
+) -> Optional[Dict]:
+    """
+    Downloads `url` to `dest_path`, resuming after dropped connections.
+
+    Progress is kept in `<dest_path>.part` with a JSON checkpoint beside it. Both
+    survive a failed run, so the next run picks up where this one stopped.
+
+    Args:
+        url (str): The URL to download.
+        dest_path (str): Where the completed file is placed.
+        options (DownloadOptions): The session and chunk size to use.
+        previous (Dict, optional): The manifest entry of an earlier download, used
+            to make the request conditional.
+        metrics (SourceMetrics, optional): Receives the transfer measurements and
+            the number of retries.
+
+    Returns:
+        Optional[Dict]: The ETag, Last-Modified, content length and SHA-256 of the
+        completed file, or None if the server reported that it has not changed.
+
+    Raises:
+        requests.exceptions.RequestException: If the transfer keeps failing.
+        DownloadVerificationError: If the file does not have the expected size.
+    """
+    part_path = dest_path + PART_SUFFIX
+    for attempt in range(1, MAX_RESUME_ATTEMPTS + 1):
+        try:
+            checkpoint = _transfer(url, part_path, options, previous, metrics)
+            break
+        except RESUMABLE_ERRORS as e:
+            if attempt == MAX_RESUME_ATTEMPTS:
+                raise
+            if metrics is not None:
+                metrics.retries += 1
+            print(f"Connection interrupted ({e}). Retrying ({attempt})...")
+
+    if checkpoint is None:
+        return None
+
+    os.remove(dest_path + CHECKPOINT_SUFFIX)
+    size, expected_size = checkpoint["offset"], checkpoint["expected_size"]
+    if expected_size is not None and size != expected_size:
+        os.remove(part_path)
+        raise DownloadVerificationError(
+            f"expected {expected_size} bytes but received {size}"
         )
-    except Exception as e:
-        print(f"An unexpected error occurred: {e}")
 
+    sha256 = file_sha256(part_path, options.chunk_size)
+    os.replace(part_path, dest_path)
+    return {
+        "url": url,
+        "etag": checkpoint.get("etag"),
+        "last_modified": checkpoint.get("last_modified"),
+        "content_length": size,
+        "sha256": sha256,
+    }
 
-def download_google_sheet_tab(sheet_id: str, tab_name: str, dest_folder: str) -> None:
+
+def _raw_relpath(path: str) -> str:
+    """Returns `path` relative to the raw data folder, with forward slashes."""
+    return os.path.relpath(path, BASE_DATA_FOLDER).replace(os.sep, "/")
+
+
+def _previous_entry(
+    url: str, options: DownloadOptions, mirror_path: Optional[str] = None
+) -> Optional[Dict]:
     """
-    Downloads a specific tab from a Google Sheet as a CSV file.
+    Looks up the manifest entry of an earlier download of `url`.
+
+    The entry is only returned if every file it produced is still on disk (and,
+    when a mirror is being written, the mirror copy exists), so a deleted file is
+    always downloaded again.
 
     Args:
-        sheet_id (str): The identifier of the Google Sheet.
-        tab_name (str): The name of the tab to download.
-        dest_folder (str): The local directory to save the CSV file.
+        url (str): The source URL.
+        options (DownloadOptions): The run settings holding the manifest.
+        mirror_path (str, optional): The mirror copy the source should have.
+
+    Returns:
+        Optional[Dict]: The usable entry, or None.
     """
-    # URL encode the tab name to handle spaces and other special characters
-    encoded_tab_name = requests.utils.quote(tab_name)
-    url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={encoded_tab_name}"
+    if options.manifest is None or options.force:
+        return None
+    if mirror_path is not None and not os.path.exists(mirror_path):
+        return None
+    previous = options.manifest.get(url)
+    if not previous or not all(
+        os.path.exists(os.path.join(BASE_DATA_FOLDER, relpath))
+        for relpath in previous.get("files", [])
+    ):
+        return None
+    return previous
 
-    # Ensure the destination folder exists
-    os.makedirs(dest_folder, exist_ok=True)
 
-    print(f"Downloading tab '{tab_name}' from sheet {sheet_id}...")
-    try:
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
+def _record_download(
+    options: DownloadOptions,
+    entry: Dict,
+    changed_files: List[str],
+    removed_files: Optional[List[str]] = None,
+) -> None:
+    """Stores a download in the manifest, if one is in use."""
+    if options.manifest is not None:
+        options.manifest.record(entry["url"], entry, changed_files, removed_files)
 
-        if response.content:
-            # Sanitize the tab name to create a safe filename
-            safe_filename = (
-                "".join(c for c in tab_name if c.isalnum() or c in (" ", "_"))
-                .rstrip()
-                .replace(" ", "_")
-            )
-            file_path = os.path.join(dest_folder, f"{safe_filename}.csv")
 
-            with open(file_path, "w", encoding="utf-8") as f:
-                f.write(response.text)
+def verify_zip(zip_path: str) -> None:
+    """
+    Checks the CRC32 checksum of every member of a zip archive.
 
-            print(f"Successfully downloaded tab '{tab_name}' to {file_path}.")
-        else:
-            print(
-                f"Warning: No content for tab '{tab_name}' from sheet {sheet_id}. "
-                "It might be empty."
-            )
+    Args:
+        zip_path (str): The path of the archive.
 
-    except requests.exceptions.RequestException as e:
-        print(f"Error downloading tab '{tab_name}': {e}")
-    except Exception as e:
-        print(f"An unexpected error occurred: {e}")
+    Raises:
+        zipfile.BadZipFile: If the archive is unreadable or a member is corrupt.
+    """
+    with zipfile.ZipFile(zip_path, "r") as zip_ref:
+        bad_member = zip_ref.testzip()
+    if bad_member is not None:
+        raise zipfile.BadZipFile(f"CRC check failed for member {bad_member}")
 
 
-# --- Main Execution ---
+def _member_is_current(info: zipfile.ZipInfo, path: str) -> bool:
+    """
+    Checks whether the file at `path` already holds the archive member's content.
+
+    The size is compared first, so the CRC32 is only computed for likely matches.
 
+    Args:
+        info (zipfile.ZipInfo): The archive member.
+        path (str): Where the member would be extracted.
 
-def main():
+    Returns:
+        bool: True if the file exists with the same size and CRC32.
     """
-    Main function to orchestrate the data download process.
+    if not os.path.isfile(path) or os.path.getsize(path) != info.file_size:
+        return False
+    crc = 0
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(DEFAULT_CHUNK_SIZE), b""):
+            crc = zlib.crc32(block, crc)
+    return crc == info.CRC
+
+
+def _member_target(info: zipfile.ZipInfo, dest_folder: str) -> Optional[str]:
     """
-    print("--- Starting Data Download Process ---")
+    Resolves where an archive member is extracted, refusing paths that would
+    escape the destination folder.
 
-    # Download and unzip each dataset from Harvard Dataverse
-    print("\n--- Downloading Harvard Dataverse Datasets ---")
-    for dataset_id, subfolder in HARVARD_DATAVERSE_SETS.items():
-        dataset_folder = os.path.join(BASE_DATA_FOLDER, subfolder)
-        download_and_unzip(dataset_id, dataset_folder)
+    Args:
+        info (zipfile.ZipInfo): The archive member.
+        dest_folder (str): The extraction folder.
 
-    # Download each specified tab from each Google Sheet
-    print("\n--- Downloading Google Sheets Tabs ---")
-    for sheet_name, sheet_info in GOOGLE_SHEETS_CONFIG.items():
-        print(f"\nProcessing Google Sheet: {sheet_name}")
+    Returns:
+        Optional[str]: The target path, or None if the member name is unsafe.
+    """
+    root = os.path.abspath(dest_folder)
+    target = os.path.abspath(os.path.join(root, info.filename))
+    if os.path.commonpath([root, target]) != root:
+        print(f"Warning: Skipping archive member with unsafe path {info.filename}")
+        return None
+    return target
+
+
+def _write_member(archive: zipfile.ZipFile, info: zipfile.ZipInfo, target: str) -> None:
+    """
+    Writes an archive member to `target` through a temporary file, so an
+    interrupted extraction never leaves a truncated CVR behind.
+
+    Args:
+        archive (zipfile.ZipFile): An open archive.
+        info (zipfile.ZipInfo): The member to write.
+        target (str): The destination path.
+    """
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    temp_path = target + ".tmp"
+    with archive.open(info) as src, open(temp_path, "wb") as dst:
+        shutil.copyfileobj(src, dst, DEFAULT_CHUNK_SIZE)
+    os.replace(temp_path, target)
+
+
+def _extract_if_changed(
+    zip_path: str,
+    info: zipfile.ZipInfo,
+    dest_folder: str,
+    zip_ref: Optional[zipfile.ZipFile] = None,
+) -> Optional[str]:
+    """
+    Extracts a single archive member unless an identical file is already on disk.
+
+    Args:
+        zip_path (str): The path of the archive.
+        info (zipfile.ZipInfo): The member to extract.
+        dest_folder (str): The extraction folder.
+        zip_ref (zipfile.ZipFile, optional): An open handle to reuse. Worker threads
+            pass None and open their own.
+
+    Returns:
+        Optional[str]: The path written, or None if the member was unchanged.
+    """
+    target = _member_target(info, dest_folder)
+    if target is None or _member_is_current(info, target):
+        return None
+
+    if zip_ref is not None:
+        _write_member(zip_ref, info, target)
+    else:
+        with zipfile.ZipFile(zip_path, "r") as archive:
+            _write_member(archive, info, target)
+    return target
+
+
+def extract_changed_members(
+    zip_path: str, dest_folder: str, workers: int = DEFAULT_EXTRACT_WORKERS
+) -> List[str]:
+    """
+    Extracts only the archive members that are new or differ from the files on disk.
+
+    Small members are extracted one after another through a single archive handle.
+    Members of at least `PARALLEL_EXTRACT_THRESHOLD` bytes are spread over a thread
+    pool, each thread reading through its own handle.
+
+    Args:
+        zip_path (str): The path of the archive.
+        dest_folder (str): The extraction folder.
+        workers (int): The number of threads extracting large members.
+
+    Returns:
+        List[str]: The paths of the files that were written.
+    """
+    written = []
+    with zipfile.ZipFile(zip_path, "r") as zip_ref:
+        members = [info for info in zip_ref.infolist() if not info.is_dir()]
+        large = [m for m in members if m.file_size >= PARALLEL_EXTRACT_THRESHOLD]
+        small = [m for m in members if m.file_size < PARALLEL_EXTRACT_THRESHOLD]
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_extract_if_changed, zip_path, info, dest_folder)
+                for info in large
+            ]
+            for info in small:
+                written.append(
+                    _extract_if_changed(zip_path, info, dest_folder, zip_ref)
+                )
+            written.extend(future.result() for future in futures)
+
+    return [path for path in written if path is not None]
+
+
+def extract_archive(
+    zip_path: str, dest_folder: str, options: DownloadOptions
+) -> Tuple[List[str], List[str]]:
+    """
+    Extracts an archive using the configured extraction mode.
+
+    In "all" mode every member is still written through a temporary file, so a
+    dataset file that is a link into the object store is replaced rather than
+    written through.
+
+    Args:
+        zip_path (str): The path of the archive.
+        dest_folder (str): The extraction folder.
+        options (DownloadOptions): The extraction mode and number of workers.
+
+    Returns:
+        Tuple[List[str], List[str]]: Every file in the archive and the files that
+        were written, both relative to the raw data folder.
+    """
+    with zipfile.ZipFile(zip_path, "r") as zip_ref:
+        infos = [info for info in zip_ref.infolist() if not info.is_dir()]
+        names = [info.filename for info in infos]
+        if options.extract_mode == "all":
+            for info in infos:
+                target = _member_target(info, dest_folder)
+                if target is not None:
+                    _write_member(zip_ref, info, target)
+
+    members = [_raw_relpath(os.path.join(dest_folder, name)) for name in names]
+    if options.extract_mode == "all":
+        return members, members
+
+    written = extract_changed_members(zip_path, dest_folder, options.extract_workers)
+    print(f"{len(written)} of {len(names)} archive member(s) were new or changed.")
+    return members, [_raw_relpath(path) for path in written]
+
+
+def prune_vanished_files(
+    previous_files: List[str], current_files: List[str]
+) -> List[str]:
+    """
+    Deletes files that an earlier version of an archive produced but the current
+    version no longer contains.
+
+    Only files recorded in the manifest for the same source are ever removed.
+
+    Args:
+        previous_files (List[str]): Files from the earlier archive, relative to the
+            raw data folder.
+        current_files (List[str]): Files in the current archive, relative to the raw
+            data folder.
+
+    Returns:
+        List[str]: The files that were deleted.
+    """
+    removed = []
+    for relpath in sorted(set(previous_files) - set(current_files)):
+        path = os.path.join(BASE_DATA_FOLDER, relpath)
+        if os.path.isfile(path):
+            os.remove(path)
+            removed.append(relpath)
+            print(f"Removed {relpath}, which is no longer in the archive.")
+        sidecar_path = os.path.splitext(path)[0] + SIDECAR_EXTENSION
+        if os.path.isfile(sidecar_path):
+            os.remove(sidecar_path)
+    return removed
+
+
+def object_path(sha256: str) -> str:
+    """
+    Returns where the object with the given SHA-256 lives in the object store.
+
+    Args:
+        sha256 (str): The hex digest of the content.
+
+    Returns:
+        str: The path of the object, sharded by the first two hex digits.
+    """
+    return os.path.join(OBJECT_STORE_FOLDER, sha256[:2], sha256)
+
+
+def _link_to_object(obj_path: str, path: str, link_mode: str) -> None:
+    """
+    Replaces `path` with a link to `obj_path`.
+
+    Hard links fall back to a relative symbolic link when the file system does not
+    support them (for example across devices).
+
+    Args:
+        obj_path (str): The object in the store.
+        path (str): The dataset file to replace.
+        link_mode (str): Either "hardlink" or "symlink".
+    """
+    temp_path = path + ".link"
+    if os.path.lexists(temp_path):
+        os.remove(temp_path)
+    try:
+        if link_mode != "hardlink":
+            raise OSError("symbolic link requested")
+        os.link(obj_path, temp_path)
+    except OSError:
+        os.symlink(os.path.relpath(obj_path, os.path.dirname(path)), temp_path)
+    os.replace(temp_path, path)
+
+
+def store_file(path: str, link_mode: str, known_sha256: Optional[str] = None) -> str:
+    """
+    Moves a file into the object store and links it back into place.
+
+    If an identical object already exists, the file is simply replaced by a link to
+    it. Objects are made read-only so they cannot be edited through a hard link.
+
+    Args:
+        path (str): The file to store.
+        link_mode (str): Either "hardlink" or "symlink".
+        known_sha256 (str, optional): The digest recorded for this file on an
+            earlier run. If the file is still linked to that object, it is not
+            hashed again.
+
+    Returns:
+        str: The SHA-256 hex digest of the file.
+    """
+    if known_sha256:
+        known_object = object_path(known_sha256)
+        if os.path.exists(known_object) and os.path.samefile(path, known_object):
+            return known_sha256
+
+    sha256 = file_sha256(path)
+    obj_path = object_path(sha256)
+    if os.path.exists(obj_path) and os.path.samefile(path, obj_path):
+        return sha256
+
+    os.makedirs(os.path.dirname(obj_path), exist_ok=True)
+    if not os.path.exists(obj_path):
+        os.replace(path, obj_path)
+        os.chmod(obj_path, 0o444)
+    _link_to_object(obj_path, path, link_mode)
+    return sha256
+
+
+def store_files(
+    relpaths: List[str], known_objects: Dict[str, str], link_mode: str
+) -> Dict[str, str]:
+    """
+    Places a dataset's files in the object store.
+
+    Args:
+        relpaths (List[str]): The files, relative to the raw data folder.
+        known_objects (Dict[str, str]): Digests recorded on an earlier run.
+        link_mode (str): Either "hardlink" or "symlink".
+
+    Returns:
+        Dict[str, str]: The SHA-256 of every stored file, keyed by relative path.
+    """
+    objects = {}
+    for relpath in relpaths:
+        path = os.path.join(BASE_DATA_FOLDER, relpath)
+        if os.path.isfile(path):
+            objects[relpath] = store_file(path, link_mode, known_objects.get(relpath))
+    return objects
+
+
+def _still_linked(relpaths: List[str], known_objects: Dict[str, str]) -> Dict[str, str]:
+    """
+    Finds the files that still link to the objects recorded on an earlier run.
+
+    This keeps those objects referenced when the store is switched off, so they are
+    not collected while a dataset file still points at them.
+
+    Args:
+        relpaths (List[str]): The files, relative to the raw data folder.
+        known_objects (Dict[str, str]): Digests recorded on an earlier run.
+
+    Returns:
+        Dict[str, str]: The digests of the files that are still linked.
+    """
+    linked = {}
+    for relpath in relpaths:
+        sha256 = known_objects.get(relpath)
+        path = os.path.join(BASE_DATA_FOLDER, relpath)
+        if (
+            sha256
+            and os.path.exists(path)
+            and os.path.exists(object_path(sha256))
+            and os.path.samefile(path, object_path(sha256))
+        ):
+            linked[relpath] = sha256
+    return linked
+
+
+def collect_garbage(manifest: DownloadManifest) -> int:
+    """
+    Deletes objects that no manifest entry refers to any more.
+
+    Args:
+        manifest (DownloadManifest): The manifest listing every stored file.
+
+    Returns:
+        int: The number of objects deleted.
+    """
+    referenced = manifest.referenced_objects()
+    removed = 0
+    for root, _, filenames in os.walk(OBJECT_STORE_FOLDER):
+        for filename in filenames:
+            if filename not in referenced:
+                os.remove(os.path.join(root, filename))
+                removed += 1
+    return removed
+
+
+def _install_archive(
+    zip_path: str, dest_folder: str, entry: Dict, options: DownloadOptions
+) -> None:
+    """
+    Extracts a verified archive, prunes vanished files, stores the results in the
+    object store and records the download in the manifest.
+
+    Args:
+        zip_path (str): The path of the archive.
+        dest_folder (str): The extraction folder.
+        entry (Dict): The manifest entry of the new download. Its file list and
+            object digests are filled in.
+        options (DownloadOptions): The run settings.
+    """
+    earlier = (options.manifest.get(entry["url"]) if options.manifest else None) or {}
+
+    entry["files"], written = extract_archive(zip_path, dest_folder, options)
+    removed = []
+    if options.prune:
+        removed = prune_vanished_files(earlier.get("files", []), entry["files"])
+    known_objects = earlier.get("objects", {})
+    if options.store != "off":
+        entry["objects"] = store_files(entry["files"], known_objects, options.store)
+    elif known_objects:
+        entry["objects"] = _still_linked(entry["files"], known_objects)
+    _record_download(options, entry, written, removed)
+
+
+def download_and_unzip(
+    persistent_id: str, dest_folder: str, options: Optional[DownloadOptions] = None
+) -> bool:
+    """
+    Downloads and unzips a dataset from the Harvard Dataverse.
+
+    Args:
+        persistent_id (str): The persistent identifier of the dataset.
+        dest_folder (str): The local directory to save the unzipped data.
+        options (DownloadOptions, optional): The session and chunk size to use.
+
+    Returns:
+        bool: True if the dataset was downloaded and extracted successfully.
+    """
+    options = options or DownloadOptions()
+    url = options.backend.dataset_url(persistent_id)
+    mirror_path = _mirror_path(options, mirror_dataset_relpath(persistent_id))
+    metrics = SourceMetrics("dataset", persistent_id, url)
+    start = time.perf_counter()
+
+    # Ensure the destination folder exists
+    os.makedirs(dest_folder, exist_ok=True)
+
+    print(f"Downloading dataset {persistent_id}...")
+    zip_path = os.path.join(dest_folder, "dataverse_files.zip")
+    previous = _previous_entry(url, options, mirror_path)
+    try:
+        entry = download_resumable(url, zip_path, options, previous, metrics)
+        if entry is None or (previous and previous["sha256"] == entry["sha256"]):
+            if entry is not None:
+                os.remove(zip_path)
+            metrics.status = "not_modified" if entry is None else "unchanged"
+            metrics.cache_hit = True
+            print(f"Dataset {persistent_id} has not changed. Skipping extraction.")
+            return True
+
+        print(f"Verifying dataset {persistent_id} (sha256 {entry['sha256']})...")
+        extract_start = time.perf_counter()
+        verify_zip(zip_path)
+
+        print(f"Unzipping dataset {persistent_id}...")
+        _install_archive(zip_path, dest_folder, entry, options)
+        metrics.extract_seconds = time.perf_counter() - extract_start
+        _update_mirror(zip_path, mirror_path)
+
+        # Clean up by removing the downloaded zip file
+        os.remove(zip_path)
+        metrics.status = "downloaded"
+
+        print(
+            f"Successfully downloaded and unzipped dataset {persistent_id} "
+            f"to {dest_folder}."
+        )
+        return True
+
+    except requests.exceptions.RequestException as e:
+        print(f"Error downloading dataset {persistent_id}: {e}")
+        if os.path.exists(zip_path + PART_SUFFIX):
+            print("The partial download was kept and will resume on the next run.")
+    except DownloadVerificationError as e:
+        print(f"Error: The download of {persistent_id} is incomplete: {e}")
+    except zipfile.BadZipFile:
+        print(
+            f"Error: The downloaded file for {persistent_id} is not a valid zip file."
+        )
+        os.remove(zip_path)
+    except Exception as e:
+        print(f"An unexpected error occurred: {e}")
+    finally:
+        _finish_metrics(options, metrics, start)
+    return False
+
+
+def list_dataset_files(
+    persistent_id: str, options: DownloadOptions
+) -> Optional[List[Dict]]:
+    """
+    Fetches the file listing of the latest published version of a dataset.
+
+    Args:
+        persistent_id (str): The persistent identifier of the dataset.
+        options (DownloadOptions): The session and source backend to use.
+
+    Returns:
+        Optional[List[Dict]]: One Dataverse file record per file, or None if the
+        source backend has no file listing.
+
+    Raises:
+        requests.exceptions.RequestException: If the listing cannot be fetched.
+    """
+    url = options.backend.dataset_files_url(persistent_id)
+    if url is None:
+        return None
+    http = options.session or requests
+    response = http.get(url, timeout=30)
+    response.raise_for_status()
+    return response.json()["data"]
+
+
+def _datafile_name(file_info: Dict) -> str:
+    """Returns the name a Dataverse file had before it was ingested, if it was."""
+    data_file = file_info["dataFile"]
+    return data_file.get("originalFileName") or data_file["filename"]
+
+
+def download_datafile(
+    file_info: Dict, dest_folder: str, options: DownloadOptions
+) -> bool:
+    """
+    Downloads a single file of a Dataverse dataset.
+
+    The file is skipped without a request if the checksum in the listing matches
+    the one recorded in the manifest, and otherwise fetched with a conditional,
+    resumable request.
+
+    Args:
+        file_info (Dict): The file's record from the dataset file listing.
+        dest_folder (str): The local directory of the dataset.
+        options (DownloadOptions): The run settings.
+
+    Returns:
+        bool: True if the file is up to date on disk.
+    """
+    data_file = file_info["dataFile"]
+    filename = _datafile_name(file_info)
+    url = options.backend.datafile_url(
+        data_file["id"], original="originalFileName" in data_file
+    )
+    target = os.path.join(dest_folder, file_info.get("directoryLabel", ""), filename)
+    checksum = data_file.get("checksum", {}).get("value") or data_file.get("md5")
+    metrics = SourceMetrics("file", filename, url)
+    start = time.perf_counter()
+
+    previous = _previous_entry(url, options)
+    try:
+        if previous and checksum and previous.get("checksum") == checksum:
+            metrics.status, metrics.cache_hit = "unchanged", True
+            return True
+
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        entry = download_resumable(url, target, options, previous, metrics)
+        if entry is None:
+            metrics.status, metrics.cache_hit = "not_modified", True
+            return True
+
+        entry["checksum"] = checksum
+        entry["files"] = [_raw_relpath(target)]
+        if options.store != "off":
+            known_objects = {entry["files"][0]: entry["sha256"]}
+            entry["objects"] = store_files(entry["files"], known_objects, options.store)
+        unchanged = previous and previous["sha256"] == entry["sha256"]
+        _record_download(options, entry, [] if unchanged else entry["files"])
+        metrics.status = "unchanged" if unchanged else "downloaded"
+        metrics.cache_hit = bool(unchanged)
+        print(f"Downloaded {filename} to {target}.")
+        return True
+
+    except requests.exceptions.RequestException as e:
+        print(f"Error downloading {filename}: {e}")
+    except DownloadVerificationError as e:
+        print(f"Error: The download of {filename} is incomplete: {e}")
+    except Exception as e:
+        print(f"An unexpected error occurred: {e}")
+    finally:
+        _finish_metrics(options, metrics, start)
+    return False
+
+
+def download_dataset_files(
+    persistent_id: str, dest_folder: str, options: Optional[DownloadOptions] = None
+) -> bool:
+    """
+    Downloads only the files of a dataset that match the jurisdiction and year
+    filters, instead of the whole dataset archive.
+
+    Falls back to `download_and_unzip` if the source backend has no file listing.
+
+    Args:
+        persistent_id (str): The persistent identifier of the dataset.
+        dest_folder (str): The local directory to save the files.
+        options (DownloadOptions, optional): The run settings, including the filters.
+
+    Returns:
+        bool: True if every matching file was downloaded successfully.
+    """
+    options = options or DownloadOptions()
+    print(f"Listing files of dataset {persistent_id}...")
+    try:
+        listing = list_dataset_files(persistent_id, options)
+    except requests.exceptions.RequestException as e:
+        print(f"Error listing dataset {persistent_id}: {e}")
+        return False
+    except (ValueError, KeyError) as e:
+        print(f"Error: Unexpected file listing for dataset {persistent_id}: {e}")
+        return False
+
+    if listing is None:
+        print(f"No file listing for {persistent_id}; downloading the whole dataset.")
+        return download_and_unzip(persistent_id, dest_folder, options)
+
+    selected = [
+        info for info in listing if options.filters.matches_file(_datafile_name(info))
+    ]
+    print(
+        f"{len(selected)} of {len(listing)} files of dataset {persistent_id} "
+        "match the filters."
+    )
+    results = [download_datafile(info, dest_folder, options) for info in selected]
+    return all(results)
+
+
+def get_sheet_tab_path(dest_folder: str, tab_name: str) -> str:
+    """
+    Returns where a Google Sheet tab is saved.
+
+    Args:
+        dest_folder (str): The local directory of the sheet.
+        tab_name (str): The name of the tab.
+
+    Returns:
+        str: The path of the CSV file.
+    """
+    # Sanitize the tab name to create a safe filename
+    safe_filename = (
+        "".join(c for c in tab_name if c.isalnum() or c in (" ", "_"))
+        .rstrip()
+        .replace(" ", "_")
+    )
+    return os.path.join(dest_folder, f"{safe_filename}.csv")
+
+
+def selected_sheet_tabs(filters: DownloadFilters) -> List[Tuple[str, str, str]]:
+    """
+    Lists the Google Sheets tabs a run downloads.
+
+    Filtered runs only need the `rcv_database` metadata tabs of the selected
+    election types.
+
+    Args:
+        filters (DownloadFilters): The run's filters.
+
+    Returns:
+        List[Tuple[str, str, str]]: The sheet name, sheet ID and tab name of every
+        tab to download.
+    """
+    metadata_tabs = {
+        tab
+        for election_type, (_, tab) in ELECTION_TYPES.items()
+        if filters.matches_type(election_type)
+    }
+    return [
+        (sheet_name, sheet_info["id"], tab)
+        for sheet_name, sheet_info in GOOGLE_SHEETS_CONFIG.items()
+        for tab in sheet_info["tabs"]
+        if not filters.active or (sheet_name == "rcv_database" and tab in metadata_tabs)
+    ]
+
+
+def download_google_sheet_tab(
+    sheet_id: str,
+    tab_name: str,
+    dest_folder: str,
+    options: Optional[DownloadOptions] = None,
+) -> bool:
+    """
+    Downloads a specific tab from a Google Sheet as a CSV file.
+
+    Args:
+        sheet_id (str): The identifier of the Google Sheet.
+        tab_name (str): The name of the tab to download.
+        dest_folder (str): The local directory to save the CSV file.
+        options (DownloadOptions, optional): The session to use. A one-off request
+            is made if omitted.
+
+    Returns:
+        bool: True if the tab was downloaded successfully.
+    """
+    options = options or DownloadOptions()
+    http = options.session or requests
+    url = options.backend.sheet_tab_url(sheet_id, tab_name)
+    mirror_path = _mirror_path(options, mirror_sheet_tab_relpath(sheet_id, tab_name))
+    metrics = SourceMetrics("tab", tab_name, url)
+    start = time.perf_counter()
+
+    # Ensure the destination folder exists
+    os.makedirs(dest_folder, exist_ok=True)
+    file_path = get_sheet_tab_path(dest_folder, tab_name)
+
+    print(f"Downloading tab '{tab_name}' from sheet {sheet_id}...")
+    previous = _previous_entry(url, options, mirror_path)
+    try:
+        response = http.get(url, timeout=30, headers=conditional_headers(previous))
+        metrics.ttfb_seconds = response.elapsed.total_seconds()
+        metrics.transfer_seconds = time.perf_counter() - start
+        metrics.bytes_received = len(response.content)
+        if response.status_code == requests.codes.not_modified:
+            metrics.status, metrics.cache_hit = "not_modified", True
+            print(f"Tab '{tab_name}' has not changed. Skipping.")
+            return True
+        response.raise_for_status()
+
+        if response.content:
+            # The body is stored as received, as in the asyncio path, so both
+            # paths record the same checksum and file for the same tab
+            entry = {
+                "url": url,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "content_length": len(response.content),
+                "sha256": hashlib.sha256(response.content).hexdigest(),
+                "files": [_raw_relpath(file_path)],
+            }
+            if previous and previous["sha256"] == entry["sha256"]:
+                _record_download(options, entry, [])
+                metrics.status, metrics.cache_hit = "unchanged", True
+                print(f"Tab '{tab_name}' has not changed. Skipping.")
+                return True
+
+            # Replace the file rather than rewriting it, as it may be a hard link
+            # into the mirror
+            temp_path = file_path + ".tmp"
+            with open(temp_path, "wb") as f:
+                f.write(response.content)
+            os.replace(temp_path, file_path)
+            _record_download(options, entry, entry["files"])
+            _update_mirror(file_path, mirror_path)
+
+            metrics.status = "downloaded"
+            print(f"Successfully downloaded tab '{tab_name}' to {file_path}.")
+        else:
+            metrics.status = "empty"
+            print(
+                f"Warning: No content for tab '{tab_name}' from sheet {sheet_id}. "
+                "It might be empty."
+            )
+        return True
+
+    except requests.exceptions.RequestException as e:
+        print(f"Error downloading tab '{tab_name}': {e}")
+    except Exception as e:
+        print(f"An unexpected error occurred: {e}")
+    finally:
+        _finish_metrics(options, metrics, start)
+    return False
+
+
+class HostRateLimiter:
+    """
+    Caps the number of in-flight requests and the request rate for each host.
+
+    Used by the asyncio download path. Every request runs inside `slot(host)`, which
+    waits for a free connection and then spaces request starts at least
+    `1 / requests_per_second` apart.
+    """
+
+    def __init__(self, max_concurrent: int, requests_per_second: float):
+        self.max_concurrent = max_concurrent
+        self.min_interval = 1.0 / requests_per_second
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._next_start: Dict[str, float] = {}
+
+    @contextlib.asynccontextmanager
+    async def slot(self, host: str):
+        """Holds one of the host's connection slots for the duration of a request."""
+        semaphore = self._semaphores.setdefault(
+            host, asyncio.Semaphore(self.max_concurrent)
+        )
+        async with semaphore:
+            now = asyncio.get_running_loop().time()
+            start = max(now, self._next_start.get(host, now))
+            self._next_start[host] = start + self.min_interval
+            await asyncio.sleep(start - now)
+            yield
+
+
+def _backoff_delay(attempt: int, retry_after: Optional[str]) -> float:
+    """
+    Chooses how long to wait before retrying a throttled or failed request.
+
+    A numeric `Retry-After` header is honoured. Otherwise the delay is drawn
+    uniformly from an exponentially growing window ("full jitter").
+
+    Args:
+        attempt (int): The number of attempts made so far, starting at 0.
+        retry_after (str, optional): The server's Retry-After header.
+
+    Returns:
+        float: The delay in seconds.
+    """
+    if retry_after and retry_after.isdigit():
+        return min(float(retry_after), MAX_BACKOFF)
+    return random.uniform(0, min(MAX_BACKOFF, BACKOFF_BASE * 2**attempt))
+
+
+def _fetch_tab_to_temp(
+    url: str,
+    temp_path: str,
+    options: DownloadOptions,
+    previous: Optional[Dict],
+    metrics: SourceMetrics,
+) -> Tuple[int, Optional[Dict], Optional[str]]:
+    """
+    Streams a sheet tab to a temporary file, hashing it on the way.
+
+    This is a blocking call; the asyncio path runs it on a worker thread.
+
+    Args:
+        url (str): The export URL of the tab.
+        temp_path (str): Where the body is written.
+        options (DownloadOptions): The session and chunk size to use.
+        previous (Dict, optional): The manifest entry used for a conditional request.
+        metrics (SourceMetrics): Receives the time to first byte, transfer time and
+            number of bytes received.
+
+    Returns:
+        Tuple[int, Optional[Dict], Optional[str]]: The HTTP status, the manifest
+        entry of the new body (None if nothing was written), and the Retry-After
+        header of a retryable response.
+    """
+    http = options.session or requests
+    headers = conditional_headers(previous)
+    start = time.perf_counter()
+    with http.get(url, stream=True, timeout=30, headers=headers) as response:
+        metrics.ttfb_seconds = time.perf_counter() - start
+        status = response.status_code
+        if status in RETRY_STATUSES or status == requests.codes.not_modified:
+            return status, None, response.headers.get("Retry-After")
+        response.raise_for_status()
+
+        sha256 = hashlib.sha256()
+        size = 0
+        with open(temp_path, "wb") as f:
+            for chunk in response.iter_content(chunk_size=options.chunk_size):
+                f.write(chunk)
+                sha256.update(chunk)
+                size += len(chunk)
+        metrics.transfer_seconds = time.perf_counter() - start
+        metrics.bytes_received = size
+
+        entry = {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "content_length": size,
+            "sha256": sha256.hexdigest(),
+        }
+    return status, entry, None
+
+
+def _finish_tab(
+    tab_name: str,
+    file_path: str,
+    entry: Optional[Dict],
+    previous: Optional[Dict],
+    options: DownloadOptions,
+) -> str:
+    """
+    Moves a streamed tab into place unless it is empty or unchanged.
+
+    Args:
+        tab_name (str): The name of the tab.
+        file_path (str): The final path of the CSV file.
+        entry (Dict, optional): The manifest entry of the new body, or None if the
+            server reported that the tab has not changed.
+        previous (Dict, optional): The manifest entry of the earlier download.
+        options (DownloadOptions): The run settings holding the manifest.
+
+    Returns:
+        str: The outcome, one of "downloaded", "unchanged", "not_modified" or
+        "empty".
+    """
+    temp_path = file_path + ".tmp"
+    if entry is None:
+        print(f"Tab '{tab_name}' has not changed. Skipping.")
+        return "not_modified"
+    if entry["content_length"] == 0:
+        os.remove(temp_path)
+        print(f"Warning: No content for tab '{tab_name}'. It might be empty.")
+        return "empty"
+
+    entry["files"] = [_raw_relpath(file_path)]
+    if previous and previous["sha256"] == entry["sha256"]:
+        os.remove(temp_path)
+        _record_download(options, entry, [])
+        print(f"Tab '{tab_name}' has not changed. Skipping.")
+        return "unchanged"
+
+    os.replace(temp_path, file_path)
+    _record_download(options, entry, entry["files"])
+    print(f"Successfully downloaded tab '{tab_name}' to {file_path}.")
+    return "downloaded"
+
+
+async def download_google_sheet_tab_async(
+    sheet_id: str,
+    tab_name: str,
+    dest_folder: str,
+    options: DownloadOptions,
+    limiter: HostRateLimiter,
+) -> bool:
+    """
+    Downloads a specific tab from a Google Sheet on the asyncio event loop.
+
+    Args:
+        sheet_id (str): The identifier of the Google Sheet.
+        tab_name (str): The name of the tab to download.
+        dest_folder (str): The local directory to save the CSV file.
+        options (DownloadOptions): The session and manifest to use.
+        limiter (HostRateLimiter): The per-host concurrency and rate limits.
+
+    Returns:
+        bool: True if the tab was downloaded successfully.
+    """
+    url = options.backend.sheet_tab_url(sheet_id, tab_name)
+    mirror_path = _mirror_path(options, mirror_sheet_tab_relpath(sheet_id, tab_name))
+    host = urllib.parse.urlsplit(url).netloc
+    os.makedirs(dest_folder, exist_ok=True)
+    file_path = get_sheet_tab_path(dest_folder, tab_name)
+    previous = _previous_entry(url, options, mirror_path)
+    metrics = SourceMetrics("tab", tab_name, url)
+    start = time.perf_counter()
+
+    print(f"Downloading tab '{tab_name}' from sheet {sheet_id}...")
+    try:
+        for attempt in range(MAX_HTTP_RETRIES + 1):
+            metrics.retries = attempt
+            async with limiter.slot(host):
+                status, entry, retry_after = await asyncio.to_thread(
+                    _fetch_tab_to_temp,
+                    url,
+                    file_path + ".tmp",
+                    options,
+                    previous,
+                    metrics,
+                )
+            if status not in RETRY_STATUSES:
+                metrics.status = _finish_tab(
+                    tab_name, file_path, entry, previous, options
+                )
+                metrics.cache_hit = metrics.status in ("unchanged", "not_modified")
+                if metrics.status == "downloaded":
+                    _update_mirror(file_path, mirror_path)
+                return True
+            if attempt < MAX_HTTP_RETRIES:
+                delay = _backoff_delay(attempt, retry_after)
+                print(f"Tab '{tab_name}' got HTTP {status}. Retrying in {delay:.1f}s.")
+                await asyncio.sleep(delay)
+        print(f"Error downloading tab '{tab_name}': HTTP {status} after retries.")
+
+    except requests.exceptions.RequestException as e:
+        print(f"Error downloading tab '{tab_name}': {e}")
+    except Exception as e:
+        print(f"An unexpected error occurred: {e}")
+    finally:
+        _finish_metrics(options, metrics, start)
+    return False
+
+
+async def download_sheets_async(
+    options: DownloadOptions, limiter: HostRateLimiter
+) -> List[Tuple[str, bool, float]]:
+    """
+    Downloads every configured Google Sheets tab concurrently.
+
+    Args:
+        options (DownloadOptions): The settings passed to every download.
+        limiter (HostRateLimiter): The per-host concurrency and rate limits.
+
+    Returns:
+        List[Tuple[str, bool, float]]: The label, success flag and elapsed seconds
+        of every tab.
+    """
+
+    async def timed(label: str, download) -> Tuple[str, bool, float]:
+        start = time.perf_counter()
+        succeeded = await download
+        return label, succeeded, time.perf_counter() - start
+
+    downloads = []
+    for sheet_name, sheet_id, tab in selected_sheet_tabs(options.filters):
         sheet_destination_folder = os.path.join(BASE_DATA_FOLDER, sheet_name)
-        for tab in sheet_info["tabs"]:
-            download_google_sheet_tab(sheet_info["id"], tab, sheet_destination_folder)
+        download = download_google_sheet_tab_async(
+            sheet_id, tab, sheet_destination_folder, options, limiter
+        )
+        downloads.append(timed(f"{sheet_name}/{tab}", download))
+    return list(await asyncio.gather(*downloads))
+
+
+def convert_to_sidecar(csv_path: str) -> Optional[str]:
+    """
+    Writes a dictionary-encoded Parquet copy of a CVR next to the CSV.
+
+    The rank columns are parsed straight into categoricals, so the candidate
+    names are stored once per column rather than once per ballot. The sidecar is
+    skipped if it is already newer than the CSV.
+
+    Args:
+        csv_path (str): The path of the CVR CSV.
+
+    Returns:
+        Optional[str]: The path of the sidecar written, or None if it was current.
+    """
+    sidecar_path = os.path.splitext(csv_path)[0] + SIDECAR_EXTENSION
+    if os.path.exists(sidecar_path) and os.path.getmtime(
+        sidecar_path
+    ) >= os.path.getmtime(csv_path):
+        return None
+
+    header = pd.read_csv(csv_path, nrows=0).columns.tolist()
+    dtypes = {col: "category" for col in get_rank_columns(header)}
+    data = pd.read_csv(csv_path, dtype=dtypes, low_memory=False)
+
+    temp_path = sidecar_path + ".tmp"
+    data.to_parquet(temp_path, engine="pyarrow", index=False)
+    os.replace(temp_path, sidecar_path)
+    return sidecar_path
+
+
+def write_parquet_sidecars(jobs: int) -> int:
+    """
+    Converts every extracted Dataverse CVR to a Parquet sidecar in parallel.
+
+    Args:
+        jobs (int): The number of worker processes.
+
+    Returns:
+        int: The number of sidecars written.
+    """
+    if importlib.util.find_spec("pyarrow") is None:
+        print(
+            "Warning: pyarrow is not installed (poetry install --extras parquet). "
+            "Skipping Parquet sidecars."
+        )
+        return 0
+
+    csv_paths = []
+    for subfolder in HARVARD_DATAVERSE_SETS.values():
+        dataset_folder = os.path.join(BASE_DATA_FOLDER, subfolder)
+        for root, _, filenames in os.walk(dataset_folder):
+            csv_paths.extend(
+                os.path.join(root, name) for name in filenames if name.endswith(".csv")
+            )
+
+    written = 0
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {executor.submit(convert_to_sidecar, p): p for p in csv_paths}
+        for future in as_completed(futures):
+            try:
+                written += future.result() is not None
+            except Exception as e:
+                print(f"Error converting {futures[future]} to Parquet: {e}")
+    return written
+
+
+def _timed_download(
+    label: str, download: Callable[..., bool], *args
+) -> Tuple[str, bool, float]:
+    """
+    Runs a single download and measures how long it took.
+
+    Args:
+        label (str): A human-readable name for the source.
+        download (Callable[..., bool]): The download function to run.
+        *args: The arguments passed to the download function.
+
+    Returns:
+        Tuple[str, bool, float]: The label, whether it succeeded, and the elapsed
+        wall time in seconds.
+    """
+    start = time.perf_counter()
+    succeeded = download(*args)
+    return label, succeeded, time.perf_counter() - start
+
+
+def _build_download_tasks(
+    options: DownloadOptions, include_sheets: bool = True
+) -> List[Tuple]:
+    """
+    Lists every configured source as a `(label, function, *args)` task.
+
+    Args:
+        options (DownloadOptions): The settings passed to every download.
+        include_sheets (bool): Whether to include the Google Sheets tabs.
+
+    Returns:
+        List[Tuple]: The download tasks, Dataverse datasets first.
+    """
+    filters = options.filters
+    election_types = {folder: name for name, (folder, _) in ELECTION_TYPES.items()}
+    download = download_dataset_files if filters.selects_files else download_and_unzip
+
+    tasks = []
+    for dataset_id, subfolder in HARVARD_DATAVERSE_SETS.items():
+        if not filters.matches_type(election_types[subfolder]):
+            continue
+        dataset_folder = os.path.join(BASE_DATA_FOLDER, subfolder)
+        tasks.append((subfolder, download, dataset_id, dataset_folder, options))
+
+    for sheet_name, sheet_id, tab in selected_sheet_tabs(filters):
+        if not include_sheets:
+            break
+        sheet_destination_folder = os.path.join(BASE_DATA_FOLDER, sheet_name)
+        tasks.append(
+            (
+                f"{sheet_name}/{tab}",
+                download_google_sheet_tab,
+                sheet_id,
+                tab,
+                sheet_destination_folder,
+                options,
+            )
+        )
+    return tasks
+
+
+def run_downloads(tasks: List[Tuple], jobs: int) -> List[Tuple[str, bool, float]]:
+    """
+    Runs the download tasks on a bounded thread pool.
+
+    Args:
+        tasks (List[Tuple]): Tasks as built by `_build_download_tasks`.
+        jobs (int): The maximum number of downloads running at once.
+
+    Returns:
+        List[Tuple[str, bool, float]]: The label, success flag and elapsed seconds
+        of every task, in completion order.
+    """
+    timings = []
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(_timed_download, *task) for task in tasks]
+        for future in as_completed(futures):
+            timings.append(future.result())
+    return timings
+
+
+def run_all_downloads(
+    options: DownloadOptions, args: argparse.Namespace
+) -> List[Tuple[str, bool, float]]:
+    """
+    Runs every download, fetching the sheet tabs on an asyncio event loop in a
+    separate thread when `--async-sheets` is given.
+
+    Args:
+        options (DownloadOptions): The settings passed to every download.
+        args (argparse.Namespace): The parsed command line options.
+
+    Returns:
+        List[Tuple[str, bool, float]]: The label, success flag and elapsed seconds
+        of every source.
+    """
+    tasks = _build_download_tasks(options, include_sheets=not args.async_sheets)
+    if not args.async_sheets:
+        return run_downloads(tasks, args.jobs)
+
+    limiter = HostRateLimiter(args.host_concurrency, args.host_rate)
+    with ThreadPoolExecutor(max_workers=1) as loop_thread:
+        sheets = loop_thread.submit(
+            asyncio.run, download_sheets_async(options, limiter)
+        )
+        timings = run_downloads(tasks, args.jobs)
+        return timings + sheets.result()
+
+
+def print_timings(timings: List[Tuple[str, bool, float]], wall_time: float) -> None:
+    """
+    Prints a table of per-source download timings, slowest first.
+
+    Args:
+        timings (List[Tuple[str, bool, float]]): Results from `run_downloads`.
+        wall_time (float): The total elapsed time of the run in seconds.
+    """
+    print("\n--- Download Timings ---")
+    width = max((len(label) for label, _, _ in timings), default=0)
+    for label, succeeded, elapsed in sorted(timings, key=lambda t: -t[2]):
+        status = "ok" if succeeded else "FAILED"
+        print(f"  {label:<{width}}  {elapsed:8.2f}s  {status}")
+    total = sum(elapsed for _, _, elapsed in timings)
+    print(f"  Sum of source times: {total:.2f}s, wall time: {wall_time:.2f}s")
+
+
+def print_metrics_summary(records: List[SourceMetrics]) -> None:
+    """
+    Prints a table of per-source transfer and extraction measurements.
+
+    Args:
+        records (List[SourceMetrics]): The measurements collected during the run.
+    """
+    print("\n--- Download Metrics ---")
+    width = max((len(m.source) for m in records), default=0)
+    print(
+        f"  {'Source':<{width}}  {'Status':<12}  {'TTFB':>7}  {'Transfer':>8}  "
+        f"{'MiB':>8}  {'MiB/s':>7}  {'Extract':>8}  {'Retries':>7}"
+    )
+    for m in sorted(records, key=lambda m: -m.total_seconds):
+        ttfb = f"{m.ttfb_seconds:6.2f}s" if m.ttfb_seconds is not None else "      -"
+        rate = m.bytes_per_second
+        rate = f"{rate / 2**20:7.2f}" if rate is not None else "      -"
+        print(
+            f"  {m.source:<{width}}  {m.status:<12}  {ttfb}  "
+            f"{m.transfer_seconds:7.2f}s  {m.bytes_received / 2**20:8.2f}  {rate}  "
+            f"{m.extract_seconds:7.2f}s  {m.retries:>7}"
+        )
+    received = sum(m.bytes_received for m in records)
+    transfer = sum(m.transfer_seconds for m in records)
+    extract = sum(m.extract_seconds for m in records)
+    hits = sum(m.cache_hit for m in records)
+    print(
+        f"  {hits}/{len(records)} cache hit(s), {received / 2**20:.2f} MiB received "
+        f"in {transfer:.2f}s of transfer, {extract:.2f}s extracting."
+    )
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Parses the command line options.
+
+    Args:
+        argv (List[str], optional): The arguments to parse. Defaults to `sys.argv`.
+
+    Returns:
+        argparse.Namespace: The parsed options.
+    """
+    parser = argparse.ArgumentParser(description="Download raw voting data.")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help="Number of sources to download concurrently (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE // 1024,
+        metavar="KIB",
+        help="Size of each chunk streamed to disk, in KiB (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Download every source even if the manifest says it is unchanged.",
+    )
+    parser.add_argument(
+        "--extract-mode",
+        choices=EXTRACT_MODES,
+        default=EXTRACT_MODES[0],
+        help="Extract only new or changed archive members, or every member "
+        "(default: %(default)s).",
+    )
+    parser.add_argument(
+        "--extract-workers",
+        type=int,
+        default=DEFAULT_EXTRACT_WORKERS,
+        help="Threads extracting large archive members (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="Delete raw files that were removed from an archive upstream.",
+    )
+    parser.add_argument(
+        "--store",
+        choices=STORE_MODES,
+        default=STORE_MODES[0],
+        help="Keep extracted files in the content-addressed store under "
+        "data/raw/.objects and link them into place (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--sidecars",
+        action="store_true",
+        help="Write a Parquet copy of every extracted CVR (requires pyarrow).",
+    )
+    parser.add_argument(
+        "--async-sheets",
+        action="store_true",
+        help="Fetch the Google Sheets tabs concurrently on an asyncio event loop.",
+    )
+    parser.add_argument(
+        "--host-concurrency",
+        type=int,
+        default=DEFAULT_HOST_CONCURRENCY,
+        help="Maximum in-flight asyncio requests per host (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--host-rate",
+        type=float,
+        default=DEFAULT_HOST_RATE,
+        help="Maximum asyncio requests started per second per host "
+        "(default: %(default)s).",
+    )
+    parser.add_argument(
+        "--source",
+        metavar="DIR_OR_URL",
+        help="Read every source from a mirror directory, file:// URL or HTTP "
+        "server instead of the upstream servers.",
+    )
+    parser.add_argument(
+        "--mirror",
+        metavar="DIR",
+        help="Also write every downloaded archive and tab into a mirror directory.",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        default=METRICS_PATH,
+        metavar="PATH",
+        help="JSON-lines file that per-source download metrics are appended to "
+        "(default: data/raw/.download_metrics.jsonl).",
+    )
+    parser.add_argument(
+        "--election-type",
+        action="append",
+        choices=list(ELECTION_TYPES),
+        default=[],
+        help="Only download this election type. Can be repeated.",
+    )
+    parser.add_argument(
+        "--jurisdiction",
+        action="append",
+        default=[],
+        metavar="NAME",
+        help="Only download CVRs of this jurisdiction, e.g. Alaska. Can be repeated.",
+    )
+    parser.add_argument(
+        "--year",
+        action="append",
+        default=[],
+        metavar="YYYY",
+        help="Only download CVRs of elections held in this year. Can be repeated.",
+    )
+    args = parser.parse_args(argv)
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be at least 1")
+    if args.extract_workers < 1:
+        parser.error("--extract-workers must be at least 1")
+    if args.host_concurrency < 1 or args.host_rate <= 0:
+        parser.error("--host-concurrency and --host-rate must be positive")
+    if any(not re.fullmatch(r"\d{4}", year) for year in args.year):
+        parser.error("--year must be a four-digit year")
+    return args
+
+
+# --- Main Execution ---
+
+
+def main(argv: Optional[List[str]] = None):
+    """
+    Main function to orchestrate the data download process.
+    """
+    args = parse_args(argv)
+    print("--- Starting Data Download Process ---")
+    print(
+        f"Downloading Harvard Dataverse datasets and Google Sheets tabs "
+        f"with {args.jobs} job(s)..."
+    )
+
+    filters = DownloadFilters(args.election_type, args.jurisdiction, args.year)
+    if filters.active:
+        print(f"Restricting the download to {asdict(filters)}.")
+
+    start = time.perf_counter()
+    manifest = DownloadManifest()
+    metrics = MetricsRecorder(args.metrics_file)
+    pool_size = max(args.jobs, args.host_concurrency if args.async_sheets else 1)
+    with create_session(pool_size) as session:
+        options = DownloadOptions(
+            session=session,
+            backend=MirrorBackend(args.source) if args.source else SourceBackend(),
+            mirror_folder=args.mirror,
+            chunk_size=args.chunk_size * 1024,
+            manifest=manifest,
+            force=args.force,
+            extract_mode=args.extract_mode,
+            extract_workers=args.extract_workers,
+            prune=args.prune,
+            store=args.store,
+            metrics=metrics,
+            filters=filters,
+        )
+        timings = run_all_downloads(options, args)
+    if args.store != "off":
+        print(f"Removed {collect_garbage(manifest)} unreferenced stored object(s).")
+    manifest.save()
+    metrics.save()
+    filters.save()
+    print_timings(timings, time.perf_counter() - start)
+    print_metrics_summary(metrics.records)
+    print(f"Metrics appended to: {metrics.path}")
+    print(
+        f"{len(set(manifest.changed_files))} raw file(s) changed. "
+        f"Manifest saved at: {manifest.path}"
+    )
+
+    if args.sidecars:
+        print("\n--- Writing Parquet Sidecars ---")
+        print(f"Wrote {write_parquet_sidecars(args.jobs)} Parquet sidecar(s).")
 
     print("\n--- Data Download Complete ---")
 
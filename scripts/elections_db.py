@@ -0,0 +1,285 @@
+"""
+This module stores the processed elections in an indexed SQLite database and
+provides a small query API on top of it.
+
+`process_data.py --sqlite` writes `data/processed/elections.sqlite` next to
+`elections_database.csv`. It holds the following tables:
+-   `races`: every RaceID of the metadata CSVs, with its election type and the
+    jurisdiction and date parsed from the RaceID.
+-   `files`: every raw ballot data file, with its size, SHA-256, number of rank
+    columns (or candidate columns, for CVRs with one column per candidate),
+    number of ballots and, with `--profiles`, the path of its aggregated ballot
+    profile (see `ballots.py`).
+-   `matches`: which file was matched to which RaceID, how (`exact`, `manual`,
+    `auto_accept`, `earlier_decision`, or `unknown` for matches carried over
+    from a manifest that did not record the method) and with what fuzzy score.
+-   `metadata_<election type>`: the full rows of `ProportionalRCV.csv`,
+    `SingleWinnerRCV.csv` and `OtherMultiWinnerRCV.csv`.
+
+Races are indexed by RaceID, election type, jurisdiction and date, so lookups
+such as "all 2022 single-winner races in Alaska" do not parse any file:
+
+    with ElectionsDatabase() as db:
+        races = db.find_races(election_type="single", jurisdiction="Alaska", year=2022)
+"""
+
+import os
+import sqlite3
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from scripts.race_ids import normalize_jurisdiction, parse_race_id
+
+# --- Constants and Configuration ---
+
+# Base directory for the project
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+
+# The default location of the database
+ELECTIONS_SQLITE_PATH = os.path.join(BASE_DIR, "data", "processed", "elections.sqlite")
+
+SCHEMA = """
+CREATE TABLE races (
+    race_id TEXT PRIMARY KEY,
+    election_type TEXT NOT NULL,
+    jurisdiction TEXT,
+    jurisdiction_key TEXT,
+    date TEXT,
+    year INTEGER
+);
+CREATE TABLE files (
+    filepath TEXT PRIMARY KEY,
+    election_type TEXT NOT NULL,
+    size_bytes INTEGER,
+    sha256 TEXT,
+    rank_columns INTEGER,
+    candidate_columns INTEGER,
+    ballots INTEGER,
+    profile_path TEXT
+);
+CREATE TABLE matches (
+    filepath TEXT NOT NULL REFERENCES files (filepath),
+    race_id TEXT NOT NULL,
+    match_method TEXT NOT NULL,
+    match_score REAL,
+    PRIMARY KEY (filepath, race_id)
+);
+CREATE INDEX idx_races_election_type ON races (election_type);
+CREATE INDEX idx_races_jurisdiction ON races (jurisdiction_key, year);
+CREATE INDEX idx_races_date ON races (date);
+CREATE INDEX idx_matches_race_id ON matches (race_id);
+CREATE INDEX idx_files_ballots ON files (election_type, ballots);
+"""
+
+# --- Function Definitions ---
+
+
+def write_elections_sqlite(
+    path: str,
+    metadata: Dict[str, pd.DataFrame],
+    files: List[Dict],
+    matches: List[Dict],
+) -> None:
+    """
+    Writes the elections database, replacing any earlier version atomically.
+
+    Args:
+        path (str): Where the database is written.
+        metadata (Dict[str, pd.DataFrame]): The metadata rows of each election
+            type. Every RaceID in them becomes a row of `races`.
+        files (List[Dict]): The `filepath`, `election_type`, `size_bytes`,
+            `sha256`, `rank_columns`, `candidate_columns`, `ballots` and
+            `profile_path` of every raw file.
+        matches (List[Dict]): The `filepath`, `race_id`, `match_method` and
+            `match_score` of every match.
+    """
+    temp_path = path + ".tmp"
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+
+    with sqlite3.connect(temp_path) as connection:
+        connection.executescript(SCHEMA)
+        for election_type, df in metadata.items():
+            table = f"metadata_{election_type}"
+            df.to_sql(table, connection, index=False)
+            if "RaceID" in df.columns:
+                connection.execute(
+                    f'CREATE INDEX "idx_{table}_race_id" ON "{table}" ("RaceID")'
+                )
+            connection.executemany(
+                "INSERT OR IGNORE INTO races VALUES "
+                "(:race_id, :election_type, :jurisdiction, :jurisdiction_key, "
+                ":date, :year)",
+                (
+                    dict(
+                        parse_race_id(race_id),
+                        race_id=race_id,
+                        election_type=election_type,
+                    )
+                    for race_id in df.get("RaceID", pd.Series(dtype=str))
+                    .dropna()
+                    .unique()
+                ),
+            )
+        connection.executemany(
+            "INSERT INTO files VALUES "
+            "(:filepath, :election_type, :size_bytes, :sha256, "
+            ":rank_columns, :candidate_columns, :ballots, :profile_path)",
+            files,
+        )
+        connection.executemany(
+            "INSERT OR IGNORE INTO matches VALUES "
+            "(:filepath, :race_id, :match_method, :match_score)",
+            matches,
+        )
+    connection.close()
+    os.replace(temp_path, path)
+
+
+class ElectionsDatabase:
+    """
+    Read-only queries against the SQLite elections database.
+
+    Can be used as a context manager, which closes the connection on exit.
+    """
+
+    def __init__(self, path: str = ELECTIONS_SQLITE_PATH):
+        if not os.path.exists(path):
+            raise FileNotFoundError(
+                f"No elections database at {path}; run process_data.py --sqlite"
+            )
+        self.connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        self.connection.row_factory = sqlite3.Row
+
+    def __enter__(self) -> "ElectionsDatabase":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Closes the database connection."""
+        self.connection.close()
+
+    def find_races(
+        self,
+        election_type: Optional[str] = None,
+        jurisdiction: Optional[str] = None,
+        year: Optional[int] = None,
+        matched_only: bool = False,
+    ) -> List[Dict]:
+        """
+        Finds races by election type, jurisdiction and year.
+
+        Args:
+            election_type (str, optional): "proportional", "single" or "sequential".
+            jurisdiction (str, optional): A jurisdiction, compared ignoring case,
+                spaces and punctuation.
+            year (int, optional): The year of the election.
+            matched_only (bool): Only return races with at least one raw file.
+
+        Returns:
+            List[Dict]: One row per race with its `filepaths` (possibly empty),
+            ordered by date and RaceID.
+        """
+        conditions, parameters = [], []
+        if election_type is not None:
+            conditions.append("r.election_type = ?")
+            parameters.append(election_type)
+        if jurisdiction is not None:
+            conditions.append("r.jurisdiction_key = ?")
+            parameters.append(normalize_jurisdiction(jurisdiction))
+        if year is not None:
+            conditions.append("r.year = ?")
+            parameters.append(int(year))
+        if matched_only:
+            conditions.append("m.filepath IS NOT NULL")
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        rows = self.connection.execute(
+            f"""
+            SELECT r.*, group_concat(m.filepath, char(10)) AS filepaths
+            FROM races AS r LEFT JOIN matches AS m ON m.race_id = r.race_id
+            {where}
+            GROUP BY r.race_id
+            ORDER BY r.date, r.race_id
+            """,
+            parameters,
+        )
+        return [
+            dict(
+                row, filepaths=row["filepaths"].split("\n") if row["filepaths"] else []
+            )
+            for row in rows
+        ]
+
+    def find_files(
+        self, election_type: Optional[str] = None, min_ballots: int = 0
+    ) -> List[Dict]:
+        """
+        Lists raw files by size, largest first, e.g. to schedule analysis jobs.
+
+        Args:
+            election_type (str, optional): "proportional", "single" or "sequential".
+            min_ballots (int): Leave out files with fewer ballots.
+
+        Returns:
+            List[Dict]: The `files` rows, ordered by ballot count and then path.
+            Files that could not be sniffed are listed last.
+        """
+        conditions, parameters = ["coalesce(ballots, 0) >= ?"], [min_ballots]
+        if election_type is not None:
+            conditions.append("election_type = ?")
+            parameters.append(election_type)
+        rows = self.connection.execute(
+            f"""
+            SELECT * FROM files
+            WHERE {" AND ".join(conditions)}
+            ORDER BY ballots IS NULL, ballots DESC, filepath
+            """,
+            parameters,
+        )
+        return [dict(row) for row in rows]
+
+    def files_for_race(self, race_id: str) -> List[Dict]:
+        """
+        Returns the raw files matched to a race, with their match provenance.
+
+        Args:
+            race_id (str): The RaceID.
+
+        Returns:
+            List[Dict]: The file and match columns of every matched file.
+        """
+        rows = self.connection.execute(
+            """
+            SELECT f.*, m.match_method, m.match_score
+            FROM matches AS m JOIN files AS f ON f.filepath = m.filepath
+            WHERE m.race_id = ?
+            ORDER BY f.filepath
+            """,
+            (race_id,),
+        )
+        return [dict(row) for row in rows]
+
+    def metadata(self, race_id: str) -> Optional[Dict]:
+        """
+        Returns the metadata row of a race from its election type's metadata CSV.
+
+        Args:
+            race_id (str): The RaceID.
+
+        Returns:
+            Optional[Dict]: The metadata columns, or None if the race is unknown.
+        """
+        race = self.connection.execute(
+            "SELECT election_type FROM races WHERE race_id = ?", (race_id,)
+        ).fetchone()
+        if race is None:
+            return None
+        row = self.connection.execute(
+            f'SELECT * FROM "metadata_{race["election_type"]}" WHERE "RaceID" = ?',
+            (race_id,),
+        ).fetchone()
+        return dict(row) if row is not None else None
@@ -8,8 +8,45 @@ It performs the following main task:
     in the metadata CSVs.
 -   If an exact match is not found, it uses fuzzy matching to suggest possible
     `RaceID`s to the user, allowing them to select one or more matches interactively.
-
-The script outputs two to three files into the `data/processed` directory:
+    All unmatched filenames are scored up front with multi-core
+    `rapidfuzz.process.cdist` calls, so there is no wait between prompts. A blocking
+    index over the RaceID structure (`Jurisdiction_MMDDYYYY_Office`) limits each
+    file to the RaceIDs sharing its jurisdiction or date.
+
+Earlier decisions are reused: matches recorded in `manual_matches.log` are applied
+again without prompting, and files the user skipped are not asked about again
+unless a better-scoring RaceID has appeared since (the declined suggestions are
+kept in `rejected_matches.log`). With `--auto-accept-score N`, a file whose only
+suggestion scoring at least `N` is unambiguous is matched automatically, and
+`--non-interactive` leaves the remaining files unmatched instead of prompting, so a
+rerun can finish unattended.
+
+Every run records the size, modification time and SHA-256 of each raw file and
+metadata CSV, together with the file's match outcome, in
+`data/processed/.processing_manifest.json`. With `--incremental`, only files that
+were added or changed since the last run are matched, removed files are dropped,
+and the existing elections database is patched rather than rebuilt. A changed
+metadata CSV reprocesses its whole election type.
+
+Each raw file is also sniffed: its header and a small sample of rows tell how
+many rank columns (or, for the candidate-per-column layout, candidate columns) it
+has, and a memory-mapped newline scan counts its ballots. These are stored in the
+manifest and in the `files` table of the SQLite database, so jobs can be sized
+without opening the files; unchanged files keep their earlier results.
+
+With `--workers N`, the raw files of all election sources are fingerprinted by a
+pool of `N` processes (`0` for one per CPU core), in shards so that a single large
+directory is spread across the pool. Exact matching follows for each source, and
+the interactive fuzzy review of every source runs last, one source at a time.
+Sources and files are always processed in sorted order, so the results do not
+depend on the number of workers.
+
+The `rcv_database` metadata tabs are parsed once per run into a `MetadataCatalog`
+(RaceIDs plus the full rows, indexed by RaceID) that every matching stage reads
+from. It is pickled to `data/processed/.metadata_catalog.pkl` with the SHA-256 of
+each tab, so tabs that did not change are not parsed again on later runs.
+
+The script outputs two to five files into the `data/processed` directory:
 1.  `elections_database.csv`: A master CSV file containing all successfully matched
     elections, linking each `RaceID` to its election type and the filepath of the
     raw ballot data.
@@ -17,18 +54,57 @@ The script outputs two to three files into the `data/processed` directory:
     not be matched to a `RaceID`.
 3.  `manual_matches.log`: A log file that records any manual matches made by the user
     during the fuzzy matching process.
+4.  `rejected_matches.log`: A log file of the suggestions the user declined by
+    skipping a file (only the ones that were displayed).
+5.  `auto_accepted_matches.log`: A log file of the matches accepted without
+    prompting by `--auto-accept-score`, for auditing.
+
+With `--profiles`, every matched rank-column CVR is also aggregated into a ballot
+profile (`data/processed/profiles/<raw path>.profile`: a candidate codebook, the
+distinct rankings as an integer matrix and their counts, as memory-mappable
+`.npy` arrays; see `ballots.py`), built by the same worker pool. Profiles of
+unchanged files are kept.
+
+With `--sqlite`, an indexed SQLite database (`elections.sqlite`) with the races,
+files, metadata rows and match provenance is written as well; see
+`elections_db.py` for its schema and query API.
+
+If `download_data.py` was run with `--election-type`, `--jurisdiction` or `--year`,
+the filters it saved in `data/raw/.download_filters.json` restrict processing to
+the same subset of races.
 
 Usage:
-    python process_data.py
+    python -m scripts.process_data [--auto-accept-score N] [--non-interactive]
+                                   [--incremental] [--workers N] [--profiles]
+                                   [--sqlite]
 """
 
+import argparse
+import hashlib
+import json
+import mmap
 import os
-from dataclasses import dataclass
-from typing import Dict, List, Tuple
-
+import pickle
+import re
+import shutil
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
 import pandas as pd
 from rapidfuzz import fuzz, process
 
+from scripts.ballots import (
+    PROFILE_DIR_SUFFIX,
+    build_profile,
+    get_rank_columns,
+    read_profile_header,
+)
+from scripts.elections_db import ELECTIONS_SQLITE_PATH, write_elections_sqlite
+from scripts.race_ids import matches_race_filters, normalize_jurisdiction
+
 
 @dataclass
 class MatchResults:
@@ -37,6 +113,8 @@ class MatchResults:
     newly_matched: List[Dict]
     still_unmatched: List[str]
     manual_matches_log: List[str]
+    rejected_matches_log: List[str] = field(default_factory=list)
+    auto_accepted_log: List[str] = field(default_factory=list)
 
 
 # --- Constants and Configuration ---
@@ -51,6 +129,55 @@ PROCESSED_DATA_DIR = os.path.join(BASE_DIR, "data", "processed")
 # Output filenames
 ELECTIONS_DB_FILENAME = "elections_database.csv"
 UNMATCHED_LOG_FILENAME = "unmatched_files.log"
+MANUAL_MATCHES_FILENAME = "manual_matches.log"
+REJECTED_MATCHES_FILENAME = "rejected_matches.log"
+AUTO_ACCEPTED_MATCHES_FILENAME = "auto_accepted_matches.log"
+PROCESSING_MANIFEST_FILENAME = ".processing_manifest.json"
+PROFILES_DIRNAME = "profiles"
+METADATA_CATALOG_FILENAME = ".metadata_catalog.pkl"
+
+# The directory with the metadata tabs of the RCV database
+METADATA_DIR = os.path.join(RAW_DATA_DIR, "rcv_database")
+
+# The number of bytes hashed at a time when fingerprinting files
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# The number of raw files handled by one task of the worker process pool
+SCAN_SHARD_SIZE = 64
+
+# The number of rows read after the header when sniffing a CVR's schema
+SNIFF_SAMPLE_ROWS = 20
+
+# The number of bytes of a memory-mapped CVR scanned for newlines at a time
+NEWLINE_SCAN_CHUNK_SIZE = 16 * 1024 * 1024
+
+# The layout details recorded for every raw file
+SNIFF_KEYS = ("rank_columns", "candidate_columns", "ballots")
+
+# Bumped whenever sniffing changes, so earlier results are not reused
+SNIFF_VERSION = 2
+
+# The number of fuzzy suggestions kept for each unmatched file
+FUZZY_TOP_K = 15
+
+# The number of fuzzy suggestions shown per page of the interactive review
+FUZZY_PAGE_SIZE = 5
+
+# The highest fuzzy match score
+MAX_FUZZY_SCORE = 100
+
+# The filters saved by a filtered run of download_data.py
+DOWNLOAD_FILTERS_PATH = os.path.join(RAW_DATA_DIR, ".download_filters.json")
+
+# Splits an office such as `HouseDistrict1` into words
+OFFICE_WORD_PATTERN = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+")
+
+# Office words shorter than this are too common to be used as blocking keys
+MIN_OFFICE_WORD_LENGTH = 3
+
+# Metadata columns with at most this share of distinct values are stored as
+# categoricals in the metadata catalog
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
 
 # Defines the relationship between metadata files and the directories containing
 # the corresponding raw ballot data.
@@ -63,6 +190,40 @@ ELECTION_SOURCES = {
 # --- Function Definitions ---
 
 
+def load_download_filters() -> Dict[str, List[str]]:
+    """
+    Reads the filters of the most recent filtered download, if there was one.
+
+    Returns:
+        Dict[str, List[str]]: The `election_types`, `jurisdictions` and `years`
+        filters, or an empty dictionary if the whole corpus was downloaded.
+    """
+    try:
+        with open(DOWNLOAD_FILTERS_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except json.JSONDecodeError:
+        print(f"Warning: Ignoring unreadable filters at {DOWNLOAD_FILTERS_PATH}")
+        return {}
+
+
+def matches_download_filters(name: str, filters: Dict[str, List[str]]) -> bool:
+    """
+    Checks a RaceID or CVR filename against the jurisdiction and year filters.
+
+    Args:
+        name (str): The RaceID or filename.
+        filters (Dict[str, List[str]]): The filters from `load_download_filters`.
+
+    Returns:
+        bool: True if the race belongs to the downloaded subset.
+    """
+    return matches_race_filters(
+        name, filters.get("jurisdictions", []), filters.get("years", [])
+    )
+
+
 def get_race_ids(csv_path: str) -> List[str]:
     """
     Extracts a unique list of RaceIDs from a given metadata CSV file.
@@ -102,7 +263,11 @@ def get_election_filepaths(dir_path: str) -> List[str]:
 
 
 def match_elections_exact(
-    metadata_csv_path: str, data_dir_path: str
+    metadata_csv_path: str,
+    data_dir_path: str,
+    filters: Optional[Dict[str, List[str]]] = None,
+    filepaths: Optional[List[str]] = None,
+    race_ids: Optional[List[str]] = None,
 ) -> Tuple[List[Dict], List[str]]:
     """
     Performs an exact match between RaceIDs in a metadata file and the filenames
@@ -111,15 +276,26 @@ def match_elections_exact(
     Args:
         metadata_csv_path (str): Path to the metadata CSV file.
         data_dir_path (str): Path to the directory with raw ballot data.
+        filters (Dict[str, List[str]], optional): Download filters; files outside
+            the filtered subset are ignored.
+        filepaths (List[str], optional): Only match these files instead of every
+            file in the directory.
+        race_ids (List[str], optional): The RaceIDs of the metadata file, if they
+            were already loaded (e.g. from a `MetadataCatalog`).
 
     Returns:
         Tuple[List[Dict], List[str]]: A tuple containing:
         - A list of matched race dictionaries.
         - A list of filepaths that could not be matched.
     """
-    race_ids = get_race_ids(metadata_csv_path)
+    if race_ids is None:
+        race_ids = get_race_ids(metadata_csv_path)
     race_id_set = set(race_ids)
-    filepaths = get_election_filepaths(data_dir_path)
+    if filepaths is None:
+        filepaths = get_election_filepaths(data_dir_path)
+    filepaths = [
+        path for path in filepaths if matches_download_filters(path, filters or {})
+    ]
 
     matched_races = []
     unmatched_filepaths = []
@@ -128,7 +304,14 @@ def match_elections_exact(
         # Extract the filename without extension to match against RaceID
         filename = os.path.splitext(os.path.basename(path))[0]
         if filename in race_id_set:
-            matched_races.append({"filepath": path, "race_id": filename})
+            matched_races.append(
+                {
+                    "filepath": path,
+                    "race_id": filename,
+                    "match_method": "exact",
+                    "match_score": 100.0,
+                }
+            )
         else:
             unmatched_filepaths.append(path)
 
@@ -178,6 +361,7 @@ def _process_user_choice(
     top_matches: List[Tuple[str, float, int]],
     path: str,
     match_results: MatchResults,
+    shown: int,
 ) -> bool:
     """
     Processes the user's choice for fuzzy matching.
@@ -188,6 +372,8 @@ def _process_user_choice(
         path (str): The filepath of the file being matched.
         match_results (MatchResults): An object holding the lists for matched,
                                     unmatched, and logged results.
+        shown (int): The number of suggestions displayed so far. Only these are
+            recorded as declined when the file is skipped.
 
     Returns:
         bool: True if the loop for the current file should break, False otherwise.
@@ -195,6 +381,9 @@ def _process_user_choice(
     try:
         if raw_input.strip() == "0":
             match_results.still_unmatched.append(path)
+            match_results.rejected_matches_log.extend(
+                f"{path},{race_id}" for race_id, _, _ in top_matches[:shown]
+            )
             print(f"Skipped file: {os.path.basename(path)}")
             return True
 
@@ -208,9 +397,14 @@ def _process_user_choice(
             return False
 
         for choice in choices:
-            chosen_race_id = top_matches[choice - 1][0]
+            chosen_race_id, score, _ = top_matches[choice - 1]
             match_results.newly_matched.append(
-                {"filepath": path, "race_id": chosen_race_id}
+                {
+                    "filepath": path,
+                    "race_id": chosen_race_id,
+                    "match_method": "manual",
+                    "match_score": score,
+                }
             )
             match_results.manual_matches_log.append(f"{path},{chosen_race_id}")
             print(f"  -> Match recorded: {os.path.basename(path)} -> {chosen_race_id}")
@@ -224,21 +418,329 @@ def _process_user_choice(
         return True
 
 
+def race_id_block_keys(name: str) -> List[Tuple[str, str]]:
+    """
+    Derives the blocking keys of a RaceID or CVR filename.
+
+    Names are split on underscores into a jurisdiction, an 8-digit date and an
+    office, e.g. `Alaska_11082022_HouseDistrict1`. Every part is normalized to
+    lowercase letters and digits.
+
+    Args:
+        name (str): The RaceID or filename, without extension.
+
+    Returns:
+        List[Tuple[str, str]]: `("jurisdiction", ...)` and `("date", ...)` keys,
+        followed by one `("office", word)` key per distinctive office word.
+    """
+    parts = name.split("_")
+    keys = []
+    jurisdiction = normalize_jurisdiction(parts[0])
+    if len(parts) > 1 and jurisdiction:
+        keys.append(("jurisdiction", jurisdiction))
+    office_parts = parts[1:]
+    if len(parts) > 1 and re.fullmatch(r"\d{8}", parts[1]):
+        keys.append(("date", parts[1]))
+        office_parts = parts[2:]
+    for part in office_parts:
+        for word in OFFICE_WORD_PATTERN.findall(part):
+            if len(word) >= MIN_OFFICE_WORD_LENGTH and not word.isdigit():
+                keys.append(("office", word.lower()))
+    return keys
+
+
+class RaceIdBlockIndex:
+    """
+    A blocking index that narrows the RaceIDs worth fuzzy-scoring for a filename.
+
+    A filename is only compared with the RaceIDs sharing its jurisdiction or date.
+    If it shares neither, the RaceIDs sharing an office word are used. Only when
+    no block matches at all does it fall back to every RaceID, so the index never
+    hides a candidate that brute-force matching could only find by chance.
+    """
+
+    def __init__(self, race_ids: List[str]):
+        self.race_ids = list(race_ids)
+        self.blocks: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+        for i, race_id in enumerate(self.race_ids):
+            for key in set(race_id_block_keys(race_id)):
+                self.blocks[key].append(i)
+
+    def candidates(self, name: str) -> List[int]:
+        """
+        Returns the indices of the RaceIDs sharing a block with `name`.
+
+        Args:
+            name (str): The filename, without extension.
+
+        Returns:
+            List[int]: Indices into `race_ids`, in ascending order.
+        """
+        keys = race_id_block_keys(name)
+        strong = [key for key in keys if key[0] != "office"]
+        office = [key for key in keys if key[0] == "office"]
+        for selected in (strong, office):
+            found = {i for key in selected for i in self.blocks.get(key, ())}
+            if found:
+                return sorted(found)
+        return list(range(len(self.race_ids)))
+
+
+def prescore_fuzzy_matches(
+    unmatched_filepaths: List[str],
+    race_ids: List[str],
+    top_k: int = FUZZY_TOP_K,
+    index: Optional[RaceIdBlockIndex] = None,
+    score_cutoff: Optional[float] = None,
+) -> Dict[str, List[Tuple[str, float, int]]]:
+    """
+    Scores the unmatched filenames against their candidate RaceIDs in batches.
+
+    A `RaceIdBlockIndex` picks the candidates of each file. Files with the same
+    candidates are scored together by one `rapidfuzz.process.cdist` call on all
+    cores, and the `top_k` best RaceIDs are kept for each file. Within its
+    candidates, a file gets the same suggestions as `process.extract` would give.
+
+    Args:
+        unmatched_filepaths (List[str]): Files that failed exact matching.
+        race_ids (List[str]): The list of possible RaceIDs for this category.
+        top_k (int): The number of suggestions kept per file.
+        index (RaceIdBlockIndex, optional): A prebuilt index over `race_ids`.
+        score_cutoff (float, optional): Scores below this are reported as 0, which
+            lets rapidfuzz stop scoring hopeless pairs early.
+
+    Returns:
+        Dict[str, List[Tuple[str, float, int]]]: The `(race_id, score, index)`
+        suggestions of every file, best first. The index refers to `race_ids`.
+    """
+    index = index or RaceIdBlockIndex(race_ids)
+    groups: Dict[Tuple[int, ...], List[Tuple[str, str]]] = defaultdict(list)
+    for path in unmatched_filepaths:
+        filename = os.path.splitext(os.path.basename(path))[0]
+        groups[tuple(index.candidates(filename))].append((path, filename))
+
+    suggestions = {}
+    for candidates, members in groups.items():
+        choices = [race_ids[j] for j in candidates]
+        scores = process.cdist(
+            [filename for _, filename in members],
+            choices,
+            scorer=fuzz.WRatio,
+            dtype=np.float64,
+            workers=-1,
+            score_cutoff=score_cutoff,
+        )
+        # A stable sort keeps ties in RaceID order, as process.extract does
+        best = np.argsort(-scores, axis=1, kind="stable")[:, :top_k]
+        for row, (path, _) in enumerate(members):
+            suggestions[path] = [
+                (choices[k], float(scores[row, k]), candidates[k]) for k in best[row]
+            ]
+    return suggestions
+
+
+def _review_file(
+    path: str, top_matches: List[Tuple[str, float, int]], match_results: MatchResults
+) -> None:
+    """
+    Prompts the user until they pick matches for a file or skip it.
+
+    Args:
+        path (str): The filepath of the file being matched.
+        top_matches (List[Tuple[str, float, int]]): Top fuzzy matches.
+        match_results (MatchResults): Receives the user's decision.
+    """
+    print(f"\nFile: {os.path.basename(path)}")
+    print("Could not find an exact match. Here are the best suggestions:")
+
+    page = 0
+    while True:
+        shown = min((page + 1) * FUZZY_PAGE_SIZE, len(top_matches))
+        raw_input, page = _get_user_fuzzy_match_choice(
+            top_matches, page, FUZZY_PAGE_SIZE
+        )
+
+        if raw_input.strip() == "":  # More suggestions already handled
+            continue
+
+        if _process_user_choice(
+            raw_input,
+            top_matches,
+            path,
+            match_results,
+            shown,
+        ):
+            break
+
+
+def _decision_key(path: str) -> str:
+    """Identifies a raw file by its path relative to the raw data directory."""
+    return os.path.relpath(os.path.abspath(path), os.path.abspath(RAW_DATA_DIR))
+
+
+def _read_match_log(log_path: str) -> List[Tuple[str, str]]:
+    """
+    Reads the `filepath,race_id` pairs of a match log.
+
+    Args:
+        log_path (str): The path of the log file.
+
+    Returns:
+        List[Tuple[str, str]]: The recorded pairs, or an empty list if the log
+        does not exist.
+    """
+    if not os.path.exists(log_path):
+        return []
+    pairs = []
+    with open(log_path, "r") as f:
+        for raw_line in f:
+            line = raw_line.rstrip("\n")
+            if not line or line.startswith("#") or line == "filepath,race_id":
+                continue
+            path, _, race_id = line.rpartition(",")
+            pairs.append((path, race_id))
+    return pairs
+
+
+class DecisionCache:
+    """
+    Holds the fuzzy-matching decisions made on earlier runs.
+
+    Accepted matches come from `manual_matches.log` and declined suggestions from
+    `rejected_matches.log`. Both are keyed by the file's path relative to the raw
+    data directory, so the logs stay valid if the repository is moved.
+    """
+
+    def __init__(self, processed_dir: str = PROCESSED_DATA_DIR):
+        self.accepted: Dict[str, List[str]] = defaultdict(list)
+        self.rejected: Dict[str, Set[str]] = defaultdict(set)
+        manual_log = os.path.join(processed_dir, MANUAL_MATCHES_FILENAME)
+        for path, race_id in _read_match_log(manual_log):
+            if race_id not in self.accepted[_decision_key(path)]:
+                self.accepted[_decision_key(path)].append(race_id)
+        rejected_log = os.path.join(processed_dir, REJECTED_MATCHES_FILENAME)
+        for path, race_id in _read_match_log(rejected_log):
+            self.rejected[_decision_key(path)].add(race_id)
+
+    def accepted_for(self, path: str, race_ids: Set[str]) -> List[str]:
+        """Returns the previously chosen RaceIDs of `path` that still exist."""
+        return [r for r in self.accepted.get(_decision_key(path), []) if r in race_ids]
+
+    def rejected_for(self, path: str) -> Set[str]:
+        """Returns the RaceIDs previously declined for `path`."""
+        return self.rejected.get(_decision_key(path), set())
+
+
+@dataclass
+class MatchOptions:
+    """Holds the settings of the fuzzy matching stage."""
+
+    decisions: Optional[DecisionCache] = None
+    auto_accept_score: Optional[float] = None
+    interactive: bool = True
+
+
+def _apply_decisions(
+    unmatched_filepaths: List[str],
+    race_ids: List[str],
+    options: MatchOptions,
+    match_results: MatchResults,
+) -> List[str]:
+    """
+    Resolves files from earlier decisions and unambiguous high-scoring matches.
+
+    Args:
+        unmatched_filepaths (List[str]): Files that failed exact matching.
+        race_ids (List[str]): The list of possible RaceIDs for this category.
+        options (MatchOptions): The decision cache and auto-accept cutoff.
+        match_results (MatchResults): Receives the resolved matches.
+
+    Returns:
+        List[str]: The files that still need a decision.
+    """
+    race_id_set = set(race_ids)
+    remaining = []
+    for path in unmatched_filepaths:
+        accepted = options.decisions.accepted_for(path, race_id_set)
+        for race_id in accepted:
+            match_results.newly_matched.append(
+                {
+                    "filepath": path,
+                    "race_id": race_id,
+                    "match_method": "earlier_decision",
+                    "match_score": None,
+                }
+            )
+        if not accepted:
+            remaining.append(path)
+    if len(remaining) < len(unmatched_filepaths):
+        print(
+            f"Applied earlier decisions to "
+            f"{len(unmatched_filepaths) - len(remaining)} file(s)."
+        )
+
+    cutoff = options.auto_accept_score
+    if cutoff is None or not remaining:
+        return remaining
+    # With a cutoff, rapidfuzz skips the rest of a comparison as soon as it cannot
+    # reach the cutoff, and reports 0 for it
+    best = prescore_fuzzy_matches(remaining, race_ids, top_k=2, score_cutoff=cutoff)
+    still_open = []
+    for path in remaining:
+        hits = [m for m in best[path] if m[1] >= cutoff]
+        if len(hits) == 1 and hits[0][0] not in options.decisions.rejected_for(path):
+            match_results.newly_matched.append(
+                {
+                    "filepath": path,
+                    "race_id": hits[0][0],
+                    "match_method": "auto_accept",
+                    "match_score": hits[0][1],
+                }
+            )
+            match_results.auto_accepted_log.append(f"{path},{hits[0][0]}")
+            print(f"  -> Auto-accepted: {os.path.basename(path)} -> {hits[0][0]}")
+        else:
+            still_open.append(path)
+    return still_open
+
+
+def _append_match_log(log_name: str, header: str, entries: List[str]) -> None:
+    """Appends `filepath,race_id` entries to a log in the processed directory."""
+    log_path = os.path.join(PROCESSED_DATA_DIR, log_name)
+    # Append to the log file
+    with open(log_path, "a") as f:
+        if f.tell() == 0:  # Write header if file is new/empty
+            f.write(f"# {header}\n")
+            f.write("filepath,race_id\n")
+        for entry in entries:
+            f.write(f"{entry}\n")
+    print(f"\n{header} logged at: {log_path}")
+
+
 def match_elections_fuzzy(
-    unmatched_filepaths: List[str], race_ids: List[str]
+    unmatched_filepaths: List[str],
+    race_ids: List[str],
+    options: Optional[MatchOptions] = None,
 ) -> Tuple[List[Dict], List[str]]:
     """
     Performs interactive fuzzy matching for unmatched files against a given
     list of RaceIDs, allowing for multiple selections.
 
+    Files decided on an earlier run, and unambiguous matches above the
+    auto-accept cutoff, are resolved without prompting.
+
     Args:
         unmatched_filepaths (List[str]): Files that failed exact matching.
         race_ids (List[str]): The list of possible RaceIDs for this category.
+        options (MatchOptions, optional): The decision cache, auto-accept cutoff
+            and whether to prompt at all.
 
     Returns:
         A tuple containing a list of newly matched races and a list of files
     that remain unmatched.
     """
+    options = options or MatchOptions()
+    options.decisions = options.decisions or DecisionCache()
     match_results = MatchResults(
         newly_matched=[], still_unmatched=[], manual_matches_log=[]
     )
@@ -246,100 +748,987 @@ def match_elections_fuzzy(
     if not unmatched_filepaths:
         return match_results.newly_matched, match_results.still_unmatched
 
+    unmatched_filepaths = _apply_decisions(
+        unmatched_filepaths, race_ids, options, match_results
+    )
+    if match_results.auto_accepted_log:
+        _append_match_log(
+            AUTO_ACCEPTED_MATCHES_FILENAME,
+            f"Matches auto-accepted at a score of at least {options.auto_accept_score}",
+            match_results.auto_accepted_log,
+        )
+    if not unmatched_filepaths:
+        return match_results.newly_matched, match_results.still_unmatched
+    if not options.interactive:
+        print(f"Leaving {len(unmatched_filepaths)} file(s) for manual review.")
+        match_results.still_unmatched.extend(unmatched_filepaths)
+        return match_results.newly_matched, match_results.still_unmatched
+
+    print(
+        f"Scoring {len(unmatched_filepaths)} file(s) against {len(race_ids)} "
+        "RaceIDs (blocked by jurisdiction and date)..."
+    )
+    suggestions = prescore_fuzzy_matches(unmatched_filepaths, race_ids)
+
     print("\n--- Starting Interactive Fuzzy Matching ---")
     for path in unmatched_filepaths:
-        filename = os.path.splitext(os.path.basename(path))[0]
-        top_matches = process.extract(filename, race_ids, scorer=fuzz.WRatio, limit=15)
+        rejected = options.decisions.rejected_for(path)
+        if rejected and suggestions[path] and suggestions[path][0][0] in rejected:
+            # Skipped before, and no better RaceID has appeared since
+            match_results.still_unmatched.append(path)
+            continue
+        top_matches = [m for m in suggestions[path] if m[0] not in rejected]
+        _review_file(path, top_matches, match_results)
+
+    if match_results.manual_matches_log:
+        _append_match_log(
+            MANUAL_MATCHES_FILENAME,
+            "Manual matches chosen by the user",
+            match_results.manual_matches_log,
+        )
+    if match_results.rejected_matches_log:
+        _append_match_log(
+            REJECTED_MATCHES_FILENAME,
+            "Suggestions declined by the user",
+            match_results.rejected_matches_log,
+        )
+
+    return match_results.newly_matched, match_results.still_unmatched
+
+
+def fingerprint_file(path: str, previous: Optional[Dict] = None) -> Dict:
+    """
+    Returns the size, modification time and SHA-256 of a file.
+
+    The file is only hashed if its size or modification time differs from the
+    `previous` fingerprint, so unchanged files cost a single `stat` call.
+
+    Args:
+        path (str): The file to fingerprint.
+        previous (Dict, optional): The fingerprint recorded on an earlier run.
+
+    Returns:
+        Dict: The `size`, `mtime_ns` and `sha256` of the file.
+    """
+    stat = os.stat(path)
+    fingerprint = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if previous and all(previous.get(k) == v for k, v in fingerprint.items()):
+        fingerprint["sha256"] = previous["sha256"]
+        return fingerprint
+
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            sha256.update(block)
+    fingerprint["sha256"] = sha256.hexdigest()
+    return fingerprint
+
+
+def count_lines(path: str) -> int:
+    """
+    Counts the lines of a file with a memory-mapped newline scan.
+
+    A last line without a trailing newline is counted as well.
+
+    Args:
+        path (str): The file to scan.
+
+    Returns:
+        int: The number of lines.
+    """
+    if os.path.getsize(path) == 0:
+        return 0
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        lines = sum(
+            mm[i : i + NEWLINE_SCAN_CHUNK_SIZE].count(b"\n")
+            for i in range(0, len(mm), NEWLINE_SCAN_CHUNK_SIZE)
+        )
+        return lines + (mm[-1:] != b"\n")
+
+
+def _is_ranking_column(values: pd.Series, max_rank: int) -> bool:
+    """Whether a sample column only holds rankings from 1 to `max_rank`."""
+    values = values.dropna()
+    if values.empty or not values.str.fullmatch(r"\d+").all():
+        return False
+    ranks = values.astype(int)
+    return bool(ranks.between(1, max_rank).all())
+
+
+def sniff_cvr(path: str) -> Dict:
+    """
+    Describes the layout of a CVR from its header, a small sample of rows and a
+    newline count, without parsing the whole file.
+
+    A rank-column CVR has one column per rank ("rank1", "rank2", ...) holding
+    candidate names; its rank columns are picked by `ballots.get_rank_columns`,
+    as when its profile is built. A candidate-column CVR instead has one column
+    per candidate holding the rank given to that candidate; it is recognised by
+    columns whose sampled values are all small integers.
+
+    Args:
+        path (str): The path of the CVR.
+
+    Returns:
+        Dict: The number of `rank_columns` and `candidate_columns` and the number
+        of `ballots` (data rows, assuming no quoted newlines), all None if the
+        file cannot be read as a CSV.
+    """
+    try:
+        sample = pd.read_csv(path, nrows=SNIFF_SAMPLE_ROWS, dtype=str)
+    except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError):
+        return {"rank_columns": None, "candidate_columns": None, "ballots": None}
+
+    rank_columns = get_rank_columns(list(sample.columns))
+    candidate_columns = []
+    if not rank_columns:
+        candidate_columns = [
+            col
+            for col in sample.columns
+            if _is_ranking_column(sample[col], len(sample.columns))
+        ]
+    return {
+        "rank_columns": len(rank_columns),
+        "candidate_columns": len(candidate_columns),
+        "ballots": max(count_lines(path) - 1, 0),
+    }
+
+
+class ProcessingManifest:
+    """
+    Records the fingerprint and match outcome of every processed file.
+
+    Raw files and metadata CSVs are keyed by their path relative to the raw data
+    directory. Each raw file entry also holds its election type and its matches
+    (RaceID, method and score; empty if it stayed unmatched). Entries written
+    before matches were recorded only list their `race_ids`; these are read as
+    matches of unknown method.
+    """
+
+    def __init__(self, processed_dir: str = PROCESSED_DATA_DIR):
+        self.path = os.path.join(processed_dir, PROCESSING_MANIFEST_FILENAME)
+        self.files: Dict[str, Dict] = {}
+        self.metadata: Dict[str, Dict] = {}
+        self.filters: Dict[str, List[str]] = {}
+        self.exists = False
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                content = json.load(f)
+            self.files = content.get("files", {})
+            for entry in self.files.values():
+                if "matches" not in entry and "race_ids" in entry:
+                    entry["matches"] = [
+                        {"race_id": r, "match_method": "unknown", "match_score": None}
+                        for r in entry.pop("race_ids")
+                    ]
+            self.metadata = content.get("metadata", {})
+            self.filters = content.get("filters", {})
+            self.exists = True
+        except FileNotFoundError:
+            pass
+        except json.JSONDecodeError:
+            print(f"Warning: Ignoring unreadable processing manifest at {self.path}")
+
+    def save(self) -> None:
+        """Writes the manifest to disk atomically."""
+        content = {
+            "files": self.files,
+            "metadata": self.metadata,
+            "filters": self.filters,
+        }
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(content, f, indent=2, sort_keys=True)
+        os.replace(temp_path, self.path)
+
+
+def _compact_metadata(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Indexes a metadata table by RaceID and stores repetitive columns as
+    categoricals.
+
+    Args:
+        df (pd.DataFrame): The metadata tab, read with every column as strings.
+
+    Returns:
+        pd.DataFrame: The same rows, indexed by RaceID if the tab has one.
+    """
+    for column in df.columns:
+        if df[column].nunique() <= CATEGORY_MAX_UNIQUE_RATIO * len(df):
+            df[column] = df[column].astype("category")
+    if "RaceID" in df.columns:
+        df = df.set_index("RaceID", drop=False)
+        df.index.name = None
+    return df
 
-        print(f"\nFile: {os.path.basename(path)}")
-        print("Could not find an exact match. Here are the best suggestions:")
 
-        page = 0
-        while True:
-            raw_input, page = _get_user_fuzzy_match_choice(top_matches, page, 5)
+class MetadataCatalog:
+    """
+    Every tab of the RCV database, parsed once and shared by all matching stages.
 
-            if raw_input.strip() == "":  # More suggestions already handled
+    Each tab is kept as a DataFrame indexed by RaceID, with repetitive columns
+    stored as categoricals, together with its unique RaceIDs. The catalog is
+    pickled to `data/processed/.metadata_catalog.pkl` with the SHA-256 of every
+    tab, so later runs only parse the tabs that changed.
+    """
+
+    def __init__(
+        self,
+        metadata_dir: str = METADATA_DIR,
+        processed_dir: str = PROCESSED_DATA_DIR,
+    ):
+        self.metadata_dir = metadata_dir
+        self.path = os.path.join(processed_dir, METADATA_CATALOG_FILENAME)
+        self.tables: Dict[str, pd.DataFrame] = {}
+        self.race_ids: Dict[str, List[str]] = {}
+        self.fingerprints: Dict[str, Dict] = {}
+        self._race_id_sets: Dict[str, Set[str]] = {}
+        self.load()
+
+    def _read_snapshot(self) -> Dict:
+        """Returns the pickled catalog of an earlier run, or an empty one."""
+        try:
+            with open(self.path, "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return {}
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            print(f"Warning: Ignoring unreadable metadata catalog at {self.path}")
+            return {}
+
+    def load(self) -> None:
+        """
+        Loads every metadata tab, parsing only those whose hash differs from the
+        snapshot, and saves the snapshot again if anything changed.
+        """
+        snapshot = self._read_snapshot()
+        previous = snapshot.get("fingerprints", {})
+        filenames = []
+        if os.path.isdir(self.metadata_dir):
+            filenames = sorted(
+                f for f in os.listdir(self.metadata_dir) if f.endswith(".csv")
+            )
+
+        parsed = 0
+        for filename in filenames:
+            path = os.path.join(self.metadata_dir, filename)
+            fingerprint = fingerprint_file(path, previous.get(filename))
+            self.fingerprints[filename] = fingerprint
+            cached = previous.get(filename, {}).get("sha256") == fingerprint["sha256"]
+            if cached and filename in snapshot.get("tables", {}):
+                self.tables[filename] = snapshot["tables"][filename]
+                self.race_ids[filename] = snapshot["race_ids"][filename]
+                continue
+            try:
+                df = pd.read_csv(path, dtype=str)
+            except Exception as e:
+                print(f"Error reading metadata from {path}: {e}")
                 continue
+            self.tables[filename] = _compact_metadata(df)
+            self.race_ids[filename] = (
+                df["RaceID"].dropna().unique().tolist() if "RaceID" in df else []
+            )
+            parsed += 1
+
+        if parsed or self.fingerprints != previous:
+            self.save()
+
+    def save(self) -> None:
+        """Pickles the catalog atomically."""
+        content = {
+            "fingerprints": self.fingerprints,
+            "tables": self.tables,
+            "race_ids": self.race_ids,
+        }
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "wb") as f:
+            pickle.dump(content, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, self.path)
+
+    def has(self, filename: str) -> bool:
+        """Whether a metadata tab was loaded."""
+        return filename in self.tables
+
+    def get_race_ids(self, filename: str) -> List[str]:
+        """
+        Returns the unique, non-null RaceIDs of a metadata tab in file order.
+
+        Args:
+            filename (str): The tab's filename, e.g. `SingleWinnerRCV.csv`.
+
+        Returns:
+            List[str]: The RaceIDs, or an empty list if the tab does not exist.
+        """
+        if filename not in self.race_ids:
+            path = os.path.join(self.metadata_dir, filename)
+            print(f"Warning: Metadata file not found at {path}")
+            self.race_ids[filename] = []
+        return self.race_ids[filename]
+
+    def race_id_set(self, filename: str) -> Set[str]:
+        """Returns the RaceIDs of a metadata tab as a set."""
+        if filename not in self._race_id_sets:
+            self._race_id_sets[filename] = set(self.get_race_ids(filename))
+        return self._race_id_sets[filename]
+
+    def rows(self, filename: str) -> pd.DataFrame:
+        """
+        Returns the full rows of a metadata tab as plain strings.
+
+        Args:
+            filename (str): The tab's filename.
+
+        Returns:
+            pd.DataFrame: The tab with a default index, empty if it does not exist.
+        """
+        if filename not in self.tables:
+            return pd.DataFrame()
+        df = self.tables[filename].reset_index(drop=True)
+        return df.astype({c: object for c in df.select_dtypes("category").columns})
+
+    def lookup(self, filename: str, race_id: str) -> Optional[Dict]:
+        """
+        Returns the metadata row of a RaceID without scanning the tab.
+
+        Args:
+            filename (str): The tab's filename.
+            race_id (str): The RaceID.
+
+        Returns:
+            Optional[Dict]: The first row with that RaceID, or None.
+        """
+        if race_id not in self.race_id_set(filename):
+            return None
+        row = self.tables[filename].loc[race_id]
+        if isinstance(row, pd.DataFrame):
+            row = row.iloc[0]
+        return row.to_dict()
 
-            if _process_user_choice(
-                raw_input,
-                top_matches,
-                path,
-                match_results,
-            ):
-                break
 
-    if match_results.manual_matches_log:
-        log_path = os.path.join(PROCESSED_DATA_DIR, "manual_matches.log")
-        # Append to the log file
-        with open(log_path, "a") as f:
-            if f.tell() == 0:  # Write header if file is new/empty
-                f.write("# Manual matches chosen by the user\n")
-                f.write("filepath,race_id\n")
-            for entry in match_results.manual_matches_log:
-                f.write(f"{entry}\n")
-        print(f"\nManual matches logged at: {log_path}")
+@dataclass
+class ProcessingContext:
+    """Holds the state shared by the processing of every election source."""
 
-    return match_results.newly_matched, match_results.still_unmatched
+    filters: Dict[str, List[str]]
+    match_options: MatchOptions
+    manifest: ProcessingManifest
+    catalog: MetadataCatalog
+    incremental: bool = False
+    workers: int = 1
+    files: Dict[str, Dict] = field(default_factory=dict)
+    metadata: Dict[str, Dict] = field(default_factory=dict)
+    scanned: Dict[str, Dict] = field(default_factory=dict)
 
 
-# --- Main Execution ---
+@dataclass
+class SourceResult:
+    """Holds the outcome of processing one election source."""
+
+    election_type: str
+    metadata_filename: str
+    matched: List[Dict] = field(default_factory=list)
+    unmatched: List[str] = field(default_factory=list)
+    kept: List[str] = field(default_factory=list)
+    pending: List[str] = field(default_factory=list)
 
 
-def main():
+def _scan_file(path: str, previous: Optional[Dict]) -> Dict:
     """
-    Main function to orchestrate the data processing pipeline.
+    Fingerprints and sniffs a raw file, reusing the earlier sniff results if the
+    file did not change.
+
+    Args:
+        path (str): The raw file.
+        previous (Dict, optional): The manifest entry of an earlier run.
+
+    Returns:
+        Dict: The fingerprint of the file together with its `sniff_cvr` results.
     """
-    print("--- Starting Data Processing ---")
+    fingerprint = fingerprint_file(path, previous)
+    if (
+        previous
+        and previous["sha256"] == fingerprint["sha256"]
+        and previous.get("sniff_version") == SNIFF_VERSION
+    ):
+        sniffed = {key: previous[key] for key in SNIFF_KEYS}
+    else:
+        sniffed = sniff_cvr(path)
+    return dict(fingerprint, **sniffed, sniff_version=SNIFF_VERSION)
 
-    # Ensure the processed data directory exists
-    os.makedirs(PROCESSED_DATA_DIR, exist_ok=True)
-    print(f"Processed data will be saved to: {PROCESSED_DATA_DIR}")
 
-    all_matched_races = []
-    all_unmatched_files = []
+def _scan_shard(shard: List[Tuple[str, Optional[Dict]]]) -> List[Dict]:
+    """
+    Fingerprints and sniffs a shard of raw files. Runs in a worker process.
+
+    Args:
+        shard (List[Tuple[str, Optional[Dict]]]): Each file with the manifest
+            entry recorded for it on an earlier run.
+
+    Returns:
+        List[Dict]: The result of `_scan_file` for each file, in shard order.
+    """
+    return [_scan_file(path, previous) for path, previous in shard]
+
+
+def scan_raw_files(
+    filepaths: List[str], manifest: ProcessingManifest, workers: int = 1
+) -> Dict[str, Dict]:
+    """
+    Fingerprints and sniffs raw files, in parallel across a process pool if
+    `workers` > 1.
+
+    The files are split into shards of `SCAN_SHARD_SIZE`, so a single large
+    directory is spread over every worker as well. `Executor.map` returns the
+    shards in submission order, which keeps the result deterministic.
+
+    Args:
+        filepaths (List[str]): The raw files of every source.
+        manifest (ProcessingManifest): The manifest of the earlier run; files
+            whose size and modification time did not change are not hashed again.
+        workers (int): The number of worker processes.
+
+    Returns:
+        Dict[str, Dict]: The fingerprint and sniff results of each file, keyed by
+        its path.
+    """
+    shards = [
+        [(path, manifest.files.get(_decision_key(path))) for path in chunk]
+        for chunk in (
+            filepaths[i : i + SCAN_SHARD_SIZE]
+            for i in range(0, len(filepaths), SCAN_SHARD_SIZE)
+        )
+    ]
+    if workers > 1 and len(shards) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(shards))) as executor:
+            results = list(executor.map(_scan_shard, shards))
+    else:
+        results = [_scan_shard(shard) for shard in shards]
+    fingerprints = [fingerprint for result in results for fingerprint in result]
+    return dict(zip(filepaths, fingerprints))
+
+
+def _plan_source_files(
+    filepaths: List[str], metadata_changed: bool, context: ProcessingContext
+) -> Tuple[List[str], List[str]]:
+    """
+    Decides which of a source's raw files need matching.
+
+    Args:
+        filepaths (List[str]): The raw files of the source.
+        metadata_changed (bool): Whether the source's metadata CSV changed.
+        context (ProcessingContext): The earlier manifest, the incremental flag,
+            the fingerprints of this run and its file entries.
+
+    Returns:
+        Tuple[List[str], List[str]]: The files to match, and the unchanged files
+        whose recorded outcome is kept.
+    """
+    pending, kept = [], []
+    for path in filepaths:
+        key = _decision_key(path)
+        previous = context.manifest.files.get(key)
+        fingerprint = context.scanned[path]
+        if (
+            context.incremental
+            and not metadata_changed
+            and previous is not None
+            and previous["sha256"] == fingerprint["sha256"]
+        ):
+            context.files[key] = dict(previous, **fingerprint)
+            kept.append(path)
+        else:
+            context.files[key] = dict(fingerprint)
+            pending.append(path)
+    return pending, kept
+
+
+def list_source_files(data_dirname: str, filters: Dict[str, List[str]]) -> List[str]:
+    """
+    Lists the raw files of an election source, in a deterministic order.
+
+    Args:
+        data_dirname (str): The directory holding the raw ballot data.
+        filters (Dict[str, List[str]]): Download filters; files outside the
+            filtered subset are left out.
+
+    Returns:
+        List[str]: The sorted paths of the source's raw files.
+    """
+    return sorted(
+        path
+        for path in get_election_filepaths(os.path.join(RAW_DATA_DIR, data_dirname))
+        if matches_download_filters(path, filters)
+    )
+
+
+def process_election_source(
+    election_type: str,
+    metadata_filename: str,
+    filepaths: List[str],
+    context: ProcessingContext,
+) -> SourceResult:
+    """
+    Exactly matches the raw files of one election source to RaceIDs.
+
+    In incremental mode, only files that are new or changed since the last run
+    are matched, unless the metadata CSV itself changed. The files are expected
+    to be fingerprinted already (see `scan_raw_files`); the files left unmatched
+    are reviewed later by `review_election_source`.
+
+    Args:
+        election_type (str): The election type, a key of `ELECTION_SOURCES`.
+        metadata_filename (str): The metadata CSV in `rcv_database`.
+        filepaths (List[str]): The raw files of the source.
+        context (ProcessingContext): The filters, metadata catalog and manifest.
+
+    Returns:
+        SourceResult: The exactly matched races, the files needing review, the
+        files that were matched, and the unchanged files whose earlier outcome
+        still stands.
+    """
+    metadata_path = os.path.join(RAW_DATA_DIR, "rcv_database", metadata_filename)
+
+    metadata_changed = True
+    if metadata_filename in context.catalog.fingerprints:
+        key = _decision_key(metadata_path)
+        context.metadata[key] = context.catalog.fingerprints[metadata_filename]
+        # Only the content counts: a re-downloaded but identical tab has a new
+        # modification time
+        previous = context.manifest.metadata.get(key) or {}
+        metadata_changed = previous.get("sha256") != context.metadata[key]["sha256"]
+
+    pending, kept = _plan_source_files(filepaths, metadata_changed, context)
+    if context.incremental:
+        print(f"{len(pending)} new or changed file(s), {len(kept)} unchanged.")
+
+    matched, unmatched = match_elections_exact(
+        metadata_path,
+        os.path.join(RAW_DATA_DIR, ELECTION_SOURCES[election_type][1]),
+        context.filters,
+        pending,
+        context.catalog.get_race_ids(metadata_filename),
+    )
+    return SourceResult(
+        election_type=election_type,
+        metadata_filename=metadata_filename,
+        matched=matched,
+        unmatched=unmatched,
+        kept=kept,
+        pending=pending,
+    )
+
+
+def review_election_source(result: SourceResult, context: ProcessingContext) -> None:
+    """
+    Fuzzy matches the files an election source left unmatched and records the
+    outcome of every matched file in the manifest entries of this run.
+
+    Args:
+        result (SourceResult): The result of `process_election_source`; its
+            matched and unmatched lists are updated in place.
+        context (ProcessingContext): The filters, metadata catalog, match options
+            and file entries of this run.
+    """
+    if result.unmatched:
+        print(f"\n--- Reviewing {result.election_type} elections ---")
+        print(f"Found {len(result.unmatched)} files needing manual review.")
+        race_ids_for_type = [
+            race_id
+            for race_id in context.catalog.get_race_ids(result.metadata_filename)
+            if matches_download_filters(race_id, context.filters)
+        ]
+        fuzzy_matched, result.unmatched = match_elections_fuzzy(
+            result.unmatched, race_ids_for_type, context.match_options
+        )
+        result.matched.extend(fuzzy_matched)
+
+    # Add the election type to the matched data for better categorization
+    for race in result.matched:
+        race["election_type"] = result.election_type
+
+    for path in result.pending:
+        entry = context.files[_decision_key(path)]
+        entry["election_type"] = result.election_type
+        entry["matches"] = [
+            {k: race[k] for k in ("race_id", "match_method", "match_score")}
+            for race in result.matched
+            if race["filepath"] == path
+        ]
+
+
+def process_election_sources(context: ProcessingContext) -> List[SourceResult]:
+    """
+    Processes every selected election source in three stages: the raw files of
+    all sources are fingerprinted (in parallel with `context.workers` > 1), then
+    each source is exactly matched, and finally the remaining files of each
+    source are reviewed one source after the other, so prompts never interleave.
+
+    Args:
+        context (ProcessingContext): The state shared by every source.
 
-    # Process each defined election source
-    for election_type, (metadata_filename, data_dirname) in ELECTION_SOURCES.items():
+    Returns:
+        List[SourceResult]: One result per source, in `ELECTION_SOURCES` order.
+    """
+    election_types = context.filters.get("election_types")
+    sources = [
+        (election_type, metadata_filename, data_dirname)
+        for election_type, (metadata_filename, data_dirname) in ELECTION_SOURCES.items()
+        if not election_types or election_type in election_types
+    ]
+    filepaths = {
+        election_type: list_source_files(data_dirname, context.filters)
+        for election_type, _, data_dirname in sources
+    }
+    all_filepaths = [path for paths in filepaths.values() for path in paths]
+    if context.workers > 1:
+        print(
+            f"\nFingerprinting {len(all_filepaths)} files "
+            f"with {context.workers} worker processes."
+        )
+    context.scanned = scan_raw_files(all_filepaths, context.manifest, context.workers)
+
+    results = []
+    for election_type, metadata_filename, _ in sources:
         print(f"\n--- Processing {election_type} elections ---")
+        results.append(
+            process_election_source(
+                election_type, metadata_filename, filepaths[election_type], context
+            )
+        )
+
+    for result in results:
+        review_election_source(result, context)
+    return results
+
+
+def _write_profile_task(task: Tuple[str, str, str]) -> Optional[str]:
+    """
+    Builds and writes the ballot profile of one CVR. Runs in a worker process.
+
+    Args:
+        task (Tuple[str, str, str]): The path of the CVR, its SHA-256 and the
+            path of its profile directory.
+
+    Returns:
+        Optional[str]: An error message, or None if the profile was written.
+    """
+    csv_path, sha256, profile_path = task
+    try:
+        os.makedirs(os.path.dirname(profile_path), exist_ok=True)
+        build_profile(csv_path).save_dir(profile_path, source_sha256=sha256)
+    except (ValueError, OSError, pd.errors.ParserError) as e:
+        return f"Error building the ballot profile of {csv_path}: {e}"
+    return None
+
+
+def _profile_is_current(profile_path: str, sha256: str) -> bool:
+    """Whether a profile directory was built from the CVR with this SHA-256."""
+    try:
+        return read_profile_header(profile_path).get("source_sha256") == sha256
+    except (OSError, ValueError):
+        return False
 
-        metadata_path = os.path.join(RAW_DATA_DIR, "rcv_database", metadata_filename)
-        data_path = os.path.join(RAW_DATA_DIR, data_dirname)
 
-        # Get all possible RaceIDs for this election type first
-        race_ids_for_type = get_race_ids(metadata_path)
+def write_ballot_profiles(context: ProcessingContext) -> int:
+    """
+    Writes an aggregated ballot profile (see `ballots.py`) for every matched
+    rank-column CVR to `data/processed/profiles`, mirroring the raw layout.
+
+    Each profile is a memory-mappable `.profile` directory whose header records
+    the SHA-256 of its CVR; profiles whose CVR did not change are kept, and
+    profiles of CVRs that were removed or are no longer matched are deleted. The
+    profile path, relative to the processed data directory, is stored in the
+    file's manifest entry under `profile`.
+
+    Args:
+        context (ProcessingContext): The file entries of this run and the number
+            of worker processes.
+
+    Returns:
+        int: The number of profiles written.
+    """
+    tasks, keys = [], []
+    for key, entry in sorted(context.files.items()):
+        if not entry.get("matches") or not entry.get("rank_columns"):
+            entry.pop("profile", None)
+            continue
+        profile = os.path.join(
+            PROFILES_DIRNAME, os.path.splitext(key)[0] + PROFILE_DIR_SUFFIX
+        )
+        profile_path = os.path.join(PROCESSED_DATA_DIR, profile)
+        if _profile_is_current(profile_path, entry["sha256"]):
+            entry["profile"] = profile
+            continue
+        entry["profile"] = profile
+        tasks.append((os.path.join(RAW_DATA_DIR, key), entry["sha256"], profile_path))
+        keys.append(key)
+
+    if context.workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(context.workers, len(tasks))) as pool:
+            errors = list(pool.map(_write_profile_task, tasks))
+    else:
+        errors = [_write_profile_task(task) for task in tasks]
+
+    for key, error in zip(keys, errors):
+        if error is not None:
+            print(error)
+            del context.files[key]["profile"]
+
+    removed = remove_orphaned_profiles(
+        {entry["profile"] for entry in context.files.values() if "profile" in entry}
+    )
+    if removed:
+        print(f"Removed {removed} ballot profile(s) of removed or unmatched files.")
+    return sum(error is None for error in errors)
 
-        matched, unmatched = match_elections_exact(metadata_path, data_path)
 
-        # If there are unmatched files, try fuzzy matching them
-        if unmatched:
-            print(f"Found {len(unmatched)} files needing manual review.")
-            fuzzy_matched, still_unmatched = match_elections_fuzzy(
-                unmatched, race_ids_for_type
+def remove_orphaned_profiles(keep: Set[str]) -> int:
+    """
+    Deletes the profile directories that no file entry refers to any more, such
+    as those of removed or unmatched CVRs, and the folders left empty.
+
+    Args:
+        keep (Set[str]): The profile paths still in use, relative to the
+            processed data directory.
+
+    Returns:
+        int: The number of profile directories deleted.
+    """
+    profiles_dir = os.path.join(PROCESSED_DATA_DIR, PROFILES_DIRNAME)
+    removed = 0
+    for dirpath, dirnames, _ in os.walk(profiles_dir):
+        # Also catches the .tmp and .old leftovers of interrupted writes
+        for dirname in [d for d in dirnames if PROFILE_DIR_SUFFIX in d]:
+            dirnames.remove(dirname)
+            path = os.path.join(dirpath, dirname)
+            if os.path.relpath(path, PROCESSED_DATA_DIR) not in keep:
+                shutil.rmtree(path)
+                removed += 1
+    for dirpath, _, _ in os.walk(profiles_dir, topdown=False):
+        if dirpath != profiles_dir and not os.listdir(dirpath):
+            os.rmdir(dirpath)
+    return removed
+
+
+def patch_elections_database(
+    output_path: str, kept_paths: List[str], new_races: List[Dict]
+) -> pd.DataFrame:
+    """
+    Replaces the rows of changed and removed files in the elections database.
+
+    Rows of the `kept_paths` files are carried over from the existing database;
+    every other row is dropped and the `new_races` are appended.
+
+    Args:
+        output_path (str): The elections database CSV.
+        kept_paths (List[str]): The unchanged files whose rows are kept.
+        new_races (List[Dict]): The races matched on this run.
+
+    Returns:
+        pd.DataFrame: The patched database.
+    """
+    columns = ["race_id", "election_type", "filepath"]
+    existing = pd.DataFrame(columns=columns)
+    if kept_paths and os.path.exists(output_path):
+        existing = pd.read_csv(output_path)
+        kept_keys = {_decision_key(path) for path in kept_paths}
+        existing = existing[existing["filepath"].map(_decision_key).isin(kept_keys)]
+    new_rows = pd.DataFrame(new_races, columns=columns)
+    frames = [df for df in (existing, new_rows) if not df.empty]
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(frames, ignore_index=True)[columns]
+
+
+def write_sqlite_database(context: ProcessingContext) -> str:
+    """
+    Writes the SQLite elections database from the metadata catalog and the
+    processing manifest of this run.
+
+    Args:
+        context (ProcessingContext): The filters, metadata catalog and file entries
+            of this run.
+
+    Returns:
+        str: The path of the database.
+    """
+    metadata = {}
+    for election_type, (metadata_filename, _) in ELECTION_SOURCES.items():
+        if not context.catalog.has(metadata_filename):
+            continue
+        df = context.catalog.rows(metadata_filename)
+        if "RaceID" in df.columns:
+            keep = (
+                df["RaceID"]
+                .fillna("")
+                .map(lambda r: matches_download_filters(r, context.filters))
             )
-            matched.extend(fuzzy_matched)
-            unmatched = still_unmatched  # Update unmatched list
+            df = df[keep]
+        metadata[election_type] = df
+
+    files, matches = [], []
+    for key, entry in sorted(context.files.items()):
+        filepath = os.path.join(RAW_DATA_DIR, key)
+        files.append(
+            {
+                "filepath": filepath,
+                "election_type": entry.get("election_type"),
+                "size_bytes": entry["size"],
+                "sha256": entry["sha256"],
+                **{key: entry.get(key) for key in SNIFF_KEYS},
+                "profile_path": (
+                    os.path.join(PROCESSED_DATA_DIR, entry["profile"])
+                    if "profile" in entry
+                    else None
+                ),
+            }
+        )
+        matches.extend(dict(m, filepath=filepath) for m in entry.get("matches", []))
+
+    output_path = os.path.join(
+        PROCESSED_DATA_DIR, os.path.basename(ELECTIONS_SQLITE_PATH)
+    )
+    write_elections_sqlite(output_path, metadata, files, matches)
+    return output_path
 
-        # Add the election type to the matched data for better categorization
-        for race in matched:
-            race["election_type"] = election_type
 
-        all_matched_races.extend(matched)
-        all_unmatched_files.extend(unmatched)
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Parses the command line options.
 
-        print(f"Found {len(matched)} matched elections.")
-        print(f"Found {len(unmatched)} unmatched files.")
+    Args:
+        argv (List[str], optional): The arguments to parse. Defaults to `sys.argv`.
+
+    Returns:
+        argparse.Namespace: The parsed options.
+    """
+    parser = argparse.ArgumentParser(description="Process raw voting data.")
+    parser.add_argument(
+        "--auto-accept-score",
+        type=float,
+        metavar="N",
+        help="Accept a fuzzy match without prompting when it is the only RaceID "
+        "scoring at least N (0-100).",
+    )
+    parser.add_argument(
+        "--non-interactive",
+        action="store_true",
+        help="Never prompt; leave files without a decision unmatched.",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only process raw files added or changed since the last run and patch "
+        "the existing elections database.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Fingerprint raw files in N worker processes (0 for one per CPU core).",
+    )
+    parser.add_argument(
+        "--profiles",
+        action="store_true",
+        help="Write an aggregated ballot profile for every matched CVR.",
+    )
+    parser.add_argument(
+        "--sqlite",
+        action="store_true",
+        help="Also write the indexed SQLite database elections.sqlite.",
+    )
+    args = parser.parse_args(argv)
+    if (
+        args.auto_accept_score is not None
+        and not 0 < args.auto_accept_score <= MAX_FUZZY_SCORE
+    ):
+        parser.error("--auto-accept-score must be between 0 and 100")
+    if args.workers < 0:
+        parser.error("--workers must not be negative")
+    return args
+
+
+# --- Main Execution ---
+
+
+def main(argv: Optional[List[str]] = None):
+    """
+    Main function to orchestrate the data processing pipeline.
+    """
+    args = parse_args(argv)
+    print("--- Starting Data Processing ---")
+
+    # Ensure the processed data directory exists
+    os.makedirs(PROCESSED_DATA_DIR, exist_ok=True)
+    print(f"Processed data will be saved to: {PROCESSED_DATA_DIR}")
+
+    all_matched_races = []
+    all_unmatched_files = []
+    all_kept_files = []
+
+    filters = load_download_filters()
+    if filters:
+        print(f"Restricting processing to the downloaded subset: {filters}")
+
+    manifest = ProcessingManifest(PROCESSED_DATA_DIR)
+    incremental = args.incremental and manifest.exists and manifest.filters == filters
+    if args.incremental and not incremental:
+        print("No processing manifest for these filters; processing every file.")
+    context = ProcessingContext(
+        filters=filters,
+        match_options=MatchOptions(
+            decisions=DecisionCache(PROCESSED_DATA_DIR),
+            auto_accept_score=args.auto_accept_score,
+            interactive=not args.non_interactive,
+        ),
+        manifest=manifest,
+        catalog=MetadataCatalog(METADATA_DIR, PROCESSED_DATA_DIR),
+        incremental=incremental,
+        workers=args.workers or os.cpu_count() or 1,
+    )
+
+    # Process each defined election source, merging the results in source order
+    for result in process_election_sources(context):
+        all_matched_races.extend(result.matched)
+        all_unmatched_files.extend(result.unmatched)
+        all_kept_files.extend(result.kept)
+
+        print(
+            f"{result.election_type}: {len(result.matched)} matched elections, "
+            f"{len(result.unmatched)} unmatched files."
+        )
+
+    # Files that stayed unmatched on an earlier run and have not changed since
+    all_unmatched_files.extend(
+        path
+        for path in all_kept_files
+        if not context.files[_decision_key(path)].get("matches")
+    )
 
     # Create and save the final elections database
-    if all_matched_races:
-        elections_df = pd.DataFrame(all_matched_races)
-        # Reorder columns for clarity
-        elections_df = elections_df[["race_id", "election_type", "filepath"]]
-        output_path = os.path.join(PROCESSED_DATA_DIR, ELECTIONS_DB_FILENAME)
-        elections_df.to_csv(output_path, index=False)
+    output_path = os.path.join(PROCESSED_DATA_DIR, ELECTIONS_DB_FILENAME)
+    elections_df = patch_elections_database(
+        output_path, all_kept_files, all_matched_races
+    )
+    # An empty database is written too, so no stale races outlive their files
+    elections_df.to_csv(output_path, index=False)
+    if not elections_df.empty:
         print(f"\nSuccessfully created elections database at: {output_path}")
     else:
-        print("\nNo matched elections found. The database file was not created.")
+        print(f"\nNo matched elections found. Wrote an empty database: {output_path}")
+    if args.profiles:
+        written = write_ballot_profiles(context)
+        print(f"Wrote {written} ballot profile(s) to {PROFILES_DIRNAME}/.")
+
+    manifest.files, manifest.metadata = context.files, context.metadata
+    manifest.filters = filters
+    manifest.save()
+
+    if args.sqlite:
+        sqlite_path = write_sqlite_database(context)
+        print(f"Successfully created SQLite elections database at: {sqlite_path}")
 
     # Create and save the log of unmatched files
     if all_unmatched_files:
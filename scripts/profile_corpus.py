@@ -0,0 +1,564 @@
+"""
+This script builds the ballot profiles of a whole corpus of CVRs in parallel and
+keeps them in a shared, content-addressed store with a catalog.
+
+Every CVR of the given directories (by default the three Dataverse folders in
+`data/raw`; any folder of CVRs such as an old `dataverse_files` works too) is one
+task for a process pool. Each task hashes its CVR and streams it through
+`ballots.build_profile`, then saves the result as a memory-mappable profile
+directory named after the CVR's SHA-256 under `data/processed/profile_store`, so
+identical CVRs in different folders share one profile.
+
+The number of concurrent tasks is capped by the number of workers and by a memory
+budget (half of the available memory by default): each task's peak memory is
+estimated from its chunk size and average row length, and a task only starts
+when it fits next to the running ones. The largest CVRs are started first.
+
+The catalog (`catalog.sqlite` in the store) maps every CVR to its profile, with
+its size, modification time, SHA-256 and profile sizes. CVRs whose size and
+modification time match the catalog are skipped on later runs (`--force` builds
+every profile again), and profiles no catalog entry refers to are deleted.
+Consumers look profiles up by CVR name instead of re-parsing:
+
+    with ProfileCatalog() as catalog:
+        profile = catalog.load("NewYorkCity_06222021_DEMMayorCitywide")
+
+Usage:
+    python -m scripts.profile_corpus [DIRECTORY ...] [--store DIR] [--workers N]
+                                     [--memory-budget GIB] [--chunk-rows N] [--force]
+"""
+
+import argparse
+import os
+import shutil
+import sqlite3
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from scripts.ballots import (
+    PROFILE_CHUNK_ROWS,
+    PROFILE_DIR_SUFFIX,
+    BallotProfile,
+    build_profile,
+    read_profile_header,
+)
+from scripts.process_data import ELECTION_SOURCES, RAW_DATA_DIR, fingerprint_file
+
+# --- Constants and Configuration ---
+
+# Base directory for the project
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+
+# The default location of the profile store
+PROFILE_STORE_DIR = os.path.join(BASE_DIR, "data", "processed", "profile_store")
+
+# The catalog database inside the store, and the folder of the profiles
+CATALOG_FILENAME = "catalog.sqlite"
+OBJECTS_DIRNAME = "objects"
+
+# The directories of the CVRs processed by default
+DEFAULT_CORPUS_DIRS = [
+    os.path.join(RAW_DATA_DIR, data_dirname)
+    for _, data_dirname in ELECTION_SOURCES.values()
+]
+
+# The share of the available memory used by default
+DEFAULT_MEMORY_SHARE = 0.5
+
+# The peak memory of a task per byte of CSV text held in one chunk, measured on
+# large CVRs with the rank columns read as strings
+MEMORY_PER_CSV_BYTE = 6
+
+# The number of bytes read from the start of a CVR to estimate its row length
+ROW_SAMPLE_BYTES = 64 * 1024
+
+CATALOG_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    source_path TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    size INTEGER,
+    mtime_ns INTEGER,
+    sha256 TEXT,
+    profile_path TEXT,
+    num_candidates INTEGER,
+    num_rankings INTEGER,
+    num_ballots INTEGER,
+    build_seconds REAL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_profiles_name ON profiles (name);
+CREATE INDEX IF NOT EXISTS idx_profiles_sha256 ON profiles (sha256);
+"""
+
+# --- Function Definitions ---
+
+
+class ProfileCatalog:
+    """
+    The catalog of a profile store: which CVR has which profile.
+
+    Can be used as a context manager, which closes the connection on exit.
+    """
+
+    def __init__(self, store_dir: str = PROFILE_STORE_DIR):
+        self.store_dir = store_dir
+        os.makedirs(store_dir, exist_ok=True)
+        self.connection = sqlite3.connect(os.path.join(store_dir, CATALOG_FILENAME))
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(CATALOG_SCHEMA)
+
+    def __enter__(self) -> "ProfileCatalog":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Closes the catalog database."""
+        self.connection.close()
+
+    def get(self, source_path: str) -> Optional[Dict]:
+        """
+        Returns the catalog entry of a CVR.
+
+        Args:
+            source_path (str): The absolute path of the CVR.
+
+        Returns:
+            Optional[Dict]: The entry, or None if the CVR was never processed.
+        """
+        row = self.connection.execute(
+            "SELECT * FROM profiles WHERE source_path = ?", (source_path,)
+        ).fetchone()
+        return dict(row) if row is not None else None
+
+    def record(self, entry: Dict) -> None:
+        """
+        Adds or replaces the entry of a CVR and commits it right away, so an
+        interrupted run keeps what it built.
+
+        Args:
+            entry (Dict): The values of every column of `profiles`.
+        """
+        self.connection.execute(
+            "INSERT OR REPLACE INTO profiles VALUES "
+            "(:source_path, :name, :size, :mtime_ns, :sha256, :profile_path, "
+            ":num_candidates, :num_rankings, :num_ballots, :build_seconds, :error)",
+            entry,
+        )
+        self.connection.commit()
+
+    def prune(self, directories: List[str], seen: Iterable[str]) -> int:
+        """
+        Removes the entries of CVRs that disappeared from the given directories.
+
+        Args:
+            directories (List[str]): The directories that were scanned.
+            seen (Iterable[str]): The CVRs found in them.
+
+        Returns:
+            int: The number of entries removed.
+        """
+        seen = set(seen)
+        stale = [
+            row["source_path"]
+            for row in self.connection.execute("SELECT source_path FROM profiles")
+            if os.path.dirname(row["source_path"]) in directories
+            and row["source_path"] not in seen
+        ]
+        self.connection.executemany(
+            "DELETE FROM profiles WHERE source_path = ?", [(p,) for p in stale]
+        )
+        self.connection.commit()
+        return len(stale)
+
+    def collect_garbage(self) -> int:
+        """
+        Deletes the profiles in the store that no catalog entry refers to, such
+        as those of removed or changed CVRs, and the folders left empty.
+
+        Returns:
+            int: The number of profile directories deleted.
+        """
+        referenced = {
+            row["profile_path"]
+            for row in self.connection.execute(
+                "SELECT profile_path FROM profiles WHERE profile_path IS NOT NULL"
+            )
+        }
+        objects_dir = os.path.join(self.store_dir, OBJECTS_DIRNAME)
+        removed = 0
+        for dirpath, dirnames, _ in os.walk(objects_dir):
+            # Also catches the temporary directories of interrupted writes
+            for dirname in [d for d in dirnames if PROFILE_DIR_SUFFIX in d]:
+                dirnames.remove(dirname)
+                path = os.path.join(dirpath, dirname)
+                if os.path.relpath(path, self.store_dir) not in referenced:
+                    shutil.rmtree(path)
+                    removed += 1
+        for dirpath, _, _ in os.walk(objects_dir, topdown=False):
+            if dirpath != objects_dir and not os.listdir(dirpath):
+                os.rmdir(dirpath)
+        return removed
+
+    def find(self, name: str) -> List[Dict]:
+        """
+        Finds the entries of the CVRs with a given name.
+
+        Args:
+            name (str): The CVR's filename without extension, e.g. a RaceID.
+
+        Returns:
+            List[Dict]: The matching entries that have a profile.
+        """
+        rows = self.connection.execute(
+            "SELECT * FROM profiles WHERE name = ? AND profile_path IS NOT NULL "
+            "ORDER BY source_path",
+            (name,),
+        )
+        return [dict(row) for row in rows]
+
+    def load(self, name: str, mmap: bool = True) -> BallotProfile:
+        """
+        Loads the profile of a CVR by name.
+
+        Args:
+            name (str): The CVR's filename without extension.
+            mmap (bool): Memory-map the profile's arrays.
+
+        Returns:
+            BallotProfile: The profile.
+
+        Raises:
+            KeyError: If no profile of that name is in the catalog.
+        """
+        entries = self.find(name)
+        if not entries:
+            raise KeyError(f"No profile named {name} in {self.store_dir}")
+        path = os.path.join(self.store_dir, entries[0]["profile_path"])
+        return BallotProfile.load_dir(path, mmap=mmap)
+
+
+@dataclass
+class ProfileTask:
+    """A CVR to profile, with its estimated peak memory."""
+
+    source_path: str
+    memory: int
+    previous: Optional[Dict] = None
+    force: bool = False
+
+
+def store_relpath(sha256: str) -> str:
+    """Returns the path of a profile in the store, relative to the store."""
+    return os.path.join(OBJECTS_DIRNAME, sha256[:2], sha256 + PROFILE_DIR_SUFFIX)
+
+
+def estimate_task_memory(path: str, size: int, chunk_rows: int) -> int:
+    """
+    Estimates the peak memory of profiling a CVR in chunks.
+
+    Args:
+        path (str): The CVR.
+        size (int): Its size in bytes.
+        chunk_rows (int): The number of ballots read at a time.
+
+    Returns:
+        int: The estimated peak memory in bytes.
+    """
+    with open(path, "rb") as f:
+        sample = f.read(ROW_SAMPLE_BYTES)
+    row_bytes = len(sample) / max(sample.count(b"\n"), 1)
+    return int(min(size, chunk_rows * row_bytes) * MEMORY_PER_CSV_BYTE)
+
+
+def available_memory() -> Optional[int]:
+    """Returns the available physical memory in bytes, if the OS reports it."""
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def profile_cvr(task: ProfileTask, store_dir: str, chunk_rows: int) -> Dict:
+    """
+    Hashes a CVR and builds its profile unless the store already has one for
+    the same content (or the task is forced). Runs in a worker process.
+
+    Args:
+        task (ProfileTask): The CVR, its earlier catalog entry and whether to
+            build its profile again in any case.
+        store_dir (str): The profile store.
+        chunk_rows (int): The number of ballots read at a time.
+
+    Returns:
+        Dict: The catalog entry of the CVR; `error` is set if it failed.
+    """
+    start = time.perf_counter()
+    path = task.source_path
+    entry = {
+        "source_path": path,
+        "name": os.path.splitext(os.path.basename(path))[0],
+        "profile_path": None,
+        "num_candidates": None,
+        "num_rankings": None,
+        "num_ballots": None,
+        "error": None,
+    }
+    try:
+        entry.update(fingerprint_file(path, task.previous))
+        relpath = store_relpath(entry["sha256"])
+        profile_path = os.path.join(store_dir, relpath)
+        try:
+            header = read_profile_header(profile_path)
+        except (OSError, ValueError):
+            header = {}
+        if task.force or header.get("source_sha256") != entry["sha256"]:
+            os.makedirs(os.path.dirname(profile_path), exist_ok=True)
+            profile = build_profile(path, chunk_rows=chunk_rows)
+            # Identical CVRs share this object and may be built at the same
+            # time; an object another task has put in place is only replaced
+            # when forced
+            profile.save_dir(
+                profile_path, source_sha256=entry["sha256"], replace=task.force
+            )
+            header = {
+                "num_candidates": len(profile.candidates),
+                "num_rankings": len(profile),
+                "num_ballots": profile.num_ballots,
+            }
+        entry.update(
+            {key: header[key] for key in ("num_candidates", "num_rankings")},
+            profile_path=relpath,
+            num_ballots=header["num_ballots"],
+        )
+    except Exception as e:
+        entry["error"] = f"{type(e).__name__}: {e}"
+    entry.setdefault("size", None)
+    entry.setdefault("mtime_ns", None)
+    entry.setdefault("sha256", None)
+    entry["build_seconds"] = time.perf_counter() - start
+    return entry
+
+
+def list_corpus(directories: List[str]) -> List[str]:
+    """
+    Lists the CVRs of the corpus directories.
+
+    Args:
+        directories (List[str]): The directories to scan (not recursively).
+
+    Returns:
+        List[str]: The sorted absolute paths of every `.csv` file.
+    """
+    paths = []
+    for directory in directories:
+        if not os.path.isdir(directory):
+            print(f"Warning: Corpus directory not found at {directory}")
+            continue
+        paths.extend(
+            entry.path
+            for entry in os.scandir(directory)
+            if entry.is_file() and entry.name.endswith(".csv")
+        )
+    return sorted(paths)
+
+
+def plan_tasks(
+    paths: List[str], catalog: ProfileCatalog, chunk_rows: int, force: bool
+) -> List[ProfileTask]:
+    """
+    Picks the CVRs that need profiling, largest first.
+
+    Args:
+        paths (List[str]): Every CVR of the corpus.
+        catalog (ProfileCatalog): The catalog of earlier runs.
+        chunk_rows (int): The number of ballots read at a time.
+        force (bool): Hash and profile every CVR again.
+
+    Returns:
+        List[ProfileTask]: The CVRs that are new or changed.
+    """
+    tasks = []
+    for path in paths:
+        stat = os.stat(path)
+        previous = catalog.get(path)
+        if (
+            not force
+            and previous is not None
+            and previous["error"] is None
+            and previous["size"] == stat.st_size
+            and previous["mtime_ns"] == stat.st_mtime_ns
+            and os.path.isdir(os.path.join(catalog.store_dir, previous["profile_path"]))
+        ):
+            continue
+        memory = estimate_task_memory(path, stat.st_size, chunk_rows)
+        if force or not (previous and previous["sha256"]):
+            previous = None
+        tasks.append(ProfileTask(path, memory, previous, force))
+    return sorted(tasks, key=lambda task: task.memory, reverse=True)
+
+
+def run_tasks(
+    tasks: List[ProfileTask],
+    catalog: ProfileCatalog,
+    workers: int,
+    memory_budget: Optional[int],
+    chunk_rows: int,
+) -> List[Dict]:
+    """
+    Runs the profiling tasks on a process pool, never starting a task whose
+    estimated memory does not fit in the budget next to the running ones (a
+    task is always started when nothing else runs).
+
+    Args:
+        tasks (List[ProfileTask]): The tasks, largest first.
+        catalog (ProfileCatalog): Receives each entry as soon as it is done.
+        workers (int): The number of worker processes.
+        memory_budget (int, optional): The memory the running tasks may use, in
+            bytes. None for no limit.
+        chunk_rows (int): The number of ballots read at a time.
+
+    Returns:
+        List[Dict]: The catalog entry of every task.
+    """
+    pending = list(tasks)
+    running: Dict[Future, ProfileTask] = {}
+    in_use = 0
+    entries = []
+
+    def fits(task: ProfileTask) -> bool:
+        return (
+            not running
+            or memory_budget is None
+            or (in_use + task.memory <= memory_budget)
+        )
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while pending or running:
+            while pending and len(running) < workers:
+                task = next((t for t in pending if fits(t)), None)
+                if task is None:
+                    break
+                pending.remove(task)
+                future = pool.submit(profile_cvr, task, catalog.store_dir, chunk_rows)
+                running[future] = task
+                in_use += task.memory
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                in_use -= running.pop(future).memory
+                entry = future.result()
+                catalog.record(entry)
+                entries.append(entry)
+                if entry["error"]:
+                    print(f"Error profiling {entry['source_path']}: {entry['error']}")
+                if len(entries) % 100 == 0:
+                    print(f"  {len(entries)}/{len(tasks)} CVRs profiled...")
+    return entries
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Parses the command line options.
+
+    Args:
+        argv (List[str], optional): The arguments to parse. Defaults to `sys.argv`.
+
+    Returns:
+        argparse.Namespace: The parsed options.
+    """
+    parser = argparse.ArgumentParser(
+        description="Build the ballot profiles of a corpus of CVRs in parallel."
+    )
+    parser.add_argument(
+        "directories",
+        nargs="*",
+        default=DEFAULT_CORPUS_DIRS,
+        metavar="DIRECTORY",
+        help="Directories of CVRs (default: the Dataverse folders in data/raw).",
+    )
+    parser.add_argument(
+        "--store",
+        default=PROFILE_STORE_DIR,
+        metavar="DIR",
+        help="The profile store and its catalog.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        metavar="N",
+        help="The number of worker processes (default, or 0: one per CPU core).",
+    )
+    parser.add_argument(
+        "--memory-budget",
+        type=float,
+        metavar="GIB",
+        help="The memory the running tasks may use together "
+        "(default: half of the available memory).",
+    )
+    parser.add_argument(
+        "--chunk-rows",
+        type=int,
+        default=PROFILE_CHUNK_ROWS,
+        metavar="N",
+        help="The number of ballots read at a time.",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Hash and profile every CVR again, even if it is unchanged.",
+    )
+    args = parser.parse_args(argv)
+    if args.workers < 0 or args.chunk_rows < 1:
+        parser.error("--workers must not be negative and --chunk-rows positive")
+    args.workers = args.workers or os.cpu_count() or 1
+    return args
+
+
+# --- Main Execution ---
+
+
+def main(argv: Optional[List[str]] = None):
+    """
+    Main function to profile every new or changed CVR of the corpus.
+    """
+    args = parse_args(argv)
+    directories = [os.path.abspath(d) for d in args.directories]
+    if args.memory_budget is not None:
+        memory_budget = int(args.memory_budget * 1024**3)
+    else:
+        available = available_memory()
+        memory_budget = int(available * DEFAULT_MEMORY_SHARE) if available else None
+
+    print("--- Building the ballot profile corpus ---")
+    with ProfileCatalog(args.store) as catalog:
+        paths = list_corpus(directories)
+        removed = catalog.prune(directories, paths)
+        tasks = plan_tasks(paths, catalog, args.chunk_rows, args.force)
+        budget = f"{memory_budget / 1024**3:.1f} GiB" if memory_budget else "none"
+        print(
+            f"{len(paths)} CVRs, {len(tasks)} to profile, {removed} removed; "
+            f"{args.workers} workers, memory budget {budget}."
+        )
+
+        start = time.perf_counter()
+        entries = run_tasks(
+            tasks, catalog, args.workers, memory_budget, args.chunk_rows
+        )
+        failed = sum(entry["error"] is not None for entry in entries)
+        print(
+            f"Profiled {len(entries) - failed} CVRs ({failed} failed) "
+            f"in {time.perf_counter() - start:.1f} s. Catalog: "
+            f"{os.path.join(args.store, CATALOG_FILENAME)}"
+        )
+        collected = catalog.collect_garbage()
+        if collected:
+            print(f"Deleted {collected} profile(s) no CVR refers to any more.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+This module parses RaceIDs and CVR filenames, which look like
+`Alaska_11082022_HouseDistrict1`: a jurisdiction, an `MMDDYYYY` election date and
+an office.
+
+The download filters, the fuzzy matching in `process_data.py` and the SQLite
+elections database all use these helpers, so they agree on what a jurisdiction
+and a year are.
+"""
+
+import os
+import re
+from typing import Dict, Iterable, Optional
+
+# --- Constants and Configuration ---
+
+# CVR filenames and RaceIDs look like `Alaska_11082022_HouseDistrict1`
+RACE_ID_PATTERN = re.compile(r"^(?P<jurisdiction>.+?)_(?P<date>\d{8})_")
+
+# --- Function Definitions ---
+
+
+def normalize_jurisdiction(name: str) -> str:
+    """Lowercases a jurisdiction name and drops everything but letters and digits."""
+    return "".join(c for c in name.lower() if c.isalnum())
+
+
+def parse_race_id(name: str) -> Dict[str, Optional[object]]:
+    """
+    Splits a RaceID or CVR filename into its jurisdiction and election date.
+
+    Args:
+        name (str): A RaceID such as `Alaska_11082022_HouseDistrict1`, or the
+            path of a CVR named after one.
+
+    Returns:
+        Dict[str, Optional[object]]: The `jurisdiction`, `jurisdiction_key`, ISO
+        `date` and `year`, all None if the name does not follow the pattern.
+    """
+    match = RACE_ID_PATTERN.match(os.path.basename(name))
+    if match is None:
+        return {
+            "jurisdiction": None,
+            "jurisdiction_key": None,
+            "date": None,
+            "year": None,
+        }
+    mmddyyyy = match["date"]
+    return {
+        "jurisdiction": match["jurisdiction"],
+        "jurisdiction_key": normalize_jurisdiction(match["jurisdiction"]),
+        "date": f"{mmddyyyy[4:]}-{mmddyyyy[:2]}-{mmddyyyy[2:4]}",
+        "year": int(mmddyyyy[4:]),
+    }
+
+
+def matches_race_filters(
+    name: str, jurisdictions: Iterable[str], years: Iterable[str]
+) -> bool:
+    """
+    Checks a RaceID or CVR filename against jurisdiction and year filters.
+
+    Names that do not follow the `Jurisdiction_MMDDYYYY_Office` pattern only
+    match when neither filter is set.
+
+    Args:
+        name (str): The RaceID or filename.
+        jurisdictions (Iterable[str]): The jurisdictions to keep, compared
+            ignoring case, spaces and punctuation. Empty to keep all of them.
+        years (Iterable[str]): The years to keep, e.g. `"2022"`. Empty to keep
+            all of them.
+
+    Returns:
+        bool: True if the race passes both filters.
+    """
+    jurisdiction_keys = {normalize_jurisdiction(j) for j in jurisdictions}
+    years = {str(year) for year in years}
+    if not jurisdiction_keys and not years:
+        return True
+    race = parse_race_id(name)
+    if race["year"] is None:
+        return False
+    if jurisdiction_keys and race["jurisdiction_key"] not in jurisdiction_keys:
+        return False
+    return not years or str(race["year"]) in years
@@ -0,0 +1,292 @@
+"""
+Regression tests comparing `ballots.parse_election_data` with the archived
+`rcv_distribution.parse_election_data` it replaces, and tests of the ballot
+profiles built from CVRs.
+
+The archived module imports plotting and analysis code that is not installed, so
+only its `parse_election_data` function is loaded from the source.
+
+Run them from the root of the repository with `python -m unittest discover tests`.
+"""
+
+import ast
+import math
+import os
+import random
+import re
+import tempfile
+import typing
+import unittest
+import warnings
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from scripts import ballots
+
+# --- Constants and Configuration ---
+
+# Base directory for the project
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The archived module holding the original parser
+ARCHIVED_PARSER_PATH = os.path.join(
+    BASE_DIR, ".archive", "cleaned files", "rcv_distribution.py"
+)
+
+# The cell values the random CVRs are drawn from, by kind of rank column
+RANDOM_COLUMN_VALUES = {
+    "text": ["Adams", "Baker", "Clark", "", "skipped", "overvote"],
+    "ignored": ["skipped", "", "overvote", "UWI", "Write-in"],
+    "blank": [""],
+    "numeric": ["1", "2", ""],
+    "mixed": ["Adams", "1", "", "writein"],
+}
+
+# The number of random CVRs compared
+RANDOM_CVR_COUNT = 300
+
+# The number of ballots read at a time when building profiles in small chunks
+SMALL_CHUNK_ROWS = 3
+
+# The ballots of the profiles that are saved and loaded
+PROFILE_BALLOTS = {
+    ("Adams", "Baker", "Clark"): 5,
+    ("Baker",): 3,
+    ("Clark", "Adams"): 2,
+    (): 1,
+}
+
+# --- Function Definitions ---
+
+
+def load_archived_parser():
+    """Compiles only `parse_election_data` out of the archived module."""
+    with open(ARCHIVED_PARSER_PATH, "r", encoding="utf-8") as f:
+        module = ast.parse(f.read())
+    function = next(
+        node
+        for node in module.body
+        if isinstance(node, ast.FunctionDef) and node.name == "parse_election_data"
+    )
+    namespace = {**vars(typing), "re": re, "pd": pd}
+    exec(compile(ast.Module([function], []), ARCHIVED_PARSER_PATH, "exec"), namespace)
+    return namespace["parse_election_data"]
+
+
+def random_cvr(rng: random.Random) -> str:
+    """Returns a small random CVR drawn from `RANDOM_COLUMN_VALUES`."""
+    kinds = list(RANDOM_COLUMN_VALUES)
+    columns = [rng.choice(kinds) for _ in range(rng.randint(1, 5))]
+    lines = ["id," + ",".join(f"rank{j + 1}" for j in range(len(columns)))]
+    for i in range(rng.randint(1, 12)):
+        cells = [rng.choice(RANDOM_COLUMN_VALUES[kind]) for kind in columns]
+        lines.append(f"{i}," + ",".join(cells))
+    return "\n".join(lines) + "\n"
+
+
+def canonical(result: Tuple[Dict[Tuple, int], List]) -> Tuple[List, List]:
+    """
+    Makes a parse result comparable: every NaN candidate is replaced by its
+    position in the candidate list, since distinct NaN objects are distinct
+    candidates and never compare equal.
+    """
+    ballots_, candidates = result
+
+    def token(value):
+        if isinstance(value, float) and math.isnan(value):
+            return ("nan", next(i for i, c in enumerate(candidates) if c is value))
+        return value
+
+    return (
+        [token(c) for c in candidates],
+        [
+            (tuple(token(c) for c in ranking), count)
+            for ranking, count in ballots_.items()
+        ],
+    )
+
+
+class ParseElectionDataTest(unittest.TestCase):
+    """Checks that the vectorized parser returns what the archived one does."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.archived = staticmethod(load_archived_parser())
+        cls.temp_dir = tempfile.TemporaryDirectory()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.temp_dir.cleanup()
+
+    def assert_same_parse(
+        self, csv_text: str, ignore_values: Optional[List[str]] = None
+    ) -> None:
+        """Writes a CVR and compares both parsers on it."""
+        path = os.path.join(self.temp_dir.name, "cvr.csv")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(csv_text)
+        # The archived parser extends the list it is given, and relies on the
+        # silent downcasting that pandas warns about
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", FutureWarning)
+            expected = self.archived(
+                path, list(ignore_values) if ignore_values else None
+            )
+        actual = ballots.parse_election_data(path, ignore_values)
+        self.assertEqual(canonical(actual), canonical(expected), csv_text)
+
+    def test_text_columns(self):
+        self.assert_same_parse(
+            "id,rank1,rank2,rank3\n"
+            "1,Adams,Baker,Clark\n"
+            "2,Baker,,Adams\n"
+            "3,Adams,Adams,skipped\n"
+            "4,overvote,,\n"
+            "5,Adams,Baker,Clark\n"
+        )
+
+    def test_numeric_and_blank_columns(self):
+        self.assert_same_parse("id,rank1,rank2,rank3\n1,1,2,\n2,2,,\n3,1,2,\n")
+
+    def test_column_of_only_ignored_values_and_blanks(self):
+        # pandas turns rank2 into a float column once the ignored values are
+        # replaced, so each of its cells becomes a distinct NaN
+        self.assert_same_parse(
+            "id,rank1,rank2\n1,Adams,skipped\n2,Baker,\n3,Adams,overvote\n"
+        )
+
+    def test_column_of_only_ignored_values(self):
+        self.assert_same_parse("id,rank1,rank2\n1,Adams,skipped\n2,Baker,UWI\n")
+
+    def test_extra_ignore_values(self):
+        self.assert_same_parse(
+            "id,rank1,rank2\n1,Adams,Baker\n2,Baker,Clark\n3,Clark,\n",
+            ignore_values=["Clark"],
+        )
+
+    def test_rank_gap_and_no_rows(self):
+        self.assert_same_parse("id,rank1,rank3\n1,Adams,Baker\n")
+        self.assert_same_parse("id,rank1,rank2\n")
+
+    def test_random_cvrs(self):
+        rng = random.Random(0)
+        for _ in range(RANDOM_CVR_COUNT):
+            self.assert_same_parse(random_cvr(rng))
+
+
+class BuildProfileTest(unittest.TestCase):
+    """Checks the ballots of profiles built from CVRs."""
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_dir = temp_dir.name
+
+    def write_cvr(self, csv_text: str) -> str:
+        """Writes a CVR and returns its path."""
+        path = os.path.join(self.temp_dir, "cvr.csv")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(csv_text)
+        return path
+
+    def test_to_dict_has_string_candidates_without_blanks(self):
+        path = self.write_cvr("id,rank1,rank2\n1,1,2\n2,2,\n3,1,2\n")
+        profile = ballots.build_profile(path)
+        self.assertEqual(profile.candidates, ["1", "2"])
+        self.assertEqual(profile.to_dict(), {("1", "2"): 2, ("2",): 1})
+
+        # parse_election_data infers numbers and keeps the blank as a candidate
+        parsed, _ = ballots.parse_election_data(path)
+        self.assertEqual(len(parsed), 2)
+        self.assertNotEqual(parsed, profile.to_dict())
+
+    def test_chunked_build_matches_single_chunk(self):
+        rng = random.Random(1)
+        for _ in range(RANDOM_CVR_COUNT):
+            csv_text = random_cvr(rng)
+            path = self.write_cvr(csv_text)
+            whole = ballots.build_profile(path, chunk_rows=ballots.PROFILE_CHUNK_ROWS)
+            chunked = ballots.build_profile(path, chunk_rows=SMALL_CHUNK_ROWS)
+            self.assertEqual(chunked.candidates, whole.candidates, csv_text)
+            self.assertEqual(
+                chunked.rankings.tolist(), whole.rankings.tolist(), csv_text
+            )
+            self.assertEqual(chunked.counts.tolist(), whole.counts.tolist(), csv_text)
+            self.assertEqual(chunked.lengths.tolist(), whole.lengths.tolist(), csv_text)
+
+
+class ProfileStorageTest(unittest.TestCase):
+    """Checks that profiles come back unchanged from every way of storing them."""
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_dir = temp_dir.name
+        self.profile = ballots.BallotProfile.from_dict(PROFILE_BALLOTS)
+
+    def assert_same_profile(
+        self, actual: ballots.BallotProfile, expected: ballots.BallotProfile
+    ) -> None:
+        """Compares the codebook and arrays of two profiles."""
+        self.assertEqual(actual.candidates, expected.candidates)
+        self.assertEqual(actual.rankings.tolist(), expected.rankings.tolist())
+        self.assertEqual(actual.counts.tolist(), expected.counts.tolist())
+        self.assertEqual(actual.lengths.tolist(), expected.lengths.tolist())
+        self.assertEqual(actual.to_dict(), PROFILE_BALLOTS)
+
+    def test_dict_round_trip(self):
+        self.assertEqual(self.profile.to_dict(), PROFILE_BALLOTS)
+        self.assertEqual(self.profile.num_ballots, sum(PROFILE_BALLOTS.values()))
+        self.assertEqual(list(self.profile.to_dict()), list(PROFILE_BALLOTS))
+
+        candidates = ["Clark", "Baker", "Adams", "Davis"]
+        profile = ballots.BallotProfile.from_dict(PROFILE_BALLOTS, candidates)
+        self.assertEqual(profile.candidates, candidates)
+        self.assertEqual(profile.to_dict(), PROFILE_BALLOTS)
+
+    def test_save_and_load(self):
+        path = os.path.join(self.temp_dir, f"cvr{ballots.PROFILE_EXTENSION}")
+        self.profile.save(path)
+        self.assertFalse(os.path.exists(path + ".tmp"))
+        self.assert_same_profile(ballots.BallotProfile.load(path), self.profile)
+
+    def test_save_dir_and_load_dir(self):
+        path = os.path.join(self.temp_dir, f"cvr{ballots.PROFILE_DIR_SUFFIX}")
+        self.profile.save_dir(path, source_sha256="0" * 64)
+        self.assertEqual(os.listdir(self.temp_dir), [os.path.basename(path)])
+
+        mapped = ballots.BallotProfile.load_dir(path)
+        self.assert_same_profile(mapped, self.profile)
+        # The arrays are read-only views of the mapped files
+        for array in (mapped.rankings, mapped.counts, mapped.lengths):
+            self.assertFalse(array.flags.owndata)
+            self.assertFalse(array.flags.writeable)
+        loaded = ballots.BallotProfile.load_dir(path, mmap=False)
+        self.assert_same_profile(loaded, self.profile)
+        self.assertTrue(loaded.rankings.flags.writeable)
+
+        header = ballots.read_profile_header(path)
+        self.assertEqual(header["source_sha256"], "0" * 64)
+        self.assertEqual(header["ignore_values"], ballots.IGNORE_VALUES)
+        self.assertEqual(
+            (header["num_rankings"], header["num_ballots"]),
+            (len(PROFILE_BALLOTS), sum(PROFILE_BALLOTS.values())),
+        )
+
+    def test_save_dir_replaces_or_keeps_existing_profile(self):
+        path = os.path.join(self.temp_dir, f"cvr{ballots.PROFILE_DIR_SUFFIX}")
+        self.profile.save_dir(path)
+        other = ballots.BallotProfile.from_dict({("Davis",): 7})
+
+        other.save_dir(path, replace=False)
+        self.assert_same_profile(ballots.BallotProfile.load_dir(path), self.profile)
+        other.save_dir(path)
+        self.assertEqual(
+            ballots.BallotProfile.load_dir(path).to_dict(), {("Davis",): 7}
+        )
+        self.assertEqual(os.listdir(self.temp_dir), [os.path.basename(path)])
+
+
+if __name__ == "__main__":
+    unittest.main()
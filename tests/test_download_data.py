@@ -0,0 +1,355 @@
+"""
+Tests of the resumable, manifest-driven downloads and of the object store in
+`download_data.py`.
+
+Sources are served from a temporary directory through `LocalFileAdapter`, which
+answers `file://` requests with the same validators and range handling as an HTTP
+server.
+
+Run them from the root of the repository with `python -m unittest discover tests`.
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from typing import Dict, List
+from unittest import mock
+
+import requests
+
+from scripts import download_data
+from scripts.download_data import (
+    CHECKPOINT_SUFFIX,
+    PART_SUFFIX,
+    DownloadManifest,
+    DownloadOptions,
+    HostRateLimiter,
+    LocalFileAdapter,
+    MirrorBackend,
+    SourceMetrics,
+    _install_archive,
+    download_google_sheet_tab,
+    download_google_sheet_tab_async,
+    download_resumable,
+    file_sha256,
+    get_sheet_tab_path,
+    mirror_sheet_tab_relpath,
+)
+
+# --- Constants and Configuration ---
+
+# The content of the served source, long enough to span several chunks
+SOURCE_CONTENT = bytes(range(256)) * 16
+
+# The chunk size used by the downloads, so a transfer is many chunks long
+TEST_CHUNK_SIZE = 256
+
+# The number of bytes a flaky transfer delivers before the connection drops
+INTERRUPT_AFTER = 1000
+
+# The CVRs of the first version of a dataset archive; both hold the same ballots
+ARCHIVE_MEMBERS = {
+    "Portland_11052024_Mayor.csv": b"id,rank1\n1,Adams\n",
+    "Portland_11052024_Council.csv": b"id,rank1\n1,Adams\n",
+}
+
+# A sheet tab in Latin-1 with Windows line endings, which must be stored unchanged
+SHEET_TAB_CONTENT = (
+    "RaceID,Jurisdiction\r\nSanJos\xe9_11082022_Mayor,San Jos\xe9\r\n".encode("latin-1")
+)
+
+# --- Function Definitions ---
+
+
+class DroppingReader(io.RawIOBase):
+    """A response body that breaks off after a number of bytes."""
+
+    def __init__(self, raw, limit: int):
+        self.raw = raw
+        self.remaining = limit
+
+    def read(self, size: int = -1) -> bytes:
+        if self.remaining <= 0:
+            raise requests.exceptions.ChunkedEncodingError("connection dropped")
+        data = self.raw.read(min(size, self.remaining) if size > 0 else self.remaining)
+        self.remaining -= len(data)
+        return data
+
+    def close(self) -> None:
+        self.raw.close()
+        super().close()
+
+
+class FlakyFileAdapter(LocalFileAdapter):
+    """
+    Serves local files, recording every request and dropping the first
+    `interruptions` streamed responses part of the way through.
+    """
+
+    def __init__(self, interruptions: int = 0):
+        super().__init__()
+        self.interruptions = interruptions
+        self.requests: List[requests.PreparedRequest] = []
+        self.statuses: List[int] = []
+
+    def send(self, request, stream=False, **kwargs):
+        response = super().send(request, stream=stream, **kwargs)
+        self.requests.append(request)
+        self.statuses.append(response.status_code)
+        if stream and self.interruptions and response.ok:
+            self.interruptions -= 1
+            response.raw = DroppingReader(response.raw, INTERRUPT_AFTER)
+        return response
+
+
+def quiet(function, *args, **kwargs):
+    """Calls a download function without its progress messages."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return function(*args, **kwargs)
+
+
+class DownloadResumableTest(unittest.TestCase):
+    """Checks resuming, restarting and skipping in `download_resumable`."""
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.source_path = os.path.join(temp_dir.name, "source.zip")
+        self.dest_path = os.path.join(temp_dir.name, "dest", "dataverse_files.zip")
+        os.makedirs(os.path.dirname(self.dest_path))
+        with open(self.source_path, "wb") as f:
+            f.write(SOURCE_CONTENT)
+        self.url = Path(self.source_path).as_uri()
+
+    def make_options(self, adapter: LocalFileAdapter) -> DownloadOptions:
+        """Builds options whose session serves `file://` URLs through `adapter`."""
+        session = requests.Session()
+        session.mount("file://", adapter)
+        self.addCleanup(session.close)
+        return DownloadOptions(session=session, chunk_size=TEST_CHUNK_SIZE)
+
+    def interrupt_download(self) -> None:
+        """Leaves a partial download and its checkpoint behind, as a failed run."""
+        options = self.make_options(FlakyFileAdapter(interruptions=1))
+        with self.assertRaises(requests.exceptions.ChunkedEncodingError):
+            quiet(
+                download_data._transfer,
+                self.url,
+                self.dest_path + PART_SUFFIX,
+                options,
+                None,
+            )
+
+    def test_interrupted_transfer_resumes(self):
+        adapter = FlakyFileAdapter(interruptions=1)
+        metrics = SourceMetrics("dataset", "test", self.url)
+        entry = quiet(
+            download_resumable,
+            self.url,
+            self.dest_path,
+            self.make_options(adapter),
+            metrics=metrics,
+        )
+
+        self.assertEqual(entry["sha256"], file_sha256(self.source_path))
+        with open(self.dest_path, "rb") as f:
+            self.assertEqual(f.read(), SOURCE_CONTENT)
+        self.assertEqual(metrics.retries, 1)
+        self.assertEqual(adapter.statuses, [200, 206])
+        self.assertEqual(adapter.requests[1].headers["Range"], "bytes=1000-")
+        self.assertEqual(metrics.bytes_received, len(SOURCE_CONTENT))
+        self.assertFalse(os.path.exists(self.dest_path + PART_SUFFIX))
+        self.assertFalse(os.path.exists(self.dest_path + CHECKPOINT_SUFFIX))
+
+    def test_resume_from_earlier_run(self):
+        self.interrupt_download()
+        with open(self.dest_path + CHECKPOINT_SUFFIX, "r", encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["offset"], INTERRUPT_AFTER)
+
+        adapter = FlakyFileAdapter()
+        metrics = SourceMetrics("dataset", "test", self.url)
+        entry = quiet(
+            download_resumable,
+            self.url,
+            self.dest_path,
+            self.make_options(adapter),
+            metrics=metrics,
+        )
+
+        self.assertEqual(entry["sha256"], file_sha256(self.source_path))
+        self.assertEqual(adapter.statuses, [206])
+        self.assertEqual(metrics.bytes_received, len(SOURCE_CONTENT) - INTERRUPT_AFTER)
+
+    def test_changed_validator_restarts(self):
+        self.interrupt_download()
+        changed_content = SOURCE_CONTENT[::-1] + b"changed"
+        with open(self.source_path, "wb") as f:
+            f.write(changed_content)
+
+        adapter = FlakyFileAdapter()
+        entry = quiet(
+            download_resumable, self.url, self.dest_path, self.make_options(adapter)
+        )
+
+        # The stale If-Range makes the server send the whole new version
+        self.assertIn("If-Range", adapter.requests[0].headers)
+        self.assertEqual(adapter.statuses, [200])
+        self.assertEqual(entry["content_length"], len(changed_content))
+        with open(self.dest_path, "rb") as f:
+            self.assertEqual(f.read(), changed_content)
+
+    def test_complete_partial_download_is_finished(self):
+        self.interrupt_download()
+        part_path = self.dest_path + PART_SUFFIX
+        with open(part_path, "wb") as f:
+            f.write(SOURCE_CONTENT)
+        checkpoint_path = self.dest_path + CHECKPOINT_SUFFIX
+        with open(checkpoint_path, "r", encoding="utf-8") as f:
+            checkpoint = json.load(f)
+        checkpoint["offset"] = len(SOURCE_CONTENT)
+        with open(checkpoint_path, "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f)
+
+        adapter = FlakyFileAdapter()
+        entry = quiet(
+            download_resumable, self.url, self.dest_path, self.make_options(adapter)
+        )
+
+        self.assertEqual(adapter.statuses, [416])
+        self.assertEqual(entry["sha256"], file_sha256(self.source_path))
+
+    def test_unchanged_manifest_entry_is_skipped(self):
+        manifest_path = os.path.join(os.path.dirname(self.dest_path), "manifest.json")
+        manifest = DownloadManifest(manifest_path)
+        entry = quiet(
+            download_resumable,
+            self.url,
+            self.dest_path,
+            self.make_options(FlakyFileAdapter()),
+        )
+        manifest.record(self.url, entry, [])
+        manifest.save()
+
+        adapter = FlakyFileAdapter()
+        previous = DownloadManifest(manifest_path).get(self.url)
+        result = quiet(
+            download_resumable,
+            self.url,
+            self.dest_path,
+            self.make_options(adapter),
+            previous,
+        )
+
+        self.assertIsNone(result)
+        self.assertEqual(adapter.statuses, [304])
+        self.assertEqual(adapter.requests[0].headers["If-None-Match"], entry["etag"])
+        self.assertFalse(os.path.exists(self.dest_path + PART_SUFFIX))
+
+
+class ObjectStoreTest(unittest.TestCase):
+    """Checks that re-extracting a stored dataset leaves the object store intact."""
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.raw_dir = os.path.join(temp_dir.name, "raw")
+        self.objects_dir = os.path.join(self.raw_dir, ".objects")
+        self.dest_folder = os.path.join(self.raw_dir, "rcv_single")
+        self.zip_path = os.path.join(temp_dir.name, "dataverse_files.zip")
+        os.makedirs(self.dest_folder)
+        for name, value in (
+            ("BASE_DATA_FOLDER", self.raw_dir),
+            ("OBJECT_STORE_FOLDER", self.objects_dir),
+        ):
+            patcher = mock.patch.object(download_data, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.manifest = DownloadManifest(os.path.join(self.raw_dir, "manifest.json"))
+
+    def install(self, members: Dict[str, bytes], **options) -> None:
+        """Installs an archive of `members` as the dataset's latest version."""
+        with zipfile.ZipFile(self.zip_path, "w") as archive:
+            for name, content in members.items():
+                archive.writestr(name, content)
+        entry = {"url": "https://example.org/dataset"}
+        options = DownloadOptions(manifest=self.manifest, **options)
+        quiet(_install_archive, self.zip_path, self.dest_folder, entry, options)
+
+    def read_objects(self) -> Dict[str, bytes]:
+        """Returns the content of every object in the store, keyed by filename."""
+        objects = {}
+        for root, _, filenames in os.walk(self.objects_dir):
+            for filename in filenames:
+                with open(os.path.join(root, filename), "rb") as f:
+                    objects[filename] = f.read()
+        return objects
+
+    def test_extract_all_does_not_write_through_links(self):
+        self.install(ARCHIVE_MEMBERS, store="hardlink")
+        objects = self.read_objects()
+        self.assertEqual(len(objects), 1)
+
+        changed = dict(ARCHIVE_MEMBERS, **{"Portland_11052024_Mayor.csv": b"CHANGED"})
+        self.install(changed, extract_mode="all")
+
+        self.assertEqual(self.read_objects(), objects)
+        for name, content in changed.items():
+            with open(os.path.join(self.dest_folder, name), "rb") as f:
+                self.assertEqual(f.read(), content)
+
+
+class SheetTabTest(unittest.TestCase):
+    """Checks that the blocking and asyncio tab downloads store the same bytes."""
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_dir = temp_dir.name
+        mirror_dir = os.path.join(self.temp_dir, "mirror")
+        mirror_path = os.path.join(
+            mirror_dir, *mirror_sheet_tab_relpath("sheet", "Tab").split("/")
+        )
+        os.makedirs(os.path.dirname(mirror_path))
+        with open(mirror_path, "wb") as f:
+            f.write(SHEET_TAB_CONTENT)
+        self.backend = MirrorBackend(mirror_dir)
+
+    def download(self, asynchronous: bool) -> Dict:
+        """Downloads the tab into a fresh folder and returns its manifest entry."""
+        dest_folder = os.path.join(self.temp_dir, "async" if asynchronous else "sync")
+        session = requests.Session()
+        session.mount("file://", LocalFileAdapter())
+        self.addCleanup(session.close)
+        manifest = DownloadManifest(os.path.join(dest_folder, "manifest.json"))
+        options = DownloadOptions(
+            session=session, backend=self.backend, manifest=manifest
+        )
+        if asynchronous:
+            limiter = HostRateLimiter(1, 100.0)
+            download = download_google_sheet_tab_async(
+                "sheet", "Tab", dest_folder, options, limiter
+            )
+            self.assertTrue(quiet(asyncio.run, download))
+        else:
+            self.assertTrue(
+                quiet(download_google_sheet_tab, "sheet", "Tab", dest_folder, options)
+            )
+        with open(get_sheet_tab_path(dest_folder, "Tab"), "rb") as f:
+            self.assertEqual(f.read(), SHEET_TAB_CONTENT)
+        return manifest.get(self.backend.sheet_tab_url("sheet", "Tab"))
+
+    def test_both_paths_store_the_received_bytes(self):
+        sync_entry = self.download(asynchronous=False)
+        async_entry = self.download(asynchronous=True)
+        self.assertEqual(sync_entry["sha256"], async_entry["sha256"])
+        self.assertEqual(sync_entry["content_length"], len(SHEET_TAB_CONTENT))
+
+
+if __name__ == "__main__":
+    unittest.main()
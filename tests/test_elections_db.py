@@ -0,0 +1,201 @@
+"""
+Round-trip tests of the SQLite elections database: what `write_elections_sqlite`
+writes is read back through the `ElectionsDatabase` queries.
+
+Run them from the root of the repository with `python -m unittest discover tests`.
+"""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+from typing import Dict, List
+
+import pandas as pd
+
+from scripts.elections_db import ElectionsDatabase, write_elections_sqlite
+
+# --- Constants and Configuration ---
+
+# The metadata rows of each election type
+METADATA = {
+    "single": pd.DataFrame(
+        {
+            "RaceID": [
+                "Alaska_11082022_HouseDistrict1",
+                "Alaska_11082022_HouseDistrict2",
+                "Alaska_08162022_USHouse",
+                "Portland_11052024_Mayor",
+            ],
+            "Office": ["House District 1", "House District 2", "US House", "Mayor"],
+        }
+    ),
+    "proportional": pd.DataFrame(
+        {"RaceID": ["Portland_11052024_CouncilDistrict1"], "Office": ["Council"]}
+    ),
+}
+
+# The raw files, keyed by path
+FILES = {
+    "rcv_single/Alaska_11082022_HouseDistrict1.csv": ("single", 120),
+    "rcv_single/HD2_recount.csv": ("single", 80),
+    "rcv_proportional/Portland_11052024_CouncilDistrict1.csv": ("proportional", 500),
+}
+
+# The matches of the raw files
+MATCHES = [
+    (
+        "rcv_single/Alaska_11082022_HouseDistrict1.csv",
+        "Alaska_11082022_HouseDistrict1",
+        "exact",
+        100.0,
+    ),
+    ("rcv_single/HD2_recount.csv", "Alaska_11082022_HouseDistrict2", "manual", 71.5),
+    (
+        "rcv_proportional/Portland_11052024_CouncilDistrict1.csv",
+        "Portland_11052024_CouncilDistrict1",
+        "exact",
+        100.0,
+    ),
+]
+
+# --- Function Definitions ---
+
+
+def file_rows() -> List[Dict]:
+    """Returns the `files` rows of `FILES`."""
+    return [
+        {
+            "filepath": filepath,
+            "election_type": election_type,
+            "size_bytes": ballots * 10,
+            "sha256": f"{i:064x}",
+            "rank_columns": 3,
+            "candidate_columns": 0,
+            "ballots": ballots,
+            "profile_path": None,
+        }
+        for i, (filepath, (election_type, ballots)) in enumerate(FILES.items())
+    ]
+
+
+def match_rows() -> List[Dict]:
+    """Returns the `matches` rows of `MATCHES`."""
+    keys = ("filepath", "race_id", "match_method", "match_score")
+    return [dict(zip(keys, match)) for match in MATCHES]
+
+
+class ElectionsDatabaseTest(unittest.TestCase):
+    """Writes the database and queries it through `ElectionsDatabase`."""
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.path = os.path.join(temp_dir.name, "elections.sqlite")
+        write_elections_sqlite(self.path, METADATA, file_rows(), match_rows())
+
+    def open(self) -> ElectionsDatabase:
+        """Opens the database, closing it when the test ends."""
+        db = ElectionsDatabase(self.path)
+        self.addCleanup(db.close)
+        return db
+
+    def test_schema(self):
+        db = self.open()
+        names = {
+            row["name"]
+            for row in db.connection.execute("SELECT name FROM sqlite_master")
+        }
+        self.assertLessEqual(
+            {
+                "races",
+                "files",
+                "matches",
+                "metadata_single",
+                "metadata_proportional",
+                "idx_races_jurisdiction",
+                "idx_matches_race_id",
+                "idx_metadata_single_race_id",
+            },
+            names,
+        )
+        self.assertFalse(os.path.exists(self.path + ".tmp"))
+        with self.assertRaises(sqlite3.OperationalError):
+            db.connection.execute("DELETE FROM races")
+
+    def test_find_races(self):
+        db = self.open()
+        races = db.find_races(election_type="single", jurisdiction="ALASKA", year=2022)
+        self.assertEqual(
+            [(r["race_id"], r["date"], r["filepaths"]) for r in races],
+            [
+                ("Alaska_08162022_USHouse", "2022-08-16", []),
+                (
+                    "Alaska_11082022_HouseDistrict1",
+                    "2022-11-08",
+                    ["rcv_single/Alaska_11082022_HouseDistrict1.csv"],
+                ),
+                (
+                    "Alaska_11082022_HouseDistrict2",
+                    "2022-11-08",
+                    ["rcv_single/HD2_recount.csv"],
+                ),
+            ],
+        )
+        matched = db.find_races(year=2022, matched_only=True)
+        self.assertEqual(len(matched), 2)
+        self.assertEqual(
+            [r["race_id"] for r in db.find_races(election_type="proportional")],
+            ["Portland_11052024_CouncilDistrict1"],
+        )
+
+    def test_files_for_race(self):
+        files = self.open().files_for_race("Alaska_11082022_HouseDistrict2")
+        self.assertEqual(len(files), 1)
+        self.assertEqual(files[0]["filepath"], "rcv_single/HD2_recount.csv")
+        self.assertEqual(files[0]["ballots"], 80)
+        self.assertEqual(
+            (files[0]["match_method"], files[0]["match_score"]), ("manual", 71.5)
+        )
+        self.assertEqual(self.open().files_for_race("Portland_11052024_Mayor"), [])
+
+    def test_metadata(self):
+        db = self.open()
+        self.assertEqual(
+            db.metadata("Portland_11052024_CouncilDistrict1"),
+            {"RaceID": "Portland_11052024_CouncilDistrict1", "Office": "Council"},
+        )
+        self.assertEqual(db.metadata("Alaska_08162022_USHouse")["Office"], "US House")
+        self.assertIsNone(db.metadata("Nowhere_01012020_Mayor"))
+
+    def test_find_files(self):
+        files = self.open().find_files(min_ballots=100)
+        self.assertEqual(
+            [f["filepath"] for f in files],
+            [
+                "rcv_proportional/Portland_11052024_CouncilDistrict1.csv",
+                "rcv_single/Alaska_11082022_HouseDistrict1.csv",
+            ],
+        )
+
+    def test_rewrite_replaces_database(self):
+        db = self.open()
+        # Leftovers of an interrupted write are discarded
+        with open(self.path + ".tmp", "w") as f:
+            f.write("not a database")
+        write_elections_sqlite(self.path, {"single": METADATA["single"]}, [], [])
+
+        # A connection opened before the rewrite keeps reading the old version
+        self.assertEqual(len(db.find_races(election_type="proportional")), 1)
+        new_db = self.open()
+        self.assertEqual(new_db.find_races(election_type="proportional"), [])
+        self.assertEqual(new_db.find_races(matched_only=True), [])
+        self.assertFalse(os.path.exists(self.path + ".tmp"))
+
+    def test_missing_database(self):
+        with self.assertRaises(FileNotFoundError):
+            ElectionsDatabase(self.path + ".missing")
+
+
+if __name__ == "__main__":
+    unittest.main()
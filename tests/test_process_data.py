@@ -0,0 +1,214 @@
+"""
+Tests of the fuzzy matching decisions and of incremental processing in
+`process_data.py`.
+
+Every test works on a temporary raw and processed directory, patched in for the
+module's `RAW_DATA_DIR`, `PROCESSED_DATA_DIR` and the paths derived from them.
+
+Run them from the root of the repository with `python -m unittest discover tests`.
+"""
+
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from typing import Dict, List
+from unittest import mock
+
+import pandas as pd
+
+from scripts import process_data
+from scripts.process_data import (
+    AUTO_ACCEPTED_MATCHES_FILENAME,
+    ELECTIONS_DB_FILENAME,
+    MANUAL_MATCHES_FILENAME,
+    REJECTED_MATCHES_FILENAME,
+    DecisionCache,
+    MatchOptions,
+    ProcessingManifest,
+    match_elections_fuzzy,
+    prescore_fuzzy_matches,
+)
+
+# --- Constants and Configuration ---
+
+# The RaceIDs of the metadata tab the files are matched against
+RACE_IDS = [
+    "Alaska_11082022_HouseDistrict1",
+    "Alaska_11082022_HouseDistrict2",
+    "Portland_11052024_Mayor",
+]
+
+# The ballots written to every CVR of the incremental tests
+CVR_CONTENT = "rank1,rank2\nAdams,Baker\nBaker,\n"
+
+# --- Function Definitions ---
+
+
+def no_prompt(prompt: str = "") -> str:
+    """Stands in for `input` where the matching must not prompt."""
+    raise AssertionError(f"Unexpected prompt: {prompt}")
+
+
+class ProcessDataTestCase(unittest.TestCase):
+    """Points `process_data` at temporary raw and processed directories."""
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.raw_dir = os.path.join(temp_dir.name, "raw")
+        self.processed_dir = os.path.join(temp_dir.name, "processed")
+        os.makedirs(os.path.join(self.raw_dir, "rcv_single"))
+        os.makedirs(self.processed_dir)
+        for name, value in (
+            ("RAW_DATA_DIR", self.raw_dir),
+            ("PROCESSED_DATA_DIR", self.processed_dir),
+            ("METADATA_DIR", os.path.join(self.raw_dir, "rcv_database")),
+            ("DOWNLOAD_FILTERS_PATH", os.path.join(self.raw_dir, "filters.json")),
+        ):
+            patcher = mock.patch.object(process_data, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def raw_path(self, filename: str) -> str:
+        """Returns the path of a single-winner CVR in the raw directory."""
+        return os.path.join(self.raw_dir, "rcv_single", filename)
+
+    def write_log(self, log_name: str, entries: List[str]) -> None:
+        """Writes a match log as an earlier run would have."""
+        with open(os.path.join(self.processed_dir, log_name), "w") as f:
+            f.write("# Written by an earlier run\nfilepath,race_id\n")
+            f.writelines(f"{entry}\n" for entry in entries)
+
+    def match(self, paths: List[str], **options):
+        """Fuzzy matches `paths` against `RACE_IDS` without its messages."""
+        options = MatchOptions(decisions=DecisionCache(self.processed_dir), **options)
+        with (
+            mock.patch("builtins.input", no_prompt),
+            contextlib.redirect_stdout(io.StringIO()),
+        ):
+            return match_elections_fuzzy(paths, RACE_IDS, options)
+
+
+class FuzzyDecisionTest(ProcessDataTestCase):
+    """Checks that earlier decisions are replayed and auto-accepting is strict."""
+
+    def test_recorded_match_is_replayed_without_prompting(self):
+        path = self.raw_path("Portland_Mayor_2024.csv")
+        self.write_log(MANUAL_MATCHES_FILENAME, [f"{path},Portland_11052024_Mayor"])
+
+        matched, unmatched = self.match([path])
+
+        self.assertEqual(unmatched, [])
+        self.assertEqual(
+            [(m["race_id"], m["match_method"]) for m in matched],
+            [("Portland_11052024_Mayor", "earlier_decision")],
+        )
+
+    def test_skipped_file_is_not_asked_about_again(self):
+        path = self.raw_path("Portland_Mayor_2024.csv")
+        best = prescore_fuzzy_matches([path], RACE_IDS)[path][0][0]
+        self.write_log(REJECTED_MATCHES_FILENAME, [f"{path},{best}"])
+
+        matched, unmatched = self.match([path])
+
+        self.assertEqual((matched, unmatched), ([], [path]))
+
+    def test_score_below_cutoff_is_not_auto_accepted(self):
+        path = self.raw_path("Portland_Mayor_2024.csv")
+        score = prescore_fuzzy_matches([path], RACE_IDS)[path][0][1]
+
+        matched, unmatched = self.match(
+            [path], auto_accept_score=score + 1, interactive=False
+        )
+
+        self.assertEqual((matched, unmatched), ([], [path]))
+        log_path = os.path.join(self.processed_dir, AUTO_ACCEPTED_MATCHES_FILENAME)
+        self.assertFalse(os.path.exists(log_path))
+
+    def test_only_unambiguous_match_at_cutoff_is_auto_accepted(self):
+        clear = self.raw_path("Portland_Mayor_2024.csv")
+        ambiguous = self.raw_path("Alaska_11082022_HouseDistrict.csv")
+        scores = prescore_fuzzy_matches([clear, ambiguous], RACE_IDS)
+        cutoff = min(scores[clear][0][1], scores[ambiguous][1][1])
+
+        matched, unmatched = self.match(
+            [clear, ambiguous], auto_accept_score=cutoff, interactive=False
+        )
+
+        self.assertEqual(unmatched, [ambiguous])
+        self.assertEqual(
+            [(m["filepath"], m["race_id"], m["match_method"]) for m in matched],
+            [(clear, "Portland_11052024_Mayor", "auto_accept")],
+        )
+        log_path = os.path.join(self.processed_dir, AUTO_ACCEPTED_MATCHES_FILENAME)
+        with open(log_path, "r") as f:
+            self.assertIn(f"{clear},Portland_11052024_Mayor\n", f.read())
+
+
+class IncrementalProcessingTest(ProcessDataTestCase):
+    """Checks that an incremental run only reprocesses changed and removed files."""
+
+    def setUp(self):
+        super().setUp()
+        os.makedirs(os.path.join(self.raw_dir, "rcv_database"))
+        metadata_path = os.path.join(
+            self.raw_dir, "rcv_database", "SingleWinnerRCV.csv"
+        )
+        with open(metadata_path, "w") as f:
+            f.write("RaceID,Jurisdiction\n")
+            f.writelines(f"{race_id},{race_id.split('_')[0]}\n" for race_id in RACE_IDS)
+        for race_id in RACE_IDS:
+            with open(self.raw_path(f"{race_id}.csv"), "w") as f:
+                f.write(CVR_CONTENT)
+
+    def run_main(self, *argv: str) -> List[str]:
+        """Runs the pipeline and returns the files passed to exact matching."""
+        matched_files = []
+        match_exact = process_data.match_elections_exact
+
+        def spy(metadata_path, data_dir, filters=None, filepaths=None, race_ids=None):
+            matched_files.extend(filepaths)
+            return match_exact(metadata_path, data_dir, filters, filepaths, race_ids)
+
+        with (
+            mock.patch.object(process_data, "match_elections_exact", spy),
+            contextlib.redirect_stdout(io.StringIO()),
+        ):
+            process_data.main(["--non-interactive", *argv])
+        return matched_files
+
+    def read_database(self) -> Dict[str, str]:
+        """Returns the RaceID of every row of the elections database by file."""
+        df = pd.read_csv(os.path.join(self.processed_dir, ELECTIONS_DB_FILENAME))
+        return dict(zip(df["filepath"], df["race_id"]))
+
+    def read_manifest_files(self) -> Dict[str, Dict]:
+        """Returns the raw file entries of the processing manifest."""
+        return ProcessingManifest(self.processed_dir).files
+
+    def test_only_changed_and_removed_files_are_reprocessed(self):
+        paths = [self.raw_path(f"{race_id}.csv") for race_id in RACE_IDS]
+        changed, removed, unchanged = paths
+        keys = [process_data._decision_key(path) for path in paths]
+        self.assertEqual(sorted(self.run_main()), sorted(paths))
+        database = self.read_database()
+        files = self.read_manifest_files()
+
+        with open(changed, "a") as f:
+            f.write("Adams,Adams\n")
+        os.remove(removed)
+        self.assertEqual(self.run_main("--incremental"), [changed])
+
+        del database[removed]
+        self.assertEqual(self.read_database(), database)
+        new_files = self.read_manifest_files()
+        self.assertEqual(sorted(new_files), sorted([keys[0], keys[2]]))
+        self.assertEqual(new_files[keys[2]], files[keys[2]])
+        self.assertNotEqual(new_files[keys[0]]["sha256"], files[keys[0]]["sha256"])
+        self.assertEqual(new_files[keys[0]]["matches"], files[keys[0]]["matches"])
+
+
+if __name__ == "__main__":
+    unittest.main()